@@ -0,0 +1,161 @@
+import datetime
+import hashlib
+import math
+import re
+import threading
+from pymongo.errors import DuplicateKeyError
+
+_LEGAL_SUFFIX_RE = re.compile(
+    r"\b(?:inc|incorporated|llc|llp|ltd|limited|corp|corporation|co|company|plc|gmbh|pvt|private)\b\.?")
+_URL_RE = re.compile(r"https?://\S+")
+_NON_WORD_RE = re.compile(r"[^\w]+")
+_TITLE_ABBREVIATIONS = {"sr": "senior", "jr": "junior", "mgr": "manager", "eng": "engineer", "dev": "developer"}
+
+
+def _normalize_words(text):
+    return _NON_WORD_RE.sub(" ", (text or "").casefold()).split()
+
+
+def normalize_company(company):
+    """'Acme, Inc.' and 'ACME inc' both become 'acme'."""
+    return " ".join(_normalize_words(_LEGAL_SUFFIX_RE.sub(" ", (company or "").casefold())))
+
+
+def normalize_title(title):
+    """'Sr. Data Analyst ' and 'senior data analyst' both become 'senior data analyst'."""
+    return " ".join(_TITLE_ABBREVIATIONS.get(word, word) for word in _normalize_words(title))
+
+
+def job_fingerprint(company, title, description):
+    """
+    Builds a normalized fingerprint of a job posting so reposts and cross-posts of the same job match.
+
+    Company names lose legal suffixes and punctuation, titles expand common abbreviations, and the
+    description is canonicalized (URLs, punctuation, case and whitespace removed).
+
+    Args:
+        company (str): Hiring company.
+        title (str): Job title.
+        description (str): Job description text.
+
+    Returns:
+        str: Hex SHA-256 fingerprint.
+    """
+    canonical_description = " ".join(_normalize_words(_URL_RE.sub(" ", description or "")))
+    canonical = "\x1f".join((normalize_company(company), normalize_title(title), canonical_description))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=0.001):
+        """
+        Fixed-size Bloom filter: membership checks in O(k) with no false negatives.
+
+        Args:
+            capacity (int): Number of items the filter is sized for.
+            error_rate (float): Target false-positive rate at capacity.
+        """
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, item):
+        # Double hashing: k positions from two independent 64-bit halves of one digest.
+        digest = hashlib.sha256(item.encode("utf-8")).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class ApplicationHistory:
+    def __init__(self, collection, capacity=100000, error_rate=0.001):
+        """
+        Durable record of job applications with an in-process Bloom filter for "already applied" checks
+        that run before any agent call or PDF render.
+
+        The filter is rebuilt from the Mongo collection at startup. A negative answer from it is final;
+        a positive one is confirmed with an indexed lookup on the unique (user_id, job_fingerprint) key,
+        so false positives never block an application.
+
+        Args:
+            collection: The Mongo 'applications' collection (see ProfileDatabaseHandler.applications).
+            capacity (int): Initial Bloom filter size; it is rebuilt with twice the size when exceeded.
+            error_rate (float): Bloom filter false-positive rate.
+        """
+        self.collection = collection
+        self.error_rate = error_rate
+        self._lock = threading.Lock()
+        self.stats = {"checks": 0, "filter_negatives": 0, "confirmed_duplicates": 0, "false_positives": 0}
+        self.rebuild(capacity)
+
+    @staticmethod
+    def _key(user_id, fingerprint):
+        return f"{user_id}:{fingerprint}"
+
+    def rebuild(self, capacity=None):
+        """
+        Rebuilds the Bloom filter from every stored application.
+        """
+        with self._lock:
+            existing = self.collection.count_documents({})
+            capacity = max(capacity or 0, existing * 2, 1024)
+            bloom = BloomFilter(capacity, self.error_rate)
+            for record in self.collection.find({}, {"_id": 0, "user_id": 1, "job_fingerprint": 1}):
+                bloom.add(self._key(record.get("user_id"), record["job_fingerprint"]))
+            self._bloom = bloom
+
+    def has_applied(self, user_id, company, title, description):
+        """
+        Checks whether the user already applied to this job (or a repost of it).
+
+        Returns:
+            bool: True if an application with the same fingerprint is on record.
+        """
+        return self.has_applied_fingerprint(user_id, job_fingerprint(company, title, description))
+
+    def has_applied_fingerprint(self, user_id, fingerprint):
+        self.stats["checks"] += 1
+        if self._key(user_id, fingerprint) not in self._bloom:
+            self.stats["filter_negatives"] += 1
+            return False
+        found = self.collection.find_one({"user_id": user_id, "job_fingerprint": fingerprint}, {"_id": 1}) is not None
+        self.stats["confirmed_duplicates" if found else "false_positives"] += 1
+        return found
+
+    def record_application(self, user_id, company, title, description, **details):
+        """
+        Stores an application.
+
+        Args:
+            user_id: The applying user.
+            company (str): Hiring company.
+            title (str): Job title.
+            description (str): Job description text.
+            **details: Extra fields to store, e.g. job_url or resume_name.
+
+        Returns:
+            bool: True if recorded, False if this job was already on record for the user.
+        """
+        fingerprint = job_fingerprint(company, title, description)
+        record = dict(details, user_id=user_id, job_fingerprint=fingerprint, company=company, title=title,
+                      applied_at=datetime.datetime.now(datetime.timezone.utc))
+        try:
+            self.collection.insert_one(record)
+            inserted = True
+        except DuplicateKeyError:
+            inserted = False
+        self._bloom.add(self._key(user_id, fingerprint))
+        if self._bloom.count > self._bloom.capacity:
+            self.rebuild(self._bloom.capacity * 2)
+        return inserted
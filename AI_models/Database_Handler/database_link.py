@@ -1,24 +1,182 @@
+import os
+import threading
 from pymongo import MongoClient
 
-def get_document_from_mongodb(uri, db_name, collection_name, query):
+# Pool and timeout settings for the shared client; each can be overridden per get_mongo_client() call.
+DEFAULT_CLIENT_OPTIONS = {
+    "maxPoolSize": int(os.environ.get("Mongo_Max_Pool_Size", 50)),
+    "minPoolSize": int(os.environ.get("Mongo_Min_Pool_Size", 0)),
+    "maxIdleTimeMS": 5 * 60 * 1000,
+    "serverSelectionTimeoutMS": int(os.environ.get("Mongo_Server_Selection_Timeout_MS", 5000)),
+    "connectTimeoutMS": int(os.environ.get("Mongo_Connect_Timeout_MS", 5000)),
+    "socketTimeoutMS": int(os.environ.get("Mongo_Socket_Timeout_MS", 30000)),
+    "retryWrites": True,
+}
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_mongo_client(uri=None, **options):
     """
-    Connects to MongoDB and retrieves a document based on the provided query.
+    Returns the process-wide pooled MongoClient for a URI, creating it on first use.
+
+    MongoClient is thread-safe and keeps its own connection pool, so one client per URI is shared by
+    every caller instead of paying a TCP and auth handshake per lookup.
+
+    Args:
+        uri (str): MongoDB connection URI; defaults to the Mongo_URI environment variable.
+        **options: MongoClient keyword options overriding DEFAULT_CLIENT_OPTIONS (e.g. maxPoolSize).
+
+    Returns:
+        MongoClient: The shared client.
+    """
+    uri = uri or os.environ.get("Mongo_URI", "mongodb://localhost:27017/")
+    client_options = dict(DEFAULT_CLIENT_OPTIONS, **options)
+    key = (uri, tuple(sorted(client_options.items())))
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = MongoClient(uri, **client_options)
+            _clients[key] = client
+        return client
+
+
+def close_mongo_clients():
+    """
+    Closes every shared client, e.g. at process shutdown or in a forked worker before reconnecting.
+    """
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
+def get_document_from_mongodb(uri, db_name, collection_name, query, projection=None):
+    """
+    Retrieves a document based on the provided query using the shared pooled client.
 
     Args:
         uri (str): MongoDB connection URI.
         db_name (str): Name of the database.
         collection_name (str): Name of the collection.
         query (dict): Query to filter documents.
+        projection (dict): Optional fields to include or exclude.
 
     Returns:
         dict or None: The first matching document, or None if not found.
     """
-    client = MongoClient(uri)
-    db = client[db_name]
-    collection = db[collection_name]
-    document = collection.find_one(query)
-    client.close()
-    return document
+    collection = get_mongo_client(uri)[db_name][collection_name]
+    return collection.find_one(query, projection)
+
+
+class MongoRepository:
+    # Collection used by from_client()/from_uri() when no name is given; set by subclasses.
+    collection_name = None
+
+    def __init__(self, collection):
+        """
+        Thin data-access wrapper around one collection with bulk and projection-aware helpers.
+
+        Args:
+            collection: A pymongo (or mongomock) Collection.
+        """
+        self.collection = collection
+
+    @classmethod
+    def from_client(cls, client, db_name, collection_name=None):
+        return cls(client[db_name][collection_name or cls.collection_name])
+
+    @classmethod
+    def from_uri(cls, uri=None, db_name=None, collection_name=None, **client_options):
+        """
+        Builds the repository on the shared pooled client.
+
+        Args:
+            uri (str): MongoDB connection URI; defaults to Mongo_URI.
+            db_name (str): Database name; defaults to Mongo_DB_Name.
+            collection_name (str): Overrides the class's collection_name.
+            **client_options: Passed to get_mongo_client().
+        """
+        db_name = db_name or os.environ.get("Mongo_DB_Name", "test")
+        return cls.from_client(get_mongo_client(uri, **client_options), db_name, collection_name)
+
+    def find_one(self, query, projection=None):
+        return self.collection.find_one(query, projection)
+
+    def find(self, query, projection=None, sort=None, limit=0, batch_size=None):
+        """
+        Returns all matching documents as a list.
+
+        Args:
+            query (dict): Filter.
+            projection (dict or list): Fields to return; fetching only what is needed keeps documents small.
+            sort (list): (field, direction) pairs.
+            limit (int): Maximum documents; 0 means no limit.
+            batch_size (int): Documents per server round-trip.
+        """
+        cursor = self.collection.find(query, projection, limit=limit)
+        if sort:
+            cursor = cursor.sort(sort)
+        if batch_size:
+            cursor = cursor.batch_size(batch_size)
+        return list(cursor)
+
+    def insert_many(self, documents, ordered=False):
+        """
+        Inserts documents in one round-trip per server batch.
+
+        Args:
+            documents (list): Documents to insert.
+            ordered (bool): Stop at the first error when True; with False the rest are still inserted.
+
+        Returns:
+            list: The inserted ids.
+        """
+        if not documents:
+            return []
+        return self.collection.insert_many(documents, ordered=ordered).inserted_ids
+
+    def upsert(self, query, fields):
+        """
+        Sets ``fields`` on the document matching ``query``, inserting it when there is none.
+
+        Returns:
+            UpdateResult: upserted_id is set when a new document was inserted.
+        """
+        return self.collection.update_one(query, {"$set": fields}, upsert=True)
+
+    def bulk_write(self, operations, ordered=False):
+        """
+        Runs pymongo write operations (InsertOne, UpdateOne, ReplaceOne, DeleteOne, ...) in bulk.
+
+        Returns:
+            BulkWriteResult or None: None when there was nothing to write.
+        """
+        if not operations:
+            return None
+        return self.collection.bulk_write(operations, ordered=ordered)
+
+
+class ResumeRepository(MongoRepository):
+    collection_name = "resumes"
+
+    def get_by_name(self, name, projection=None):
+        return self.find_one({"name": name}, projection)
+
+    def get_by_user(self, user_id, projection=None):
+        return self.find({"user_id": user_id}, projection)
+
+
+class ProfileRepository(MongoRepository):
+    # Collection written by the Backend's mongoose UserProfile model.
+    collection_name = "userprofiles"
+
+    def get_by_user(self, user_id, projection=None):
+        return self.find_one({"user": user_id}, projection)
+
+    def get_by_users(self, user_ids, projection=None):
+        return self.find({"user": {"$in": list(user_ids)}}, projection)
 
 # Example usage:
 # uri = "mongodb://localhost:27017/"
@@ -26,4 +184,7 @@ def get_document_from_mongodb(uri, db_name, collection_name, query):
 # collection_name = "testcollection"
 # query = {"name": "John"}
 # doc = get_document_from_mongodb(uri, db_name, collection_name, query)
-# print(doc)
\ No newline at end of file
+# print(doc)
+#
+# resumes = ResumeRepository.from_uri(uri, db_name)
+# resumes.find({"user_id": "u1"}, projection={"name": 1, "created_at": 1})
@@ -1,6 +1,71 @@
-from pymongo import MongoClient
+import os
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from Database_Handler.database_link import get_mongo_client, ResumeRepository, ProfileRepository
+from Database_Handler.application_history import ApplicationHistory
+
+# Indexes declared per collection and created by ProfileDatabaseHandler.ensure_indexes().
+RESUME_INDEXES = [
+    IndexModel([('name', ASCENDING), ('created_at', DESCENDING)], name='resume_name_created'),
+    IndexModel([('user_id', ASCENDING), ('created_at', DESCENDING)], name='resume_user_created'),
+    IndexModel([('user_id', ASCENDING), ('version', DESCENDING)], name='resume_user_version'),
+]
+PROFILE_INDEXES = [
+    IndexModel([('user', ASCENDING)], name='profile_user'),
+]
+APPLICATION_INDEXES = [
+    # One record per user and job posting; a second insert for the same pair fails with DuplicateKeyError.
+    IndexModel([('user_id', ASCENDING), ('job_fingerprint', ASCENDING)], name='application_user_job', unique=True),
+    IndexModel([('user_id', ASCENDING), ('applied_at', DESCENDING)], name='application_user_applied'),
+]
+
+
+def _plan_stages(plan):
+    """Flattens the stage names of an explain() query plan tree."""
+    stages = [plan.get('stage')]
+    for child in ([plan['inputStage']] if 'inputStage' in plan else []) + plan.get('inputStages', []):
+        stages.extend(_plan_stages(child))
+    return stages
+
 
 class ProfileDatabaseHandler:
+    def __init__(self, uri=None, db_name=None, client=None, ensure_indexes=True):
+        """
+        Initializes the handler on the shared pooled MongoDB client.
+
+        Args:
+            uri (str): MongoDB connection URI; defaults to the Mongo_URI environment variable.
+            db_name (str): Database name; defaults to the Mongo_DB_Name environment variable.
+            client: An existing MongoClient (or mongomock.MongoClient); the shared pooled client when None.
+            ensure_indexes (bool): Create the declared indexes at startup (a no-op when they already exist).
+        """
+        self.client = client or get_mongo_client(uri)
+        self.db = self.client[db_name or os.environ.get("Mongo_DB_Name", "test")]
+        self.resume_repository = ResumeRepository.from_client(self.client, self.db.name)
+        self.profile_repository = ProfileRepository.from_client(self.client, self.db.name)
+        self.resumes = self.resume_repository.collection
+        self.profiles = self.profile_repository.collection
+        self.applications = self.db['applications']
+        self._application_history = None
+        if ensure_indexes:
+            self.ensure_indexes()
+
+    def get_application_history(self):
+        """
+        Returns the ApplicationHistory for the applications collection, rebuilding its in-process
+        duplicate filter from the database on first use.
+        """
+        if self._application_history is None:
+            self._application_history = ApplicationHistory(self.applications)
+        return self._application_history
+
+    def ensure_indexes(self):
+        """
+        Creates the indexes declared in RESUME_INDEXES, PROFILE_INDEXES and APPLICATION_INDEXES.
+        create_indexes is idempotent, so this is safe to run at every startup.
+        """
+        self.resumes.create_indexes(RESUME_INDEXES)
+        self.profiles.create_indexes(PROFILE_INDEXES)
+        self.applications.create_indexes(APPLICATION_INDEXES)
 
 
     def get_resume_by_name(self, resume_name):
@@ -15,3 +80,47 @@ class ProfileDatabaseHandler:
         """
         result = self.resumes.find_one({'name': resume_name})
         return result
+
+    def get_resumes_by_names(self, resume_names, projection=None):
+        """
+        Resolves many resume names with a single $in query.
+
+        Args:
+            resume_names (iterable): Names to look up.
+            projection (dict): Optional fields to include or exclude; 'name' is always returned.
+
+        Returns:
+            dict: name -> newest resume record with that name; names that were not found are left out.
+        """
+        names = list(dict.fromkeys(resume_names))
+        if not names:
+            return {}
+        # Results are keyed by 'name': an inclusion projection must list it and an exclusion one must not drop it.
+        # {'_id': 0} on its own is an exclusion projection and already returns every other field.
+        if projection:
+            fields = {key: value for key, value in projection.items() if key != '_id'}
+            if any(value in (1, True) for value in fields.values()):
+                projection = dict(projection, name=1)
+            elif 'name' in fields:
+                projection = {key: value for key, value in projection.items() if key != 'name'}
+        cursor = self.resumes.find({'name': {'$in': names}}, projection).sort([('name', ASCENDING), ('created_at', DESCENDING)])
+        results = {}
+        for record in cursor:
+            results.setdefault(record['name'], record)
+        return results
+
+    def explain_resume_lookup(self, resume_name):
+        """
+        Runs explain() on the get_resume_by_name query.
+
+        Returns:
+            list: Stage names of the winning plan, e.g. ['FETCH', 'IXSCAN']; 'COLLSCAN' means no index was used.
+        """
+        explanation = self.resumes.find({'name': resume_name}).limit(1).explain()
+        winning_plan = explanation['queryPlanner']['winningPlan']
+        # Newer servers nest the classic plan under queryPlan.
+        return _plan_stages(winning_plan.get('queryPlan', winning_plan))
+
+    def resume_lookup_uses_index(self, resume_name):
+        stages = self.explain_resume_lookup(resume_name)
+        return 'IXSCAN' in stages and 'COLLSCAN' not in stages
@@ -0,0 +1,391 @@
+"""agent_client.py holds the single user-message -> assistant-reply round-trip used by every Azure AI agent
+wrapper (resume_agent.py, resume_Parser.py), in both a blocking and an asyncio flavour, and the thread managers
+that recycle agent threads per task type and delete them in the background. The Azure SDK is imported, and
+credentials, project clients and agents are resolved, on first use rather than at import or construction time."""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from instrumentation import count, observe, record_usage, span
+
+# A pooled thread is deleted after this many runs. Runs on a reused thread only see their own message
+# (see _truncation_strategy), so the cap bounds server-side thread size rather than prompt size.
+DEFAULT_THREAD_MAX_USES = 20
+
+_cleanup_executor = None
+_cleanup_executor_lock = threading.Lock()
+
+# Process-wide credential and project clients (one per connection string), shared by every agent wrapper
+# so the Azure token cache is filled once per process.
+_credential = None
+_project_clients = {}
+_resolve_lock = threading.RLock()
+
+
+def get_credential():
+    """Returns the process-wide DefaultAzureCredential, creating it on first use."""
+    global _credential
+    with _resolve_lock:
+        if _credential is None:
+            from azure.identity import DefaultAzureCredential
+
+            _credential = DefaultAzureCredential()
+        return _credential
+
+
+def get_project_client(connection_string):
+    """
+    Returns the shared synchronous AIProjectClient for a connection string, creating it on first use.
+
+    Args:
+        connection_string (str): The connection string for the AI Project Client.
+    """
+    with _resolve_lock:
+        if connection_string not in _project_clients:
+            from azure.ai.projects import AIProjectClient
+
+            _project_clients[connection_string] = AIProjectClient.from_connection_string(
+                credential=get_credential(),
+                conn_str=connection_string
+            )
+        return _project_clients[connection_string]
+
+
+def _get_cleanup_executor():
+    """Shared background executor for thread deletions, created on first use."""
+    global _cleanup_executor
+    with _cleanup_executor_lock:
+        if _cleanup_executor is None:
+            _cleanup_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="agent-thread-cleanup")
+        return _cleanup_executor
+
+
+def _truncation_strategy():
+    # Only the newest message (this call's prompt) goes to the model, so earlier tasks on a reused
+    # thread neither leak into the answer nor add prompt tokens.
+    from azure.ai.projects.models import TruncationObject
+
+    return TruncationObject(type="last_messages", last_messages=1)
+
+
+def get_assistant_text(messages_list_response):
+    """
+    Returns the text of the first assistant message in a list_messages response.
+
+    Args:
+        messages_list_response: The object returned by agents.list_messages().
+
+    Returns:
+        str or None: The assistant's text reply, or None if the thread has no assistant text message.
+    """
+    for message_obj in getattr(messages_list_response, 'data', None) or []:
+        if getattr(message_obj, 'role', None) != 'assistant':
+            continue
+        for content_part in getattr(message_obj, 'content', None) or []:
+            if getattr(content_part, 'type', None) == 'text':
+                text_value_dict = getattr(content_part, 'text', {})
+                return getattr(text_value_dict, 'value', '')
+    return None
+
+
+def _record_request(content, task):
+    count("agent.requests", task=task)
+    observe("agent.prompt_bytes", len(content.encode("utf-8")), task=task)
+
+
+def _record_reply(run, reply, task):
+    """Records a finished run's token usage, status and reply size; returns the reply unchanged."""
+    record_usage(getattr(run, "usage", None), task=task)
+    status = getattr(run, "status", "completed")
+    if status != "completed":
+        count("agent.failed_runs", task=task, status=getattr(status, "value", status))
+    observe("agent.reply_bytes", len((reply or "").encode("utf-8")), task=task)
+    return reply
+
+
+class _ThreadPool:
+    """Bookkeeping shared by ThreadManager and AsyncThreadManager: idle threads per task type and counters."""
+
+    def __init__(self, max_uses=DEFAULT_THREAD_MAX_USES):
+        """
+        Args:
+            max_uses (int or dict): Runs per thread before it is deleted; a dict maps task type -> cap,
+                with the 'default' entry (or DEFAULT_THREAD_MAX_USES) for other task types. 1 disables reuse.
+        """
+        self.max_uses = max_uses
+        self.stats = {"created": 0, "reused": 0, "deleted": 0, "delete_failed": 0}
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _max_uses_for(self, task):
+        if isinstance(self.max_uses, dict):
+            return self.max_uses.get(task, self.max_uses.get("default", DEFAULT_THREAD_MAX_USES))
+        return self.max_uses
+
+    def _take_idle(self, task):
+        """Returns (thread_id, uses) of an idle thread for the task, or None when a new one is needed."""
+        with self._lock:
+            idle = self._idle.get(task)
+            if idle:
+                self.stats["reused"] += 1
+                return idle.pop()
+            self.stats["created"] += 1
+            return None
+
+    def _return_thread(self, task, thread_id, uses, healthy):
+        """Puts the thread back in the pool; returns True when it should be deleted instead."""
+        if not healthy or uses >= self._max_uses_for(task):
+            return True
+        with self._lock:
+            self._idle.setdefault(task, []).append((thread_id, uses))
+        return False
+
+    def _drain_idle(self):
+        with self._lock:
+            thread_ids = [thread_id for idle in self._idle.values() for thread_id, _ in idle]
+            self._idle.clear()
+        return thread_ids
+
+    def _record_deletion(self, error=None):
+        with self._lock:
+            self.stats["delete_failed" if error else "deleted"] += 1
+        if error:
+            print(f"Failed to delete agent thread: {error}")
+
+
+class ThreadManager(_ThreadPool):
+    def __init__(self, project_client, max_uses=DEFAULT_THREAD_MAX_USES, executor=None):
+        """
+        Recycles agent threads per task type and deletes them in the background once used up.
+
+        Args:
+            project_client (AIProjectClient): A synchronous Azure AI Project client.
+            max_uses (int or dict): See _ThreadPool; e.g. {'email': 50, 'default': 20}.
+            executor (concurrent.futures.Executor): Runs deletions; a shared two-worker pool if None.
+        """
+        super().__init__(max_uses)
+        self.project_client = project_client
+        self._executor = executor or _get_cleanup_executor()
+        self._pending = []
+
+    def send(self, agent_id, content, task="default"):
+        """
+        Sends one user message on a pooled thread and returns the reply text.
+
+        Args:
+            agent_id (str): The ID of the agent that should answer.
+            content (str): The user message.
+            task (str): Task type; threads are only shared between calls of the same type.
+
+        Returns:
+            str or None: The assistant's text reply.
+        """
+        agents = self.project_client.agents
+        pooled = self._take_idle(task)
+        if pooled:
+            thread_id, uses = pooled
+        else:
+            with span("agent.create_thread", task=task):
+                thread_id, uses = agents.create_thread().id, 0
+        healthy = False
+        _record_request(content, task)
+        try:
+            with span("agent.create_message", task=task):
+                agents.create_message(thread_id=thread_id, role="user", content=content)
+            run_options = {"truncation_strategy": _truncation_strategy()} if self._max_uses_for(task) > 1 else {}
+            with span("agent.run", task=task):
+                run = agents.create_and_process_run(thread_id=thread_id, agent_id=agent_id, **run_options)
+            # Only this run's newest message is fetched, however long the thread has grown.
+            with span("agent.list_messages", task=task):
+                messages = agents.list_messages(thread_id=thread_id, run_id=run.id, order="desc", limit=1)
+            healthy = getattr(run, "status", "completed") == "completed"
+            return _record_reply(run, get_assistant_text(messages), task)
+        finally:
+            if self._return_thread(task, thread_id, uses + 1, healthy):
+                self._delete_later(thread_id)
+
+    def _delete_later(self, thread_id):
+        def delete():
+            try:
+                self.project_client.agents.delete_thread(thread_id)
+                self._record_deletion()
+            except Exception as e:
+                self._record_deletion(e)
+
+        future = self._executor.submit(delete)
+        with self._lock:
+            self._pending = [pending for pending in self._pending if not pending.done()] + [future]
+
+    def close(self, wait=True):
+        """Deletes every idle thread; with wait=True, blocks until all queued deletions finished."""
+        for thread_id in self._drain_idle():
+            self._delete_later(thread_id)
+        if wait:
+            with self._lock:
+                pending = list(self._pending)
+            for future in pending:
+                future.result()
+
+
+class AsyncThreadManager(_ThreadPool):
+    def __init__(self, project_client, max_uses=DEFAULT_THREAD_MAX_USES):
+        """
+        asyncio counterpart of ThreadManager for azure.ai.projects.aio.AIProjectClient; deletions run
+        as background tasks on the event loop.
+        """
+        super().__init__(max_uses)
+        self.project_client = project_client
+        self._pending = set()
+
+    async def send(self, agent_id, content, task="default"):
+        """Async variant of ThreadManager.send."""
+        agents = self.project_client.agents
+        pooled = self._take_idle(task)
+        if pooled:
+            thread_id, uses = pooled
+        else:
+            with span("agent.create_thread", task=task):
+                thread_id, uses = (await agents.create_thread()).id, 0
+        healthy = False
+        _record_request(content, task)
+        try:
+            with span("agent.create_message", task=task):
+                await agents.create_message(thread_id=thread_id, role="user", content=content)
+            run_options = {"truncation_strategy": _truncation_strategy()} if self._max_uses_for(task) > 1 else {}
+            with span("agent.run", task=task):
+                run = await agents.create_and_process_run(thread_id=thread_id, agent_id=agent_id, **run_options)
+            with span("agent.list_messages", task=task):
+                messages = await agents.list_messages(thread_id=thread_id, run_id=run.id, order="desc", limit=1)
+            healthy = getattr(run, "status", "completed") == "completed"
+            return _record_reply(run, get_assistant_text(messages), task)
+        finally:
+            # A cancelled or timed-out call may still have a run in progress, so its thread is never reused.
+            if self._return_thread(task, thread_id, uses + 1, healthy):
+                self._delete_later(thread_id)
+
+    def _delete_later(self, thread_id):
+        async def delete():
+            try:
+                await self.project_client.agents.delete_thread(thread_id)
+                self._record_deletion()
+            except Exception as e:
+                self._record_deletion(e)
+
+        task = asyncio.get_running_loop().create_task(delete())
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def aclose(self):
+        """Deletes every idle thread and waits for all background deletions."""
+        for thread_id in self._drain_idle():
+            self._delete_later(thread_id)
+        if self._pending:
+            await asyncio.gather(*list(self._pending))
+
+
+class LazyAgentConnection:
+    """
+    Mixin for the agent wrappers (ResumeAIUpdater, ResumeAIParser) that resolves project_client, agent and
+    thread_manager on first access. Subclasses set self.connection_string and self.agent_id. Each attribute
+    can also be assigned directly, e.g. to inject a mock client.
+    """
+
+    @property
+    def project_client(self):
+        with _resolve_lock:
+            if getattr(self, "_project_client", None) is None:
+                self._project_client = get_project_client(self.connection_string)
+            return self._project_client
+
+    @project_client.setter
+    def project_client(self, value):
+        self._project_client = value
+
+    @property
+    def agent(self):
+        # get_agent is a network round-trip; the send paths only need agent_id, so this runs only when asked.
+        with _resolve_lock:
+            if getattr(self, "_agent", None) is None:
+                self._agent = self.project_client.agents.get_agent(self.agent_id)
+            return self._agent
+
+    @agent.setter
+    def agent(self, value):
+        self._agent = value
+
+    @property
+    def thread_manager(self):
+        with _resolve_lock:
+            if getattr(self, "_thread_manager", None) is None:
+                self._thread_manager = ThreadManager(self.project_client)
+            return self._thread_manager
+
+    @thread_manager.setter
+    def thread_manager(self, value):
+        self._thread_manager = value
+
+
+def send_message(project_client, agent_id, content, thread_manager=None, task="default"):
+    """
+    Sends one user message to the agent, waits for the run and returns the reply text.
+
+    Args:
+        project_client (AIProjectClient): A synchronous Azure AI Project client.
+        agent_id (str): The ID of the agent that should answer.
+        content (str): The user message.
+        thread_manager (ThreadManager): Pool to take the thread from; without one the call uses a new
+            thread that is deleted in the background afterwards.
+        task (str): Task type used to pick a pooled thread.
+
+    Returns:
+        str or None: The assistant's text reply.
+    """
+    thread_manager = thread_manager or ThreadManager(project_client, max_uses=1)
+    return thread_manager.send(agent_id, content, task)
+
+
+async def send_message_async(project_client, agent_id, content, thread_manager=None, task="default"):
+    """
+    asyncio counterpart of send_message for azure.ai.projects.aio.AIProjectClient.
+
+    Args:
+        project_client (azure.ai.projects.aio.AIProjectClient): An asynchronous Azure AI Project client.
+        agent_id (str): The ID of the agent that should answer.
+        content (str): The user message.
+        thread_manager (AsyncThreadManager): Pool to take the thread from; a single-use thread if None.
+        task (str): Task type used to pick a pooled thread.
+
+    Returns:
+        str or None: The assistant's text reply.
+    """
+    thread_manager = thread_manager or AsyncThreadManager(project_client, max_uses=1)
+    return await thread_manager.send(agent_id, content, task)
+
+
+def create_async_credential():
+    """
+    Builds an asynchronous DefaultAzureCredential. aio credentials hold a session bound to the running event
+    loop, so they are not shared like get_credential(); whoever creates one closes it with ``await credential.close()``.
+    """
+    from azure.identity.aio import DefaultAzureCredential as AsyncDefaultAzureCredential
+
+    return AsyncDefaultAzureCredential()
+
+
+def create_async_project_client(connection_string, credential):
+    """
+    Builds an asynchronous AIProjectClient. The Azure aio packages are imported here so the
+    synchronous code paths never pay for them.
+
+    Args:
+        connection_string (str): The connection string for the AI Project Client.
+        credential: An async credential from create_async_credential(). Closing the client does not close
+            it, so the caller keeps it and closes it after the client.
+    """
+    from azure.ai.projects.aio import AIProjectClient as AsyncAIProjectClient
+
+    return AsyncAIProjectClient.from_connection_string(
+        credential=credential,
+        conn_str=connection_string
+    )
@@ -0,0 +1,212 @@
+"""agent_response.py turns the assistant's text reply into JSON without another agent run when it can: it pulls the
+JSON value out of code fences and surrounding prose, repairs trailing commas and smart quotes, rejects output that
+was cut off (so it is requested again instead of being completed by guesswork), and validates resumes against
+resume_schema. Shared by resume_agent.py, resume_Parser.py and resume_understander.py."""
+
+import json
+import re
+
+from resume_schema import RESUME_FIELDS, normalize_resume, validate_resume
+
+_FENCE_RE = re.compile(r"```(?:json|JSON)?\s*(.*?)(?:```|$)", re.DOTALL)
+_TRAILING_COMMA_RE = re.compile(r",(\s*[}\]])")
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def _scan(text, start):
+    """
+    Walks a JSON value from text[start] tracking strings and brackets.
+
+    Returns:
+        tuple: (end index just past the value or None if it never closes, open brackets left, inside_string)
+    """
+    stack, in_string, escaped = [], False, False
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(char)
+        elif char in "}]" and stack:
+            stack.pop()
+            if not stack:
+                return index + 1, [], False
+    return None, stack, in_string
+
+
+def extract_json_text(text):
+    """
+    Finds the first JSON object or array in a reply, ignoring code fences and prose around it.
+
+    Returns:
+        str or None: The JSON text (possibly truncated, if the reply was cut off), or None if there is none.
+    """
+    if not text:
+        return None
+    fenced = _FENCE_RE.search(text)
+    if fenced and fenced.group(1).strip():
+        text = fenced.group(1)
+    starts = [index for index in (text.find("{"), text.find("[")) if index != -1]
+    if not starts:
+        return None
+    start = min(starts)
+    end, _, _ = _scan(text, start)
+    return text[start:end] if end is not None else text[start:]
+
+
+def is_truncated(text):
+    """True when the first JSON value in text opens a string, object or array it never closes."""
+    candidate = (text or "").strip()
+    if not candidate:
+        return False
+    end, stack, in_string = _scan(candidate, 0)
+    return end is None and bool(stack or in_string)
+
+
+def repair_json(text):
+    """
+    Fixes the defects agents commonly produce: smart quotes, trailing commas and output cut off
+    mid-value (open strings and brackets are closed and a dangling key or comma is dropped).
+
+    Closing a cut-off value invents its end, so AgentResponseHandler checks is_truncated() first and
+    treats such replies as failures instead of calling this on them.
+
+    Returns:
+        str: The repaired JSON text; it may still be invalid.
+    """
+    text = text.translate(_SMART_QUOTES).strip()
+    end, stack, in_string = _scan(text, 0)
+    if end is None and stack:
+        if in_string:
+            text += '"'
+        text = text.rstrip()
+        if stack[-1] == "{":
+            # A key that never got its value, whether the cut fell inside the key, after it or after the colon.
+            text = re.sub(r'([{,])\s*"(?:[^"\\]|\\.)*"\s*:?\s*$', r"\1", text)
+        text = re.sub(r",\s*$", "", text)
+        text += "".join(_CLOSERS[char] for char in reversed(stack))
+    return _TRAILING_COMMA_RE.sub(r"\1", text)
+
+
+class AgentResponseHandler:
+    def __init__(self):
+        """
+        Parses agent replies into JSON and counts how each reply was recovered.
+
+        stats keys: 'clean' (json.loads worked as is), 'extracted' (JSON found inside fences or prose),
+        'repaired' (needed repair_json), 'failed' (unusable), 'truncated' (the failures that were cut off
+        mid-value), 'retries' (fresh agent runs requested), 'defaults_filled' (resumes that needed schema defaults).
+        """
+        self.stats = {"clean": 0, "extracted": 0, "repaired": 0, "failed": 0, "truncated": 0, "retries": 0,
+                      "defaults_filled": 0}
+
+    @property
+    def saved_calls(self):
+        """Replies that would have failed a plain json.loads but were recovered without a new agent run."""
+        return self.stats["extracted"] + self.stats["repaired"]
+
+    def parse(self, message_content):
+        """
+        Parses a reply into a JSON value.
+
+        Args:
+            message_content (str): The assistant's text reply.
+
+        Returns:
+            dict, list or None: The parsed value, or None if nothing usable was found.
+        """
+        return self.parse_with_outcome(message_content)[0]
+
+    def parse_with_outcome(self, message_content):
+        """
+        parse() that also says how the value was recovered.
+
+        Returns:
+            tuple: (value or None, 'clean', 'extracted', 'repaired', 'truncated' or 'failed'). A reply
+            cut off mid-value is 'truncated' and gives None, since its missing end cannot be recovered.
+        """
+        if not message_content:
+            self.stats["failed"] += 1
+            return None, "failed"
+        try:
+            value = json.loads(message_content)
+            self.stats["clean"] += 1
+            return value, "clean"
+        except json.JSONDecodeError:
+            pass
+        candidate = extract_json_text(message_content)
+        if candidate is not None:
+            try:
+                value = json.loads(candidate)
+                self.stats["extracted"] += 1
+                return value, "extracted"
+            except json.JSONDecodeError:
+                pass
+            if is_truncated(candidate):
+                self.stats["failed"] += 1
+                self.stats["truncated"] += 1
+                print("The agent's response was cut off before the JSON ended.")
+                return None, "truncated"
+            try:
+                value = json.loads(repair_json(candidate))
+                self.stats["repaired"] += 1
+                return value, "repaired"
+            except json.JSONDecodeError:
+                pass
+        self.stats["failed"] += 1
+        print("Could not recover JSON from the agent's response:")
+        print(message_content)
+        return None, "failed"
+
+    def parse_resume(self, message_content, unwrap_key=None, retry=None, merge=None, with_outcome=False):
+        """
+        Parses a reply that should hold a resume and normalizes it to the schema ResumeBuilder expects.
+
+        Args:
+            message_content (str): The assistant's text reply.
+            unwrap_key (str): Key the resume is nested under (e.g. 'resume'); a bare resume is accepted too.
+            retry (callable): Called with no arguments to get a fresh reply, only if this one is unusable.
+            merge (callable): Applied to the parsed (possibly partial) resume before validation, e.g. to
+                merge edited sections back into the full resume.
+            with_outcome (bool): Return (resume, outcome) with the parse_with_outcome() outcome of the
+                reply the resume came from, e.g. so repaired replies are not cached.
+
+        Returns:
+            dict or None: The normalized resume, or None if neither the reply nor the retry held one.
+        """
+        value, outcome = self.parse_with_outcome(message_content)
+        resume = self._resume_from(value, unwrap_key)
+        if resume is None and retry is not None:
+            self.stats["retries"] += 1
+            print("Agent response was unusable after repair, requesting a new run...")
+            value, outcome = self.parse_with_outcome(retry())
+            resume = self._resume_from(value, unwrap_key)
+        if resume is not None:
+            if merge is not None:
+                resume = merge(resume)
+            if validate_resume(resume):
+                self.stats["defaults_filled"] += 1
+            resume = normalize_resume(resume)
+        return (resume, outcome) if with_outcome else resume
+
+    @staticmethod
+    def _resume_from(value, unwrap_key):
+        if not isinstance(value, dict):
+            return None
+        if unwrap_key and isinstance(value.get(unwrap_key), dict):
+            return value[unwrap_key]
+        # Accept a bare resume when the agent skipped the wrapper.
+        return value if any(field in value for field in RESUME_FIELDS) else None
+
+    def report(self):
+        total = sum(self.stats[key] for key in ("clean", "extracted", "repaired", "failed"))
+        return (f"Agent replies: {total}, clean: {self.stats['clean']}, recovered without a new run: "
+                f"{self.saved_calls}, failed: {self.stats['failed']}, retries: {self.stats['retries']}")
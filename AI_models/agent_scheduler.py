@@ -0,0 +1,84 @@
+"""agent_scheduler.py runs many asyncio agent calls with a bounded number in flight, per-call timeouts and
+exponential backoff when the service rate-limits us. Shared by the *_async methods of ResumeAIUpdater and
+ResumeAIParser."""
+
+import asyncio
+import random
+
+# HTTP statuses worth retrying: throttling and transient service errors.
+RETRYABLE_STATUS_CODES = (408, 429, 500, 502, 503, 504)
+
+
+class AgentCallScheduler:
+    def __init__(self, max_in_flight=8, timeout=180.0, max_retries=4, backoff_base=1.0, backoff_max=60.0):
+        """
+        Initializes the scheduler.
+
+        Args:
+            max_in_flight (int): Maximum number of agent calls running at the same time.
+            timeout (float): Seconds a single attempt may take before it is cancelled.
+            max_retries (int): Retries after the first attempt for rate-limit, transient or timeout errors.
+            backoff_base (float): First backoff delay in seconds, doubled on every retry.
+            backoff_max (float): Upper bound for a single backoff delay in seconds.
+        """
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+
+    async def run(self, call_factory):
+        """
+        Runs one agent call under the concurrency limit, retrying it when it is throttled or times out.
+
+        Args:
+            call_factory (callable): Zero-argument function returning a new coroutine for each attempt.
+
+        Returns:
+            The result of the coroutine.
+        """
+        attempt = 0
+        while True:
+            async with self._semaphore:
+                try:
+                    return await asyncio.wait_for(call_factory(), self.timeout)
+                except Exception as e:
+                    if attempt >= self.max_retries or not self._is_retryable(e):
+                        raise
+                    delay = self._retry_delay(e, attempt)
+                    print(f"Agent call failed ({type(e).__name__}), retrying in {delay:.1f}s...")
+            # Sleep outside the semaphore so a throttled call does not hold a slot.
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def map(self, fn, items):
+        """
+        Calls the coroutine function ``fn`` for every item concurrently under the limit.
+
+        Args:
+            fn (callable): Coroutine function taking one item.
+            items (iterable): The inputs.
+
+        Returns:
+            list: Results in input order; a failed item holds its exception instead of a result.
+        """
+        return await asyncio.gather(*(self.run(lambda item=item: fn(item)) for item in items),
+                                    return_exceptions=True)
+
+    @staticmethod
+    def _is_retryable(error):
+        if isinstance(error, asyncio.TimeoutError):
+            return True
+        return getattr(error, 'status_code', None) in RETRYABLE_STATUS_CODES
+
+    def _retry_delay(self, error, attempt):
+        response = getattr(error, 'response', None)
+        retry_after = getattr(response, 'headers', {}).get('Retry-After') if response is not None else None
+        try:
+            if retry_after is not None:
+                return min(float(retry_after), self.backoff_max)
+        except ValueError:
+            pass
+        # Full jitter keeps a burst of throttled calls from retrying in lockstep.
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
@@ -1,18 +1,247 @@
 import os
 import base64
+import json
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from google.auth.transport.requests import Request
 import pickle
+import threading
+import time
+from instrumentation import count, span
+
+# Label changes applied by the write-behind queue; trashing through labels matches messages().trash().
+MUTATION_ACTIONS = {
+    'star': {'addLabelIds': ['STARRED']},
+    'trash': {'addLabelIds': ['TRASH'], 'removeLabelIds': ['INBOX']},
+}
+# users.messages.batchModify accepts at most this many ids per call.
+BATCH_MODIFY_LIMIT = 1000
+
+
+class GmailMutationQueue:
+    def __init__(self, service, journal_path=None, max_pending=BATCH_MODIFY_LIMIT, max_delay=30.0):
+        """
+        Write-behind queue of label changes, grouped per action and flushed with users.messages.batchModify.
+
+        A background timer flushes ``max_delay`` seconds after the first change is queued, so a final partial
+        batch is not left waiting for another enqueue. Callers should still call flush() (or close()) in a
+        ``finally`` before exiting, because the timer thread is a daemon and dies with the process.
+
+        Args:
+            service: An authenticated Gmail API service object.
+            journal_path (str): JSON-lines file of pending changes so they survive a restart; None keeps them in
+                memory only. Each enqueue appends one line and every flush rewrites it with what is still pending.
+            max_pending (int): Flush as soon as this many changes are pending.
+            max_delay (float): Flush once the oldest pending change is this many seconds old; None disables the timer.
+        """
+        self._service = service
+        self._journal_path = journal_path
+        self.max_pending = max_pending
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        # Serializes flushes; enqueue only takes _lock, so it never waits for the network.
+        self._flush_lock = threading.Lock()
+        # action -> {email_id: None}; dicts keep insertion order and make re-queuing an id a no-op.
+        self._pending = {action: {} for action in MUTATION_ACTIONS}
+        self._oldest_pending_at = None
+        self._timer = None
+        self._load_journal()
+        with self._lock:
+            self._arm_timer()
+
+    def enqueue(self, action, email_id):
+        """
+        Queues ``action`` ('star' or 'trash') for an email and flushes if the size or time trigger fired.
+
+        Returns:
+            dict or None: The flush report if this call triggered a flush.
+        """
+        if action not in MUTATION_ACTIONS:
+            raise ValueError(f"Unknown mutation action '{action}', expected one of {sorted(MUTATION_ACTIONS)}.")
+        with self._lock:
+            if email_id not in self._pending[action]:
+                self._pending[action][email_id] = None
+                self._append_journal(action, email_id)
+            if self._oldest_pending_at is None:
+                self._oldest_pending_at = time.monotonic()
+            self._arm_timer()
+        return self.flush_if_due()
+
+    def flush_if_due(self):
+        """
+        Flushes when enough changes are pending or the oldest one has waited ``max_delay`` seconds.
+
+        Returns:
+            dict or None: The flush report, or None if nothing was due.
+        """
+        with self._lock:
+            due = self._pending_count() >= self.max_pending or (
+                self._oldest_pending_at is not None and self.max_delay is not None
+                and time.monotonic() - self._oldest_pending_at >= self.max_delay)
+        return self.flush() if due else None
+
+    def flush(self):
+        """
+        Applies all pending changes, up to BATCH_MODIFY_LIMIT ids per batchModify call.
+
+        The pending changes are taken out of the queue under the lock and sent without it, so enqueue()
+        is not blocked by the network. Adding a label that is already present is a no-op on Gmail's side,
+        and the journal is only compacted after the calls returned, so replaying a flush after a crash is
+        safe. When a batchModify call fails its ids are retried one by one with modify() so a single bad id
+        does not block the rest. Ids Gmail rejects as invalid or missing (400/404) are dropped; any other
+        failure is queued again for the next flush.
+
+        Returns:
+            dict: {'applied': {action: count}, 'failed': {email_id: error message}}
+        """
+        report = {'applied': {action: 0 for action in MUTATION_ACTIONS}, 'failed': {}}
+        with self._flush_lock:
+            with self._lock:
+                batch = {action: list(ids) for action, ids in self._pending.items()}
+                for ids in self._pending.values():
+                    ids.clear()
+                self._oldest_pending_at = None
+            retry = {action: [] for action in MUTATION_ACTIONS}
+            for action, body in MUTATION_ACTIONS.items():
+                email_ids = batch[action]
+                for start in range(0, len(email_ids), BATCH_MODIFY_LIMIT):
+                    chunk = email_ids[start:start + BATCH_MODIFY_LIMIT]
+                    try:
+                        with span("gmail.batch_modify", action=action):
+                            self._service.users().messages().batchModify(
+                                userId='me', body=dict(body, ids=chunk)).execute()
+                        done = chunk
+                    except Exception as e:
+                        print(f"batchModify for {len(chunk)} emails ({action}) failed: {e}. Retrying individually.")
+                        done = self._apply_individually(action, chunk, report)
+                    done_ids = set(done)
+                    retry[action].extend(email_id for email_id in chunk if email_id not in done_ids)
+                    report['applied'][action] += len(done) - sum(1 for i in done if i in report['failed'])
+            with self._lock:
+                for action, email_ids in retry.items():
+                    self._pending[action].update(dict.fromkeys(email_ids))
+                if self._pending_count() and self._oldest_pending_at is None:
+                    self._oldest_pending_at = time.monotonic()
+                self._compact_journal()
+                self._arm_timer()
+        return report
+
+    def close(self):
+        """
+        Stops the flush timer and applies whatever is still pending.
+
+        Returns:
+            dict: The flush report.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self.max_delay = None
+        return self.flush()
+
+    def pending(self):
+        """
+        Returns:
+            dict: action -> list of queued email ids.
+        """
+        with self._lock:
+            return {action: list(ids) for action, ids in self._pending.items()}
+
+    def _apply_individually(self, action, email_ids, report):
+        """Returns the ids that no longer need to stay queued (applied or permanently rejected)."""
+        done = []
+        for email_id in email_ids:
+            try:
+                self._service.users().messages().modify(
+                    userId='me', id=email_id, body=MUTATION_ACTIONS[action]).execute()
+                done.append(email_id)
+            except Exception as e:
+                report['failed'][email_id] = str(e)
+                if isinstance(e, HttpError) and getattr(e.resp, 'status', None) in (400, 404):
+                    done.append(email_id)
+        return done
+
+    def _pending_count(self):
+        return sum(len(ids) for ids in self._pending.values())
+
+    def _arm_timer(self):
+        # Called with self._lock held.
+        if self.max_delay is None or self._timer is not None or self._oldest_pending_at is None:
+            return
+        delay = max(0.0, self._oldest_pending_at + self.max_delay - time.monotonic())
+        self._timer = threading.Timer(delay, self._on_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _on_timer(self):
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush_if_due()
+        except Exception as e:
+            print(f"Timed flush of queued Gmail changes failed: {e}")
+        finally:
+            with self._lock:
+                self._arm_timer()
+
+    def _load_journal(self):
+        if not self._journal_path or not os.path.exists(self._journal_path):
+            return
+        with open(self._journal_path, 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A line cut short by a crash mid-append.
+                    continue
+                if entry.get('action') in self._pending:
+                    self._pending[entry['action']][entry['id']] = None
+        if self._pending_count():
+            self._oldest_pending_at = time.monotonic()
+
+    def _append_journal(self, action, email_id):
+        # Called with self._lock held.
+        if not self._journal_path:
+            return
+        with open(self._journal_path, 'a') as f:
+            f.write(json.dumps({'action': action, 'id': email_id}) + '\n')
+
+    def _compact_journal(self):
+        # Called with self._lock held.
+        if not self._journal_path:
+            return
+        tmp_path = self._journal_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            for action, email_ids in self._pending.items():
+                for email_id in email_ids:
+                    f.write(json.dumps({'action': action, 'id': email_id}) + '\n')
+        os.replace(tmp_path, self._journal_path)
+
 
 class GmailReader:
-    def __init__(self, creds_path, token_path='../token.pickle', scopes=None):
+    def __init__(self, creds_path, token_path='../token.pickle', scopes=None, checkpoint_path=None,
+                 mutation_journal_path=None, service=None):
+        """
+        Args:
+            creds_path (str): OAuth client secrets file.
+            token_path (str): Pickled user credentials, refreshed or created by the OAuth flow.
+            scopes (list): OAuth scopes; gmail.modify by default.
+            checkpoint_path (str): JSON file holding the history id for iter_new_messages().
+            mutation_journal_path (str): Journal of queued star/trash changes (see GmailMutationQueue).
+            service: A ready Gmail API service object, e.g. a recorded or fake one; skips authentication.
+        """
         self._creds_path = creds_path
         self._token_path = token_path
+        self._checkpoint_path = checkpoint_path
+        self._mutation_journal_path = mutation_journal_path
+        self._mutation_queue = None
         self._scopes = scopes or ['https://www.googleapis.com/auth/gmail.modify']
         self._creds = None
-        self._service = None
-        self._authenticate()
+        self._service = service
+        if service is None:
+            self._authenticate()
 
     def _authenticate(self):
         if os.path.exists(self._token_path):
@@ -29,14 +258,27 @@ class GmailReader:
         self._service = build('gmail', 'v1', credentials=self._creds)
 
     def read_latest_email(self):
-        results = self._service.users().messages().list(userId='me', maxResults=1).execute()
+        with span("gmail.list"):
+            results = self._service.users().messages().list(userId='me', maxResults=1).execute()
         messages = results.get('messages', [])
         
         if not messages:
             print('No emails found in your inbox.')
             return None
         msg_id = messages[0]['id']
-        msg = self._service.users().messages().get(userId='me', id=msg_id, format='full').execute()
+        with span("gmail.get"):
+            msg = self._service.users().messages().get(userId='me', id=msg_id, format='full').execute()
+        # print(f"Email From: {email_from}\nEmail ID: {msg_id}\nSubject: {subject}\nBody:\n{body}")
+        return self._parse_message(msg)
+
+    @staticmethod
+    def _parse_message(msg):
+        """
+        Extracts sender, id, subject and plain-text body from a messages().get(format='full') response.
+
+        Returns:
+            tuple: (email_from, msg_id, subject, body)
+        """
         payload = msg['payload']
         headers = payload.get('headers', [])
 
@@ -48,16 +290,166 @@ class GmailReader:
         if parts:
             for part in parts:
                 if part['mimeType'] == 'text/plain':
-                    data = part['body']['data']
-                    body = base64.urlsafe_b64decode(data).decode()
+                    data = part['body'].get('data')
+                    if data:
+                        body = base64.urlsafe_b64decode(data).decode()
                     break
         else:
             data = payload['body'].get('data')
             if data:
                 body = base64.urlsafe_b64decode(data).decode()
+        return email_from, msg['id'], subject, body
 
-        # print(f"Email From: {email_from}\nEmail ID: {msg_id}\nSubject: {subject}\nBody:\n{body}")
-        return email_from, msg_id, subject, body
+    def iter_messages(self, query=None, label_ids=None, page_size=100, batch_size=50, max_messages=None):
+        """
+        Streams messages matching a query, newest first, paging through messages().list and fetching
+        bodies through the Gmail batch endpoint instead of one get() request per message.
+
+        Args:
+            query (str): Gmail search query, e.g. 'newer_than:7d'.
+            label_ids (list): Only return messages carrying all of these labels.
+            page_size (int): Ids requested per list() page (Gmail allows up to 500).
+            batch_size (int): get() calls per batch HTTP request (Gmail allows up to 100).
+            max_messages (int): Stop after this many messages; None streams everything.
+
+        Yields:
+            tuple: (email_from, msg_id, subject, body) as returned by read_latest_email.
+        """
+        for message_ids in self._iter_message_id_pages(query, label_ids, page_size, max_messages):
+            yield from self._fetch_messages(message_ids, batch_size)
+
+    def iter_new_messages(self, batch_size=50, query=None):
+        """
+        Streams only the mail that arrived since the last completed run.
+
+        The first run (or a run whose checkpoint has expired on Gmail's side) falls back to a full
+        iter_messages() scan. Later runs read users.history.list from the stored history id. The
+        checkpoint is written only after the generator is exhausted, so an interrupted run is replayed
+        rather than skipped.
+
+        Args:
+            batch_size (int): get() calls per batch HTTP request.
+            query (str): Search query for the full scan fallback.
+
+        Yields:
+            tuple: (email_from, msg_id, subject, body)
+        """
+        if not self._checkpoint_path:
+            raise ValueError("iter_new_messages needs a checkpoint_path to remember what was already seen.")
+        start_history_id = self._load_checkpoint()
+        if start_history_id:
+            try:
+                message_ids, latest_history_id = self._list_history(start_history_id)
+            except HttpError as e:
+                if getattr(e.resp, 'status', None) != 404:
+                    raise
+                print(f"History id {start_history_id} has expired, falling back to a full scan.")
+                start_history_id = None
+        if not start_history_id:
+            # Read the profile's history id before listing so mail arriving mid-scan is picked up next run.
+            latest_history_id = self._service.users().getProfile(userId='me').execute()['historyId']
+            for message_ids in self._iter_message_id_pages(query, None, 100, None):
+                yield from self._fetch_messages(message_ids, batch_size)
+        else:
+            for start in range(0, len(message_ids), batch_size):
+                yield from self._fetch_messages(message_ids[start:start + batch_size], batch_size)
+        self._save_checkpoint(latest_history_id)
+
+    def _iter_message_id_pages(self, query, label_ids, page_size, max_messages):
+        request_args = {'userId': 'me', 'maxResults': page_size}
+        if query:
+            request_args['q'] = query
+        if label_ids:
+            request_args['labelIds'] = label_ids
+        remaining = max_messages
+        page_token = None
+        while True:
+            if page_token:
+                request_args['pageToken'] = page_token
+            with span("gmail.list"):
+                response = self._service.users().messages().list(**request_args).execute()
+            message_ids = [m['id'] for m in response.get('messages', [])]
+            if remaining is not None:
+                message_ids = message_ids[:remaining]
+                remaining -= len(message_ids)
+            if message_ids:
+                yield message_ids
+            page_token = response.get('nextPageToken')
+            if not page_token or remaining == 0:
+                return
+
+    def _list_history(self, start_history_id):
+        """
+        Returns the ids of messages added since ``start_history_id`` (oldest first, de-duplicated)
+        and the history id to store as the next checkpoint.
+        """
+        message_ids = []
+        seen = set()
+        latest_history_id = start_history_id
+        page_token = None
+        while True:
+            request_args = {'userId': 'me', 'startHistoryId': start_history_id, 'historyTypes': ['messageAdded']}
+            if page_token:
+                request_args['pageToken'] = page_token
+            with span("gmail.history"):
+                response = self._service.users().history().list(**request_args).execute()
+            for record in response.get('history', []):
+                for added in record.get('messagesAdded', []):
+                    msg_id = added['message']['id']
+                    if msg_id not in seen:
+                        seen.add(msg_id)
+                        message_ids.append(msg_id)
+            latest_history_id = response.get('historyId', latest_history_id)
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                return message_ids, latest_history_id
+
+    def _fetch_messages(self, message_ids, batch_size):
+        """
+        Fetches full messages with batch HTTP requests and yields them parsed, in ``message_ids`` order.
+        A get that fails inside a batch is retried once on its own; messages that were deleted are skipped.
+        """
+        for start in range(0, len(message_ids), batch_size):
+            chunk = message_ids[start:start + batch_size]
+            fetched = {}
+            failed = []
+
+            def _callback(request_id, response, exception):
+                if exception is not None:
+                    failed.append(request_id)
+                else:
+                    fetched[request_id] = response
+
+            batch = self._service.new_batch_http_request(callback=_callback)
+            for msg_id in chunk:
+                batch.add(self._service.users().messages().get(userId='me', id=msg_id, format='full'),
+                          request_id=msg_id)
+            with span("gmail.batch_get"):
+                batch.execute()
+            count("gmail.batch_get_failures", len(failed))
+
+            for msg_id in failed:
+                try:
+                    with span("gmail.get"):
+                        fetched[msg_id] = self._service.users().messages().get(userId='me', id=msg_id, format='full').execute()
+                except HttpError as e:
+                    print(f"Could not fetch email with ID {msg_id}: {e}")
+            count("gmail.messages_fetched", len(fetched))
+            for msg_id in chunk:
+                if msg_id in fetched:
+                    yield self._parse_message(fetched[msg_id])
+
+    def _load_checkpoint(self):
+        if not os.path.exists(self._checkpoint_path):
+            return None
+        with open(self._checkpoint_path, 'r') as f:
+            return json.load(f).get('history_id')
+
+    def _save_checkpoint(self, history_id):
+        tmp_path = self._checkpoint_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'history_id': history_id}, f)
+        os.replace(tmp_path, self._checkpoint_path)
     
     
     def delete_email_by_id(self, email_id):
@@ -91,7 +483,32 @@ class GmailReader:
         ).execute()
         print(f"Email with ID {email_id} starred.")
         return result
-    
+
+    def queue_star(self, email_id):
+        """
+        Queues an email to be starred on the next batched flush instead of calling modify() right away.
+        """
+        self._get_mutation_queue().enqueue('star', email_id)
+
+    def queue_trash(self, email_id):
+        """
+        Queues an email to be moved to the trash on the next batched flush instead of calling trash() right away.
+        """
+        self._get_mutation_queue().enqueue('trash', email_id)
+
+    def flush_mutations(self):
+        """
+        Applies every queued star/trash change now.
+
+        Returns:
+            dict: The flush report from GmailMutationQueue.flush().
+        """
+        return self._get_mutation_queue().flush()
+
+    def _get_mutation_queue(self):
+        if self._mutation_queue is None:
+            self._mutation_queue = GmailMutationQueue(self._service, journal_path=self._mutation_journal_path)
+        return self._mutation_queue
 
 
     def send_whatsapp_message(self,account_sid, auth_token, from_whatsapp, to_whatsapp, message):
@@ -109,6 +526,18 @@ class GmailReader:
 #     email_from, id, subject, body = gmail_reader.read_latest_email()
 #     print(id)
 #     # gmail_reader.delete_email_by_id(id)
+#
+# Streaming only the mail that arrived since the previous run:
+#     gmail_reader = GmailReader(creds_path='credentials2.json', checkpoint_path='gmail_checkpoint.json')
+#     for email_from, id, subject, body in gmail_reader.iter_new_messages():
+#         print(id, subject)
+#
+# Triaging a backlog with batched label changes:
+#     gmail_reader = GmailReader(creds_path='credentials2.json', mutation_journal_path='gmail_mutations.json')
+#     try:
+#         gmail_reader.queue_star(id)       # or gmail_reader.queue_trash(id)
+#     finally:
+#         report = gmail_reader.flush_mutations()
 
 
 
@@ -117,9 +546,12 @@ import os
 from dotenv import load_dotenv
 
 from resume_agent import ResumeAIUpdater
+from email_prefilter import EmailTriage
 if __name__ == "__main__":
     # Initialize the ResumeAgent
     agent = ResumeAIUpdater()
+    # Obvious confirmations and templated rejections are labeled locally without an agent call
+    triage = EmailTriage(agent)
 
     # Read the latest email
     gmail_reader = GmailReader(creds_path='../credentials.json')
@@ -127,7 +559,7 @@ if __name__ == "__main__":
 
     # Process the email content
     if body:
-        value = agent.update_process_email_content(body)
+        value = triage.classify(body)
 
     # Optionally delete the email after processing
     if value == 0:
@@ -0,0 +1,82 @@
+"""Throughput of ResumeAIUpdater.update_resume_with_ai (sequential) against update_resume_for_jobs_async with
+AgentCallScheduler, using the fake agents of tests/fakes.py with injected latency instead of Azure.
+
+Run from AI_models/:  python benchmarks/bench_agent_scheduler.py --jobs 200 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent_scheduler import AgentCallScheduler  # noqa: E402
+from resume_agent import ResumeAIUpdater, json_data  # noqa: E402
+from tests.fakes import AsyncFakeAgents, AsyncFakeProjectClient, FakeAgents, FakeProjectClient  # noqa: E402
+
+
+def _echo_resume(prompt):
+    return json.dumps({"resume": json.loads(prompt[prompt.index("{"):])["resume"]})
+
+
+def make_updater(latency):
+    """A ResumeAIUpdater whose sync and async clients are the test fakes, each run taking ``latency`` seconds."""
+    async_client = AsyncFakeProjectClient(AsyncFakeAgents(_echo_resume, latency=latency))
+    updater = ResumeAIUpdater(connection_string="mock", agent_id="mock-agent", async_project_client=async_client)
+    updater.project_client = FakeProjectClient(FakeAgents(_echo_resume, latency=latency))
+    return updater
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per mock agent run.")
+    parser.add_argument("--max-in-flight", type=int, nargs="+", default=[1, 8, 32, 64])
+    args = parser.parse_args()
+
+    requirements = json.dumps(["Strong Python skills", "Experience with cloud platforms"])
+    jobs = [(requirements, json.dumps(f"Job posting {i}")) for i in range(args.jobs)]
+    updater = make_updater(args.latency)
+
+    start = time.perf_counter()
+    for requirements_json, description_json in jobs:
+        updater.update_resume_with_ai(requirements_json, description_json, json_data)
+    elapsed = time.perf_counter() - start
+    print(f"sequential:          {args.jobs / elapsed:8.1f} jobs/s ({elapsed:.2f}s)")
+
+    async_stats = asyncio.run(run_async(updater, jobs, args.max_in_flight))
+
+    updater.close()
+    print(f"sync agent threads:  {updater.thread_manager.stats}")
+    print(f"async agent threads: {async_stats}")
+
+
+async def run_async(updater, jobs, max_in_flight_values):
+    """
+    Runs every max_in_flight setting on one event loop (the async threads are bound to it) and closes the
+    async client and its threads at the end.
+
+    Returns:
+        dict: The async thread manager's stats after closing.
+    """
+    thread_manager = None
+    try:
+        for max_in_flight in max_in_flight_values:
+            scheduler = AgentCallScheduler(max_in_flight=max_in_flight)
+            start = time.perf_counter()
+            results = await updater.update_resume_for_jobs_async(jobs, json_data, scheduler)
+            elapsed = time.perf_counter() - start
+            failed = sum(1 for result in results if not isinstance(result, dict))
+            print(f"async max_in_flight={max_in_flight:<3} {len(jobs) / elapsed:8.1f} jobs/s "
+                  f"({elapsed:.2f}s, {failed} failed)")
+            thread_manager = updater._async_thread_manager
+    finally:
+        await updater.aclose()
+    return thread_manager.stats if thread_manager is not None else {}
+
+
+if __name__ == "__main__":
+    main()
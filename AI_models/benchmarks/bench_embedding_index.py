@@ -0,0 +1,57 @@
+"""Initial embedding, incremental re-indexing and search latency of embedding_index.EmbeddingIndex over
+synthetic postings (see bench_job_matcher.make_postings). Uses sentence-transformers when installed.
+
+Run from AI_models/:  python benchmarks/bench_embedding_index.py --postings 10000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_job_matcher import make_postings  # noqa: E402
+from embedding_index import EmbeddingIndex  # noqa: E402
+from resume_agent import json_data  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--postings", type=int, default=10000)
+    parser.add_argument("--changed", type=int, default=100, help="Postings edited before the incremental run.")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    postings = make_postings(args.postings)
+    resume = json.loads(json_data)
+    with tempfile.TemporaryDirectory() as directory:
+        index = EmbeddingIndex(directory)
+        start = time.perf_counter()
+        embedded = index.add_postings(postings)
+        index.save()
+        print(f"initial:     {time.perf_counter() - start:7.2f}s, {embedded} embedded with {index.embedder.name}")
+
+        for posting in postings[:args.changed]:
+            posting["job_description"] += " Updated."
+        reopened = EmbeddingIndex(directory, embedder=index.embedder)
+        start = time.perf_counter()
+        embedded = reopened.add_postings(postings)
+        print(f"incremental: {time.perf_counter() - start:7.2f}s, {embedded} embedded, "
+              f"{reopened.stats['unchanged']} unchanged")
+
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            ranked = reopened.rank_postings(resume, k=10)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"rank_postings(10): median {statistics.median(timings):.1f} ms over {len(reopened)} vectors")
+        for result in ranked[:3]:
+            print(f"  {result['id']:<10} {result['score']:.3f}  via {result['best_section']}")
+
+
+if __name__ == "__main__":
+    main()
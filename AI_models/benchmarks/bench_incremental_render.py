@@ -0,0 +1,53 @@
+"""Renders N tailored variants of one base resume (summary, skills and projects changed, as
+ResumeAIUpdater.update_resume_with_ai does) with and without the per-section flowable cache.
+
+Run from AI_models/:  python benchmarks/bench_incremental_render.py --variants 500
+"""
+
+import argparse
+import copy
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resume_pdf import ResumeRenderer, json_data  # noqa: E402
+
+
+def make_variants(base, count):
+    variants = []
+    for i in range(count):
+        variant = copy.deepcopy(base)
+        variant["summary"] = f"{base['summary']} Tailored for posting #{i}."
+        variant["skills"]["programming"] = base["skills"]["programming"] + [f"Keyword{i}"]
+        for project in variant["projects"]:
+            project["description"] = f"{project['description']} Relevant to posting #{i}."
+        variants.append(variant)
+    return variants
+
+
+def bench(label, renderer, variants):
+    start = time.perf_counter()
+    for variant in variants:
+        renderer.render(variant, io.BytesIO())
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} {len(variants) / elapsed:8.1f} PDFs/s ({elapsed:.2f}s)")
+    return renderer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--variants", type=int, default=500)
+    args = parser.parse_args()
+
+    variants = make_variants(json.loads(json_data), args.variants)
+    bench("no section cache", ResumeRenderer(section_cache_size=0), variants)
+    renderer = bench("section cache", ResumeRenderer(), variants)
+    print(f"section cache hits={renderer.section_cache_hits} misses={renderer.section_cache_misses}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Index build time and per-resume scoring latency of job_matcher.JobIndex over synthetic postings.
+
+Run from AI_models/:  python benchmarks/bench_job_matcher.py --postings 10000 [--scoring tfidf]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from job_matcher import JobIndex  # noqa: E402
+from resume_agent import json_data  # noqa: E402
+
+SKILLS = ["Python", "SQL", "Tableau", "Power BI", "Excel", "Java", "Scala", "Spark", "Hive", "TensorFlow", "PyTorch",
+          "Azure", "AWS", "GCP", "Docker", "Kubernetes", "React", "Node.js", "C++", "C#", "R", "MySQL", "Airflow",
+          "Snowflake", "dbt", "Looker", "Kafka", "Go", "Terraform", "Linux"]
+FILLER = ("design build maintain pipelines dashboards reports stakeholders analytics models services data insights "
+          "business customers product platform scalable reliable collaborate deliver own drive improve").split()
+
+
+def make_postings(count, seed=7):
+    rng = random.Random(seed)
+    postings = []
+    for i in range(count):
+        requirements = [f"Experience with {skill}" for skill in rng.sample(SKILLS, rng.randint(3, 8))]
+        description = " ".join(rng.choice(FILLER + SKILLS) for _ in range(rng.randint(120, 400)))
+        postings.append({"id": f"job-{i}", "title": f"Data Role {i}", "job_requirements": requirements,
+                         "job_description": description})
+    return postings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--postings", type=int, default=10000)
+    parser.add_argument("--scoring", choices=["bm25", "tfidf"], default="bm25")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    postings = make_postings(args.postings)
+    resume = json.loads(json_data)
+
+    start = time.perf_counter()
+    index = JobIndex(scoring=args.scoring).build(postings)
+    print(f"build: {time.perf_counter() - start:.2f}s for {len(postings)} postings, {len(index.vocabulary)} terms")
+
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        results = index.top_k(resume, k=10)
+        timings.append((time.perf_counter() - start) * 1000)
+    print(f"top_k(10): median {statistics.median(timings):.1f} ms, max {max(timings):.1f} ms")
+    for result in results[:3]:
+        print(f"  {result['id']:<10} {result['score']:8.3f}  matched: {result['matched_skills'][:4]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Throughput of pipeline.JobPipeline against running the same stages one item at a time, with simulated agent
+latency, then a restart from the checkpoint after a crash part-way through.
+
+Run from AI_models/:  python benchmarks/bench_pipeline.py --items 40 --agent-latency 0.2
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipeline import JobPipeline, PipelineCheckpoint  # noqa: E402
+from resume_pdf import ResumeRenderer, json_data  # noqa: E402
+
+
+class FakeStages:
+    """OCR, parse and tailor stand-ins that sleep like the real services and count their calls."""
+
+    def __init__(self, latency, fail_after=None):
+        self.latency = latency
+        self.fail_after = fail_after
+        self.calls = {"ocr": 0, "parse": 0, "tailor": 0}
+        self._lock = threading.Lock()
+
+    def _call(self, stage):
+        with self._lock:
+            self.calls[stage] += 1
+            calls = self.calls[stage]
+        if stage == "tailor" and self.fail_after is not None and calls > self.fail_after:
+            raise ConnectionError("simulated outage")
+        time.sleep(self.latency)
+
+    def ocr(self, item):
+        self._call("ocr")
+        return f"resume text {item['resume']}"
+
+    def parse(self, text):
+        self._call("parse")
+        return json.loads(json_data)
+
+    def tailor(self, item, resume):
+        self._call("tailor")
+        return dict(resume, summary=f"{resume.get('summary', '')} Tailored for {item['title']}.")
+
+
+def make_items(count):
+    return [{"id": f"job-{i}", "resume": "resume.pdf", "title": f"Data Analyst {i}",
+             "job_requirements": ["SQL", "Tableau"], "job_description": "Build dashboards."} for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=40)
+    parser.add_argument("--agent-latency", type=float, default=0.2)
+    args = parser.parse_args()
+    items = make_items(args.items)
+    workdir = tempfile.mkdtemp()
+
+    try:
+        stages = FakeStages(args.agent_latency)
+        renderer = ResumeRenderer()
+        start = time.perf_counter()
+        for item in items:
+            resume = stages.parse(stages.ocr(item))
+            renderer.render(stages.tailor(item, resume), os.path.join(workdir, f"seq-{item['id']}.pdf"))
+        print(f"one at a time: {time.perf_counter() - start:.2f}s for {len(items)} items")
+
+        stages = FakeStages(args.agent_latency)
+        pipeline = JobPipeline(PipelineCheckpoint(":memory:"), stages.ocr, stages.parse, stages.tailor,
+                               notify=lambda item, pdf: None, output_dir=workdir)
+        report = pipeline.run(items)
+        print(f"pipeline:      {report['elapsed']:.2f}s, {report['completed']} completed, calls {stages.calls}")
+
+        db_path = os.path.join(workdir, "checkpoint.sqlite3")
+        crashing = FakeStages(args.agent_latency, fail_after=args.items // 2)
+        report = JobPipeline(PipelineCheckpoint(db_path), crashing.ocr, crashing.parse, crashing.tailor,
+                             notify=lambda item, pdf: None, output_dir=workdir, max_retries=0).run(items)
+        print(f"crashed run:   {report['completed']} completed, {len(report['failed'])} failed")
+        restarted = FakeStages(args.agent_latency)
+        report = JobPipeline(PipelineCheckpoint(db_path), restarted.ocr, restarted.parse, restarted.tailor,
+                             notify=lambda item, pdf: None, output_dir=workdir).run(items)
+        print(f"restarted run: {report['completed']} completed, {report['skipped']} skipped, "
+              f"{report['resumed']} resumed, calls {restarted.calls}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Throughput of bulk resume rendering: one ResumeRenderer in this process against render_many()
+with a process pool of increasing size.
+
+Run from AI_models/:  python benchmarks/bench_render_many.py --count 400
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resume_pdf import ResumeRenderer, json_data, render_many  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=400)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    resume = json.loads(json_data)
+    renderer = ResumeRenderer()
+    start = time.perf_counter()
+    for _ in range(args.count):
+        renderer.render(resume, io.BytesIO())
+    elapsed = time.perf_counter() - start
+    print(f"single process:   {args.count / elapsed:8.1f} PDFs/s")
+
+    for workers in args.workers:
+        jobs = ((resume, io.BytesIO()) for _ in range(args.count))
+        report = render_many(jobs, max_workers=workers)
+        print(f"render_many x{workers:<3}  {report['pdfs_per_second']:8.1f} PDFs/s "
+              f"({report['rendered']} rendered, {len(report['failed'])} failed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""PDFs/second for resume rendering: a fresh stylesheet and a JSON round-trip per PDF (the old
+ResumeBuilder behaviour) against one long-lived ResumeRenderer fed parsed dicts.
+
+Run from AI_models/:  python benchmarks/bench_resume_pdf.py --count 200
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resume_pdf import ResumeRenderer, json_data  # noqa: E402
+
+
+def bench(label, count, render_one):
+    start = time.perf_counter()
+    for _ in range(count):
+        render_one(io.BytesIO())
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {count / elapsed:8.1f} PDFs/s ({elapsed * 1000 / count:.2f} ms/PDF)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=200)
+    args = parser.parse_args()
+
+    resume = json.loads(json_data)
+    json_str = json.dumps(resume)
+    renderer = ResumeRenderer()
+
+    bench("per-call setup (before)", args.count,
+          lambda out: ResumeRenderer().render(json.loads(json_str), out))
+    bench("shared renderer (after)", args.count,
+          lambda out: renderer.render(resume, out))
+
+
+if __name__ == "__main__":
+    main()
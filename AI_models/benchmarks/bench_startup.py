@@ -0,0 +1,94 @@
+"""Cold-start cost of the AI_models entry points: import time in a fresh interpreter (and which heavy packages
+the import pulled in), then construction and first-call latency of ResumeAIUpdater and ResumeAIParser against a
+mock agent, so no Azure credentials or network are needed. Every measurement runs in its own subprocess.
+
+Run from AI_models/:  python benchmarks/bench_startup.py [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+AI_MODELS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_POINTS = ["resume_agent", "resume_Parser", "resume_understander", "email_prefilter", "resume_pdf", "agentconnectsemail"]
+HEAVY_PACKAGES = ["azure.ai.projects", "azure.identity", "reportlab", "googleapiclient", "sklearn"]
+
+_IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "loaded": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+_FIRST_CALL_PROBE = """
+import json, time
+from types import SimpleNamespace
+start = time.perf_counter()
+from {module} import {cls}
+imported = time.perf_counter()
+instance = {cls}(connection_string="mock", agent_id="mock-agent")
+constructed = time.perf_counter()
+
+class MockAgents:
+    def create_thread(self):
+        return SimpleNamespace(id="thread")
+    def create_message(self, thread_id, role, content):
+        pass
+    def create_and_process_run(self, thread_id, agent_id, **kwargs):
+        return SimpleNamespace(id="run", status="completed")
+    def list_messages(self, thread_id, **kwargs):
+        text = SimpleNamespace(value={reply!r})
+        return SimpleNamespace(data=[SimpleNamespace(role="assistant", content=[SimpleNamespace(type="text", text=text)])])
+    def delete_thread(self, thread_id):
+        pass
+
+instance.project_client = SimpleNamespace(agents=MockAgents())
+instance.{call}
+first_call = time.perf_counter()
+print(json.dumps({{"import_ms": (imported - start) * 1000, "construct_ms": (constructed - imported) * 1000,
+                   "first_call_ms": (first_call - constructed) * 1000}}))
+"""
+
+FIRST_CALLS = [
+    ("resume_agent", "ResumeAIUpdater", "update_process_email_content('Thanks for applying')", "2"),
+    ("resume_Parser", "ResumeAIParser", "parse_resume_with_ai('Jane Doe')", '{"resume": {"name": "Jane Doe"}}'),
+]
+
+
+def _run_probe(code):
+    output = subprocess.run([sys.executable, "-c", code], cwd=AI_MODELS_DIR, capture_output=True, text=True)
+    if output.returncode != 0:
+        raise RuntimeError(output.stderr.strip().splitlines()[-1] if output.stderr.strip() else "probe failed")
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per measurement; the median is shown.")
+    args = parser.parse_args()
+
+    print(f"{'import':<22} {'median ms':>10}  heavy packages loaded")
+    for module in ENTRY_POINTS:
+        try:
+            results = [_run_probe(_IMPORT_PROBE.format(module=module, heavy=HEAVY_PACKAGES)) for _ in range(args.repeat)]
+        except RuntimeError as e:
+            print(f"{module:<22} {'n/a':>10}  ({e})")
+            continue
+        median = statistics.median(result["ms"] for result in results)
+        print(f"{module:<22} {median:10.1f}  {', '.join(results[0]['loaded']) or '-'}")
+
+    print(f"\n{'first call':<22} {'import ms':>10} {'construct ms':>13} {'first call ms':>14}")
+    for module, cls, call, reply in FIRST_CALLS:
+        results = [_run_probe(_FIRST_CALL_PROBE.format(module=module, cls=cls, call=call, reply=reply))
+                   for _ in range(args.repeat)]
+        print(f"{cls:<22} " + " ".join(
+            f"{statistics.median(result[key] for result in results):{width}.1f}"
+            for key, width in (("import_ms", 10), ("construct_ms", 13), ("first_call_ms", 14))))
+
+
+if __name__ == "__main__":
+    main()
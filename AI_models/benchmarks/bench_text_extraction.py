@@ -0,0 +1,55 @@
+"""Per-document latency of the local PDF text-layer path against Azure Document Intelligence OCR
+over a folder of sample PDFs. OCR timings are only taken with --ocr (needs Understander_Endpoint/Key).
+
+Run from AI_models/:  python benchmarks/bench_text_extraction.py path/to/pdfs [--ocr]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_text_extract import LOCAL_TEXT_MIN_QUALITY, extract_text_layer, score_text_quality  # noqa: E402
+from resume_understander import analyze_read  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("folder")
+    parser.add_argument("--ocr", action="store_true", help="Also time the cloud OCR path for every document.")
+    args = parser.parse_args()
+
+    paths = sorted(os.path.join(args.folder, name) for name in os.listdir(args.folder) if name.lower().endswith(".pdf"))
+    local_ms, ocr_ms = [], []
+    local_ok = 0
+    for path in paths:
+        with open(path, "rb") as f:
+            document_bytes = f.read()
+        start = time.perf_counter()
+        text, page_count = extract_text_layer(document_bytes)
+        quality = score_text_quality(text, page_count)
+        local_ms.append((time.perf_counter() - start) * 1000)
+        local_ok += quality >= LOCAL_TEXT_MIN_QUALITY
+        line = f"{os.path.basename(path):<40} local {local_ms[-1]:8.1f} ms  quality {quality:.2f}"
+        if args.ocr:
+            start = time.perf_counter()
+            analyze_read(document_bytes, use_cache=False, local_first=False)
+            ocr_ms.append((time.perf_counter() - start) * 1000)
+            line += f"  ocr {ocr_ms[-1]:8.1f} ms"
+        print(line)
+
+    if not paths:
+        print("No PDFs found.")
+        return
+    print(f"\n{len(paths)} documents, {local_ok} served by the text layer "
+          f"(quality >= {LOCAL_TEXT_MIN_QUALITY})")
+    print(f"local: median {statistics.median(local_ms):.1f} ms, mean {statistics.mean(local_ms):.1f} ms")
+    if ocr_ms:
+        print(f"ocr:   median {statistics.median(ocr_ms):.1f} ms, mean {statistics.mean(ocr_ms):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+"""email_prefilter.py classifies recruiter emails locally before they reach the Azure agent.
+
+Compiled keyword/regex rules (and optionally a small TF-IDF + logistic regression model trained on past
+outcomes) label the obvious cases - "thank you for applying" confirmations, templated rejections, interview
+invitations. Only emails below the confidence threshold are sent to ResumeAIUpdater. Labels are the same as
+ResumeAIUpdater.update_process_email_content: 1 moving forward, 0 rejection, 2 not a reply / just applied."""
+
+import json
+import pickle
+import re
+import sys
+
+# (label, confidence, patterns). Patterns are matched case-insensitively against the whole body.
+DEFAULT_RULES = [
+    (0, 0.95, [
+        r"\bregret to inform\b",
+        r"\b(?:will|would|are|have decided to) not (?:be )?(?:moving|move|proceed(?:ing)?) forward\b",
+        r"\bdecided to (?:move|proceed|pursue) (?:forward )?with (?:other|another) candidates?\b",
+        r"\bnot (?:been )?selected\b",
+        r"\bposition has (?:been|now been) filled\b",
+        r"\bno longer (?:being )?considered\b",
+    ]),
+    (0, 0.8, [
+        r"\bunfortunately\b",
+        r"\bafter careful (?:consideration|review)\b",
+    ]),
+    (1, 0.9, [
+        r"\b(?:schedule|set up|book) (?:a|an|your) (?:call|interview|phone screen|chat)\b",
+        r"\binvite you (?:to|for) (?:an? )?(?:interview|call|assessment|onsite)\b",
+        r"\b(?:coding|technical|online) (?:challenge|assessment|test)\b",
+        r"\bshare your availability\b",
+        r"\bmove (?:you )?forward (?:to|with) the next (?:step|stage|round)\b",
+    ]),
+    (1, 0.75, [
+        r"\bnext steps?\b",
+        r"\bavailability\b",
+    ]),
+    (2, 0.95, [
+        r"\b(?:we have|we've) received your application\b",
+        r"\bapplication (?:has been )?(?:received|submitted)\b",
+        r"\bjob alerts?\b",
+        r"\bjobs you may be interested in\b",
+    ]),
+    (2, 0.7, [
+        r"\bunsubscribe\b",
+        r"\bnewsletter\b",
+    ]),
+]
+# Courtesy phrases open confirmations and templated rejections alike ("Thank you for your interest...
+# unfortunately"), so they only decide the label when no rule above matched.
+DEFAULT_COURTESY_RULES = [
+    (2, 0.9, [
+        r"\bthank you for (?:applying|your application|your interest)\b",
+    ]),
+]
+
+
+def _compile_rules(rules):
+    return [(label, confidence, re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE))
+            for label, confidence, patterns in rules]
+
+
+class RuleBasedEmailClassifier:
+    def __init__(self, rules=None, courtesy_rules=None):
+        """
+        Compiles the rule set once.
+
+        Args:
+            rules (list): (label, confidence, [regex, ...]) triples; DEFAULT_RULES when None.
+            courtesy_rules (list): Triples only consulted when none of ``rules`` matched;
+                DEFAULT_COURTESY_RULES when None.
+        """
+        self._rules = _compile_rules(rules or DEFAULT_RULES)
+        self._courtesy_rules = _compile_rules(DEFAULT_COURTESY_RULES if courtesy_rules is None else courtesy_rules)
+
+    def predict(self, body):
+        """
+        Returns the best matching label and its confidence.
+
+        When rules for different labels match (e.g. "unfortunately" and "next steps"), the winner's
+        confidence is reduced by half the runner-up's so ambiguous emails fall below the threshold.
+
+        Returns:
+            tuple: (label, confidence), or (None, 0.0) if no rule matched.
+        """
+        best = {}
+        for label, confidence, regex in self._rules:
+            if confidence > best.get(label, 0.0) and regex.search(body or ""):
+                best[label] = confidence
+        if not best:
+            for label, confidence, regex in self._courtesy_rules:
+                if confidence > best.get(label, 0.0) and regex.search(body or ""):
+                    best[label] = confidence
+        if not best:
+            return None, 0.0
+        ranked = sorted(best.items(), key=lambda item: item[1], reverse=True)
+        label, confidence = ranked[0]
+        if len(ranked) > 1:
+            confidence -= ranked[1][1] / 2
+        return label, confidence
+
+
+class TfidfEmailModel:
+    def __init__(self, max_features=20000):
+        """
+        Small on-CPU TF-IDF + logistic regression classifier trained on previously labeled emails.
+        scikit-learn is only needed when this class is used.
+
+        Args:
+            max_features (int): Vocabulary size of the TF-IDF vectorizer.
+        """
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.pipeline import make_pipeline
+
+        self._pipeline = make_pipeline(
+            TfidfVectorizer(ngram_range=(1, 2), max_features=max_features, sublinear_tf=True),
+            LogisticRegression(max_iter=1000)
+        )
+
+    def train(self, bodies, labels):
+        self._pipeline.fit(bodies, labels)
+        return self
+
+    def predict(self, body):
+        """
+        Returns:
+            tuple: (label, probability of that label)
+        """
+        probabilities = self._pipeline.predict_proba([body or ""])[0]
+        best = probabilities.argmax()
+        return int(self._pipeline.classes_[best]), float(probabilities[best])
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            pickle.dump(self, f)
+
+    @staticmethod
+    def load(path):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+
+class EmailTriage:
+    def __init__(self, agent=None, rules=None, model=None, threshold=0.85):
+        """
+        Local fast path in front of the email classification agent.
+
+        Args:
+            agent (ResumeAIUpdater): Agent used for emails the local classifiers are unsure about; if None,
+                those emails are returned as None.
+            rules (RuleBasedEmailClassifier): Rule classifier; the default rule set when None.
+            model (TfidfEmailModel): Optional trained model consulted when the rules are not confident.
+            threshold (float): Minimum local confidence needed to skip the agent.
+        """
+        self.agent = agent
+        self.rules = rules or RuleBasedEmailClassifier()
+        self.model = model
+        self.threshold = threshold
+        self.stats = {"total": 0, "rules": 0, "model": 0, "agent": 0}
+
+    def predict_locally(self, body):
+        """
+        Returns:
+            tuple: (label, confidence, source) where source is 'rules', 'model' or None when neither is confident.
+        """
+        label, confidence = self.rules.predict(body)
+        if label is not None and confidence >= self.threshold:
+            return label, confidence, "rules"
+        if self.model is not None:
+            label, confidence = self.model.predict(body)
+            if confidence >= self.threshold:
+                return label, confidence, "model"
+        return None, 0.0, None
+
+    def classify(self, body):
+        """
+        Classifies one email body, calling the agent only if the local classifiers are not confident.
+
+        Returns:
+            int or None: Same labels as ResumeAIUpdater.update_process_email_content.
+        """
+        self.stats["total"] += 1
+        label, _, source = self.predict_locally(body)
+        if source is not None:
+            self.stats[source] += 1
+            return label
+        if self.agent is None:
+            return None
+        self.stats["agent"] += 1
+        return self.agent.update_process_email_content(body)
+
+    def classify_many(self, emails, **batch_kwargs):
+        """
+        Classifies (message_id, body) pairs; the ones the local path cannot decide go to the agent
+        together through ResumeAIUpdater.classify_emails_batch.
+
+        Returns:
+            dict: message_id -> label (or None)
+        """
+        results = {}
+        undecided = []
+        for message_id, body in emails:
+            self.stats["total"] += 1
+            label, _, source = self.predict_locally(body)
+            if source is not None:
+                self.stats[source] += 1
+                results[message_id] = label
+            else:
+                undecided.append((message_id, body))
+        if undecided:
+            if self.agent is None:
+                results.update({message_id: None for message_id, _ in undecided})
+            else:
+                self.stats["agent"] += len(undecided)
+                results.update(self.agent.classify_emails_batch(undecided, **batch_kwargs))
+        return results
+
+    def avoided_calls(self):
+        """
+        Returns:
+            dict: Emails handled locally, sent to the agent, and the fraction of agent calls avoided.
+        """
+        local = self.stats["rules"] + self.stats["model"]
+        return {
+            "handled_locally": local,
+            "sent_to_agent": self.stats["agent"],
+            "avoided_ratio": local / self.stats["total"] if self.stats["total"] else 0.0,
+        }
+
+
+def load_labeled_corpus(path):
+    """
+    Loads a JSON-lines corpus of {"body": ..., "label": 0|1|2} records.
+
+    Returns:
+        list: (body, label) pairs.
+    """
+    corpus = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                corpus.append((record["body"], int(record["label"])))
+    return corpus
+
+
+def evaluate(corpus, triage, thresholds=(0.6, 0.7, 0.8, 0.85, 0.9, 0.95)):
+    """
+    Offline evaluation of the local fast path over a labeled corpus; the agent is never called.
+
+    For each threshold it reports coverage (share of emails decided locally, i.e. agent calls avoided),
+    accuracy on the emails decided locally, and a confusion matrix of true -> predicted labels.
+
+    Args:
+        corpus (list): (body, label) pairs, e.g. from load_labeled_corpus().
+        triage (EmailTriage): The triage configuration to evaluate; its threshold is restored afterwards.
+        thresholds (iterable): Confidence thresholds to sweep.
+
+    Returns:
+        list: One dict per threshold.
+    """
+    original_threshold = triage.threshold
+    report = []
+    try:
+        for threshold in thresholds:
+            triage.threshold = threshold
+            decided = correct = 0
+            confusion = {}
+            for body, expected in corpus:
+                label, _, source = triage.predict_locally(body)
+                if source is None:
+                    continue
+                decided += 1
+                correct += label == expected
+                confusion.setdefault(expected, {}).setdefault(label, 0)
+                confusion[expected][label] += 1
+            report.append({
+                "threshold": threshold,
+                "coverage": decided / len(corpus) if corpus else 0.0,
+                "accuracy": correct / decided if decided else None,
+                "decided": decided,
+                "confusion": confusion,
+            })
+    finally:
+        triage.threshold = original_threshold
+    return report
+
+
+if __name__ == "__main__":
+    # Usage: python email_prefilter.py labeled_emails.jsonl [model.pkl]
+    corpus = load_labeled_corpus(sys.argv[1])
+    model = TfidfEmailModel.load(sys.argv[2]) if len(sys.argv) > 2 else None
+    for row in evaluate(corpus, EmailTriage(model=model)):
+        accuracy = f"{row['accuracy']:.3f}" if row["accuracy"] is not None else "n/a"
+        print(f"threshold={row['threshold']:.2f} coverage={row['coverage']:.3f} "
+              f"accuracy={accuracy} confusion={json.dumps(row['confusion'])}")
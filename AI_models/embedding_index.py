@@ -0,0 +1,336 @@
+"""embedding_index.py embeds resume sections and job postings for semantic retrieval. Texts are embedded
+incrementally (only new or changed texts, keyed by their SHA-256), vectors live in a memory-mapped float32 matrix
+with a JSON id map next to it, and search is batched cosine top-k with NumPy or, when hnswlib is installed, an
+HNSW index per id prefix. Uses sentence-transformers when installed and a hashing embedder otherwise."""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+
+DEFAULT_MODEL_NAME = "all-MiniLM-L6-v2"
+DEFAULT_INDEX_DIR = os.environ.get("Embedding_Index_Dir", ".embedding_index")
+RESUME_ID_PREFIX = "resume"
+JOB_ID_PREFIX = "job"
+
+_WORD_RE = re.compile(r"[a-z0-9+#]+(?:\.[a-z0-9]+)*")
+
+
+class HashingEmbedder:
+    def __init__(self, dim=512):
+        """
+        Dependency-free embedder: signed feature hashing of word unigrams and bigrams, L2-normalized.
+        It only captures shared wording, so install sentence-transformers for real semantic matching.
+        """
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+        self._buckets = {}
+
+    def _bucket(self, feature):
+        bucket = self._buckets.get(feature)
+        if bucket is None:
+            hashed = zlib.crc32(feature.encode("utf-8"))
+            bucket = self._buckets[feature] = (hashed % self.dim, 1.0 if hashed & 0x80000000 else -1.0)
+        return bucket
+
+    def embed(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = _WORD_RE.findall((text or "").lower())
+            for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                column, sign = self._bucket(feature)
+                vectors[row, column] += sign
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+class SentenceTransformerEmbedder:
+    def __init__(self, model_name=DEFAULT_MODEL_NAME, batch_size=64):
+        """Local CPU sentence-transformers model; imported here so the package stays optional."""
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = f"sentence-transformers/{model_name}"
+        self.batch_size = batch_size
+
+    def embed(self, texts):
+        return self.model.encode(list(texts), batch_size=self.batch_size, convert_to_numpy=True,
+                                 normalize_embeddings=True).astype(np.float32)
+
+
+def get_default_embedder(model_name=DEFAULT_MODEL_NAME):
+    """sentence-transformers when installed, else HashingEmbedder."""
+    try:
+        return SentenceTransformerEmbedder(model_name)
+    except ImportError:
+        print("sentence-transformers is not installed, using the hashing embedder.")
+        return HashingEmbedder()
+
+
+def _text_hash(text):
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def resume_section_texts(resume, resume_id=RESUME_ID_PREFIX):
+    """
+    Splits a resume JSON (as produced by ResumeAIParser and consumed by ResumeAIUpdater) into
+    separately embedded sections: the summary, each experience entry and each project.
+
+    Returns:
+        list: (section id, text) pairs, e.g. ('resume:experience:0', 'Associate Analyst at ...').
+    """
+    sections = []
+    if resume.get("summary"):
+        sections.append((f"{resume_id}:summary", resume["summary"]))
+    for i, job in enumerate(resume.get("experience") or []):
+        bullets = " ".join(job.get("responsibilities") or [])
+        sections.append((f"{resume_id}:experience:{i}", f"{job.get('title', '')} at {job.get('company', '')}. {bullets}"))
+    for i, project in enumerate(resume.get("projects") or []):
+        sections.append((f"{resume_id}:project:{i}", f"{project.get('title', '')}: {project.get('description', '')}"))
+    return sections
+
+
+def posting_text(posting):
+    requirements = posting.get("job_requirements") or []
+    if isinstance(requirements, list):
+        requirements = " ".join(str(item) for item in requirements)
+    return f"{posting.get('title', '')}. {requirements} {posting.get('job_description', '')}"
+
+
+class EmbeddingIndex:
+    def __init__(self, directory=None, embedder=None, initial_capacity=1024, use_ann=False):
+        """
+        Opens (or creates) an on-disk embedding index.
+
+        Args:
+            directory (str): Holds vectors.npy (the memmap) and index.json (ids, text hashes, embedder name);
+                defaults to Embedding_Index_Dir or '.embedding_index'.
+            embedder: Object with .name, .dim and .embed(texts) -> float32 array of unit vectors;
+                get_default_embedder() when None. Stored vectors from a different embedder are discarded.
+            initial_capacity (int): Rows allocated up front; the file doubles when full.
+            use_ann (bool): Search with an hnswlib HNSW index when hnswlib is installed. One HNSW index is
+                built per search prefix, e.g. over the 'job:' rows only for rank_postings.
+        """
+        self.directory = directory or DEFAULT_INDEX_DIR
+        self.embedder = embedder or get_default_embedder()
+        self.dim = self.embedder.dim
+        self.use_ann = use_ann
+        self.stats = {"embedded": 0, "unchanged": 0}
+        self._lock = threading.RLock()
+        self._ann = {}
+        os.makedirs(self.directory, exist_ok=True)
+        self._vectors_path = os.path.join(self.directory, "vectors.npy")
+        self._meta_path = os.path.join(self.directory, "index.json")
+        self._load(initial_capacity)
+
+    def _load(self, initial_capacity):
+        meta = None
+        if os.path.exists(self._meta_path) and os.path.exists(self._vectors_path):
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("embedder") != self.embedder.name or meta.get("dim") != self.dim:
+                print(f"Embedding index was built with {meta.get('embedder')}, re-embedding with {self.embedder.name}.")
+                meta = None
+        if meta is None:
+            self.ids, self.hashes, capacity = [], {}, max(1, initial_capacity)
+            self._vectors = np.lib.format.open_memmap(self._vectors_path, mode="w+", dtype=np.float32,
+                                                      shape=(capacity, self.dim))
+        else:
+            self.ids, self.hashes = meta["ids"], meta["hashes"]
+            self._vectors = np.load(self._vectors_path, mmap_mode="r+")
+        self._rows = {item_id: row for row, item_id in enumerate(self.ids)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _grow(self, needed):
+        capacity = self._vectors.shape[0]
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        tmp_path = f"{self._vectors_path}.{os.getpid()}.tmp"
+        grown = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(capacity, self.dim))
+        grown[:len(self.ids)] = self._vectors[:len(self.ids)]
+        grown.flush()
+        del grown
+        self._vectors.flush()
+        self._vectors = None
+        os.replace(tmp_path, self._vectors_path)
+        self._vectors = np.load(self._vectors_path, mmap_mode="r+")
+
+    def upsert(self, items, batch_size=256):
+        """
+        Embeds new or changed texts; texts whose SHA-256 is unchanged are skipped.
+
+        Args:
+            items (iterable): (id, text) pairs.
+            batch_size (int): Texts per embedder call.
+
+        Returns:
+            int: Number of texts embedded.
+        """
+        with self._lock:
+            pending = []
+            for item_id, text in items:
+                digest = _text_hash(text)
+                if self.hashes.get(item_id) == digest:
+                    self.stats["unchanged"] += 1
+                    continue
+                pending.append((item_id, text, digest))
+            if not pending:
+                return 0
+            new_ids = list(dict.fromkeys(item_id for item_id, _, _ in pending if item_id not in self._rows))
+            self._grow(len(self.ids) + len(new_ids))
+            for item_id in new_ids:
+                self._rows[item_id] = len(self.ids)
+                self.ids.append(item_id)
+            for start in range(0, len(pending), batch_size):
+                batch = pending[start:start + batch_size]
+                vectors = self.embedder.embed([text for _, text, _ in batch])
+                for (item_id, _, digest), vector in zip(batch, vectors):
+                    self._vectors[self._rows[item_id]] = vector
+                    self.hashes[item_id] = digest
+            self.stats["embedded"] += len(pending)
+            self._ann = {}
+            return len(pending)
+
+    def remove(self, item_ids):
+        """Deletes ids by moving the last row into each freed slot."""
+        with self._lock:
+            for item_id in item_ids:
+                row = self._rows.pop(item_id, None)
+                if row is None:
+                    continue
+                self.hashes.pop(item_id, None)
+                last_id = self.ids.pop()
+                if last_id != item_id:
+                    self._vectors[row] = self._vectors[len(self.ids)]
+                    self.ids[row] = last_id
+                    self._rows[last_id] = row
+            self._ann = {}
+
+    def save(self):
+        """Flushes the vectors and atomically rewrites the id map."""
+        with self._lock:
+            self._vectors.flush()
+            tmp_path = f"{self._meta_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"embedder": self.embedder.name, "dim": self.dim, "ids": self.ids, "hashes": self.hashes}, f)
+            os.replace(tmp_path, self._meta_path)
+
+    def vectors_for(self, item_ids):
+        return np.asarray(self._vectors[[self._rows[item_id] for item_id in item_ids]])
+
+    def _prefix_rows(self, prefix):
+        if prefix is None:
+            return np.arange(len(self.ids))
+        return np.fromiter((row for row, item_id in enumerate(self.ids) if item_id.startswith(prefix)), dtype=np.int64)
+
+    def _ann_index(self, prefix):
+        """HNSW index over the rows matching prefix (all rows for None); labels are positions in the returned rows."""
+        if prefix not in self._ann:
+            import hnswlib
+
+            rows = self._prefix_rows(prefix)
+            ann = hnswlib.Index(space="ip", dim=self.dim)
+            ann.init_index(max_elements=max(len(rows), 1), ef_construction=200, M=16)
+            if len(rows):
+                ann.add_items(np.asarray(self._vectors[rows]), np.arange(len(rows)))
+            ann.set_ef(64)
+            self._ann[prefix] = (ann, rows)
+        return self._ann[prefix]
+
+    def search(self, queries, k=10, prefix=None):
+        """
+        Batched cosine top-k.
+
+        Args:
+            queries: List of query texts, or a (n, dim) array of unit vectors.
+            k (int): Results per query.
+            prefix (str): Only return ids starting with this, e.g. 'job:'.
+
+        Returns:
+            list: One list of (id, score) per query, best first.
+        """
+        with self._lock:
+            if not self.ids:
+                return [[] for _ in range(len(queries))]
+            query_vectors = queries if isinstance(queries, np.ndarray) else self.embedder.embed(list(queries))
+            if self.use_ann:
+                try:
+                    ann, rows = self._ann_index(prefix)
+                except ImportError:
+                    print("hnswlib is not installed, falling back to brute-force search.")
+                    self.use_ann = False
+                else:
+                    if not len(rows):
+                        return [[] for _ in range(len(query_vectors))]
+                    labels, distances = ann.knn_query(query_vectors, k=min(k, len(rows)))
+                    return [[(self.ids[rows[label]], float(1 - distance))
+                             for label, distance in zip(row_labels, row_distances)]
+                            for row_labels, row_distances in zip(labels, distances)]
+            rows = self._prefix_rows(prefix)
+            if not len(rows):
+                return [[] for _ in range(len(query_vectors))]
+            matrix = np.asarray(self._vectors[rows] if prefix is not None else self._vectors[:len(self.ids)])
+            scores = query_vectors @ matrix.T
+            k = min(k, len(rows))
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            results = []
+            for query_scores, candidates in zip(scores, top):
+                ordered = candidates[np.argsort(-query_scores[candidates], kind="stable")]
+                results.append([(self.ids[rows[column]], float(query_scores[column])) for column in ordered])
+            return results
+
+    def add_postings(self, postings):
+        """
+        Embeds job postings under 'job:<id>'.
+
+        Args:
+            postings (list): Dicts with 'id', 'job_requirements', 'job_description' and optionally 'title'.
+
+        Returns:
+            int: Number of postings embedded (unchanged ones are skipped).
+        """
+        return self.upsert((f"{JOB_ID_PREFIX}:{posting['id']}", posting_text(posting)) for posting in postings)
+
+    def rank_postings(self, resume, resume_id=RESUME_ID_PREFIX, k=10):
+        """
+        Ranks indexed postings against a resume by the best-matching resume section.
+
+        Args:
+            resume (dict): Resume JSON.
+            resume_id (str): Prefix of the resume's section ids; sections are upserted under it, and sections
+                of an earlier version of the resume that no longer exist are removed.
+            k (int): Number of postings to return.
+
+        Returns:
+            list: Dicts with 'id' (posting id), 'score' and 'best_section' (the resume section id that
+            matched it best), best first.
+        """
+        sections = resume_section_texts(resume, resume_id)
+        section_ids = [section_id for section_id, _ in sections]
+        section_id_re = re.compile(rf"{re.escape(resume_id)}:(?:summary|experience:\d+|project:\d+)")
+        current = set(section_ids)
+        with self._lock:
+            stale = [item_id for item_id in self.ids if item_id not in current and section_id_re.fullmatch(item_id)]
+        if stale:
+            self.remove(stale)
+        if not sections:
+            return []
+        self.upsert(sections)
+        hits = self.search(self.vectors_for(section_ids), k=k, prefix=f"{JOB_ID_PREFIX}:")
+        best = {}
+        for section_id, section_hits in zip(section_ids, hits):
+            for item_id, score in section_hits:
+                if item_id not in best or score > best[item_id][0]:
+                    best[item_id] = (score, section_id)
+        ranked = sorted(best.items(), key=lambda item: -item[1][0])[:k]
+        return [{"id": item_id[len(JOB_ID_PREFIX) + 1:], "score": round(score, 4), "best_section": section_id}
+                for item_id, (score, section_id) in ranked]
@@ -0,0 +1,321 @@
+"""instrumentation.py records where a run spends its time and money: wall-clock spans around agent runs, OCR,
+Gmail requests and PDF builds, request and token counters, payload sizes, cache hits and errors. Metrics live in a
+process-wide registry and can be exported as Prometheus text or JSON lines, or summarized locally with
+p50/p95/p99 per stage. Worker processes (e.g. render_many) record into their own registry and send what each
+job recorded back with its result, where it is merged into the parent's registry."""
+
+import functools
+import inspect
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Latency/size samples kept per series for percentiles; older samples are dropped, counts and sums are not.
+DEFAULT_MAX_SAMPLES = 10000
+METRIC_PREFIX = "ai_models"
+
+
+def _series_key(name, labels):
+    return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _series_name(name, label_items):
+    if not label_items:
+        return name
+    return name + "{" + ",".join(f"{key}={value}" for key, value in label_items) + "}"
+
+
+def _percentile(sorted_values, quantile):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(quantile * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _prometheus_name(name):
+    return METRIC_PREFIX + "_" + "".join(char if char.isalnum() else "_" for char in name)
+
+
+def _prometheus_labels(label_items, extra=()):
+    items = list(label_items) + list(extra)
+    if not items:
+        return ""
+    escaped = (key + '="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+               for key, value in items)
+    return "{" + ",".join(escaped) + "}"
+
+
+class Metrics:
+    def __init__(self, max_samples=DEFAULT_MAX_SAMPLES, event_log=None, enabled=True):
+        """
+        Thread-safe registry of spans, counters and observed values, each keyed by name and labels.
+
+        Args:
+            max_samples (int): Samples kept per span/observation series for percentiles.
+            event_log (str): Optional JSON-lines file every span and observation is appended to as it happens.
+            enabled (bool): When False, recording calls return immediately.
+        """
+        self.max_samples = max_samples
+        self.enabled = enabled
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._distributions = {}
+        self._event_log_path = event_log
+        self._event_log = None
+
+    @contextmanager
+    def span(self, name, **labels):
+        """
+        Times the enclosed block; an exception escaping it is counted as an error of the span and re-raised.
+
+        Args:
+            name (str): Stage name such as 'agent.run' or 'pdf.doc_build'.
+            **labels: Extra dimensions, e.g. task='resume_update'.
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            self._record("span", name, labels, time.perf_counter() - start, error)
+
+    def timed(self, name=None, **labels):
+        """
+        Decorator form of span() for plain and async functions; the span name defaults to module.qualname.
+        """
+        def decorate(fn):
+            span_name = name or f"{fn.__module__}.{fn.__qualname__}"
+            if inspect.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(span_name, **labels):
+                        return await fn(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name, **labels):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def count(self, name, value=1, **labels):
+        """Adds value to a counter, e.g. count('agent.requests', task='email')."""
+        if not self.enabled:
+            return
+        key = _series_key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        """Records one value of a distribution such as a payload size in bytes or a prompt size in tokens."""
+        if self.enabled:
+            self._record("value", name, labels, value, None)
+
+    def record_usage(self, usage, **labels):
+        """
+        Adds a run's token usage (run.usage of an Azure agent run) to the 'agent.tokens' counters.
+
+        Args:
+            usage: Object or dict with prompt_tokens / completion_tokens / total_tokens; None is ignored.
+        """
+        if usage is None:
+            return
+        for kind in ("prompt_tokens", "completion_tokens", "total_tokens"):
+            value = usage.get(kind) if isinstance(usage, dict) else getattr(usage, kind, None)
+            if value:
+                self.count("agent.tokens", value, kind=kind.replace("_tokens", ""), **labels)
+
+    def _record(self, kind, name, labels, value, error):
+        key = _series_key(name, labels)
+        with self._lock:
+            series = self._distributions.get(key)
+            if series is None:
+                series = self._distributions[key] = {"kind": kind, "count": 0, "errors": 0, "sum": 0.0,
+                                                     "max": 0.0, "samples": deque(maxlen=self.max_samples)}
+            series["count"] += 1
+            series["sum"] += value
+            series["max"] = max(series["max"], value)
+            series["samples"].append(value)
+            if error is not None:
+                series["errors"] += 1
+                error_key = _series_key(name + ".errors", dict(labels, error=error))
+                self._counters[error_key] = self._counters.get(error_key, 0) + 1
+            if self._event_log_path:
+                self._write_event({"ts": round(time.time(), 6), "kind": kind, "name": name, "labels": dict(key[1]),
+                                   "value": round(value, 6), "error": error})
+
+    def _write_event(self, event):
+        # Called with self._lock held.
+        if self._event_log is None:
+            self._event_log = open(self._event_log_path, "a", encoding="utf-8", buffering=1)
+        self._event_log.write(json.dumps(event) + "\n")
+
+    def summary(self):
+        """
+        Returns:
+            dict: Series name ('agent.run{task=email}') -> count, errors, total, mean, p50, p95, p99 and max.
+            Span values are in seconds.
+        """
+        with self._lock:
+            snapshot = [(key, dict(series, samples=sorted(series["samples"])))
+                        for key, series in self._distributions.items()]
+        result = {}
+        for (name, label_items), series in sorted(snapshot, key=lambda entry: entry[0]):
+            samples = series["samples"]
+            result[_series_name(name, label_items)] = {
+                "kind": series["kind"], "count": series["count"], "errors": series["errors"],
+                "total": series["sum"], "mean": series["sum"] / series["count"] if series["count"] else 0.0,
+                "p50": _percentile(samples, 0.50), "p95": _percentile(samples, 0.95),
+                "p99": _percentile(samples, 0.99), "max": series["max"],
+            }
+        return result
+
+    def counters(self):
+        """
+        Returns:
+            dict: Series name -> counter value.
+        """
+        with self._lock:
+            return {_series_name(name, label_items): value
+                    for (name, label_items), value in sorted(self._counters.items())}
+
+    def report(self):
+        """
+        Text table of every span (milliseconds) and observed value, followed by the counters.
+        """
+        lines = [f"{'stage':<52}{'count':>8}{'errors':>8}{'p50':>11}{'p95':>11}{'p99':>11}{'total':>12}"]
+        for series_name, stats in self.summary().items():
+            scale, unit = (1000.0, "ms") if stats["kind"] == "span" else (1.0, "")
+            values = [f"{stats[key] * scale:>9.1f}{unit:<2}" for key in ("p50", "p95", "p99")]
+            total = f"{stats['total']:>10.2f}s" if stats["kind"] == "span" else f"{stats['total']:>11.0f}"
+            lines.append(f"{series_name:<52}{stats['count']:>8}{stats['errors']:>8}{''.join(values)}{total:>12}")
+        for series_name, value in self.counters().items():
+            lines.append(f"{series_name:<52}{value:>8g}")
+        return "\n".join(lines)
+
+    def to_prometheus(self):
+        """
+        Renders every series in the Prometheus text exposition format: spans and observations as summaries
+        (quantiles 0.5/0.95/0.99, _sum, _count), counters as '<name>_total'.
+
+        Returns:
+            str: The exposition text, e.g. for a /metrics endpoint or a node-exporter textfile.
+        """
+        with self._lock:
+            distributions = [(key, series["kind"], series["count"], series["sum"], sorted(series["samples"]))
+                             for key, series in self._distributions.items()]
+            counters = list(self._counters.items())
+        lines, typed = [], set()
+        for (name, label_items), kind, count, total, samples in sorted(distributions, key=lambda entry: entry[0]):
+            metric = _prometheus_name(name) + ("_seconds" if kind == "span" else "")
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} summary")
+            for quantile in (0.5, 0.95, 0.99):
+                labels = _prometheus_labels(label_items, [("quantile", str(quantile))])
+                lines.append(f"{metric}{labels} {_percentile(samples, quantile):.6g}")
+            lines.append(f"{metric}_sum{_prometheus_labels(label_items)} {total:.6g}")
+            lines.append(f"{metric}_count{_prometheus_labels(label_items)} {count}")
+        for (name, label_items), value in sorted(counters):
+            metric = _prometheus_name(name) + "_total"
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{_prometheus_labels(label_items)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Writes to_prometheus() atomically, so a textfile collector never reads a half-written file."""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+    def write_jsonl(self, path):
+        """
+        Appends one JSON line per series (summary stats for spans and observations, value for counters),
+        stamped with the export time, so repeated exports build a history that is easy to load with pandas.
+        """
+        exported_at = round(time.time(), 3)
+        with open(path, "a", encoding="utf-8") as f:
+            for series_name, stats in self.summary().items():
+                f.write(json.dumps(dict(stats, ts=exported_at, series=series_name)) + "\n")
+            for series_name, value in self.counters().items():
+                f.write(json.dumps({"ts": exported_at, "series": series_name, "kind": "counter", "value": value}) + "\n")
+
+    def drain(self):
+        """
+        Returns everything recorded since the last drain (or reset) as plain, picklable data and clears the
+        registry, e.g. to send a worker process's metrics back to its parent with the job result.
+
+        Returns:
+            dict: 'counters' [(key, value)] and 'distributions' [(key, kind, count, errors, sum, max, samples)].
+        """
+        with self._lock:
+            delta = {"counters": list(self._counters.items()),
+                     "distributions": [(key, series["kind"], series["count"], series["errors"], series["sum"],
+                                        series["max"], list(series["samples"]))
+                                       for key, series in self._distributions.items()]}
+            self._counters.clear()
+            self._distributions.clear()
+        return delta
+
+    def merge(self, delta):
+        """Adds the output of another registry's drain() to this one; None is ignored."""
+        if not delta or not self.enabled:
+            return
+        with self._lock:
+            for key, value in delta["counters"]:
+                self._counters[key] = self._counters.get(key, 0) + value
+            for key, kind, count, errors, total, maximum, samples in delta["distributions"]:
+                series = self._distributions.get(key)
+                if series is None:
+                    series = self._distributions[key] = {"kind": kind, "count": 0, "errors": 0, "sum": 0.0,
+                                                         "max": 0.0, "samples": deque(maxlen=self.max_samples)}
+                series["count"] += count
+                series["errors"] += errors
+                series["sum"] += total
+                series["max"] = max(series["max"], maximum)
+                series["samples"].extend(samples)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._distributions.clear()
+            self.started_at = time.time()
+
+    def close(self):
+        with self._lock:
+            if self._event_log is not None:
+                self._event_log.close()
+                self._event_log = None
+
+
+# Process-wide registry used by the modules of AI_models. Metrics_Event_Log enables the live JSON-lines event
+# log and Metrics_Disabled=1 turns recording off.
+metrics = Metrics(event_log=os.environ.get("Metrics_Event_Log") or None,
+                  enabled=os.environ.get("Metrics_Disabled", "") not in ("1", "true", "True"))
+
+
+def get_metrics():
+    return metrics
+
+
+span = metrics.span
+timed = metrics.timed
+count = metrics.count
+observe = metrics.observe
+record_usage = metrics.record_usage
@@ -0,0 +1,208 @@
+"""job_matcher.py ranks job postings against a resume locally, so update_resume_with_ai is only called for the best
+matches. Postings are indexed once into a sparse BM25 (or TF-IDF) matrix with NumPy/SciPy; scoring a resume against
+every posting is a single sparse matrix-vector product."""
+
+import re
+from collections import Counter
+from functools import lru_cache
+
+import numpy as np
+from scipy import sparse
+
+from skill_taxonomy import get_default_taxonomy
+
+# Keeps tokens like 'c++', 'c#', '.net', 'node.js' and 'ms-excel' whole.
+_TOKEN_RE = re.compile(r"[a-z0-9.#+][a-z0-9.#+\-]*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or our the this to we will with you your "
+    "experience work working team ability strong knowledge skills using use used".split())
+
+# How much more a resume term counts when it comes from skills rather than free text.
+SKILL_WEIGHT = 3.0
+SKILL_FIELDS = ("programming", "bi_tools")
+
+
+@lru_cache(maxsize=65536)
+def _plain_tokens(text):
+    # The stretches between two skill mentions repeat a lot ('experience with', ', '), hence the cache.
+    tokens = (token.strip(".-") for token in _TOKEN_RE.findall(text.lower()))
+    # Single characters left outside a skill match are noise such as the 'r' and 'd' of 'R&D', and so are
+    # numbers ('94' of '94%', '2019', '3.7', '5+', '40k'); tokens like 'ec2' or 's3' that merely contain
+    # a digit are kept.
+    return tuple(token for token in tokens
+                 if len(token) > 1 and not token[0].isdigit() and token not in _STOPWORDS)
+
+
+def tokenize(text):
+    """
+    Lower-cased tokens with stopwords and trailing punctuation removed. Skill aliases found by the default
+    SkillTaxonomy become one token for their canonical skill, so 'MS-Excel' and 'Excel' both give 'excel'
+    and 'Power BI' gives 'power bi'.
+    """
+    text = text or ""
+    tokens, position = [], 0
+    for start, end, canonical in get_default_taxonomy().spans(text):
+        tokens.extend(_plain_tokens(text[position:start]))
+        tokens.append(canonical.casefold())
+        position = end
+    tokens.extend(_plain_tokens(text[position:]))
+    return tokens
+
+
+def skill_tokens(skill):
+    """Tokens of one skills-list entry, normalized case-insensitively ('r' -> 'R', 'Tableau/Spotfire' -> both)."""
+    return [token for name in get_default_taxonomy().canonical(skill) for token in tokenize(name)]
+
+
+def _posting_text(posting):
+    requirements = posting.get("job_requirements") or []
+    if isinstance(requirements, list):
+        requirements = " ".join(str(item) for item in requirements)
+    return f"{posting.get('title', '')} {requirements} {posting.get('job_description', '')}"
+
+
+def resume_skills(resume):
+    """Skill phrases from skills.programming and skills.bi_tools, in resume order without duplicates."""
+    skills = resume.get("skills") or {}
+    return list(dict.fromkeys(skill for field in SKILL_FIELDS for skill in skills.get(field) or [] if skill))
+
+
+def resume_terms(resume):
+    """
+    Weighted query terms of a resume: skills count SKILL_WEIGHT times, while the summary, experience
+    bullets and project descriptions count once per occurrence.
+
+    Returns:
+        Counter: term -> weight
+    """
+    terms = Counter()
+    for skill in resume_skills(resume):
+        for token in skill_tokens(skill):
+            terms[token] += SKILL_WEIGHT
+    texts = [resume.get("summary") or ""]
+    for job in resume.get("experience") or []:
+        texts.extend(job.get("responsibilities") or [])
+    texts.extend(project.get("description") or "" for project in resume.get("projects") or [])
+    for text in texts:
+        terms.update(tokenize(text))
+    return terms
+
+
+class JobIndex:
+    def __init__(self, scoring="bm25", k1=1.5, b=0.75):
+        """
+        Sparse index of job postings.
+
+        Args:
+            scoring (str): 'bm25', or 'tfidf' for cosine similarity of log-scaled, L2-normalized TF-IDF vectors.
+            k1 (float): BM25 term-frequency saturation.
+            b (float): BM25 document-length normalization.
+        """
+        if scoring not in ("bm25", "tfidf"):
+            raise ValueError("scoring must be 'bm25' or 'tfidf'")
+        self.scoring = scoring
+        self.k1 = k1
+        self.b = b
+        self.postings = []
+        self.vocabulary = {}
+        self.weights = None
+
+    def build(self, postings):
+        """
+        Indexes postings, replacing any previous contents.
+
+        Args:
+            postings (list): Dicts with 'id', 'job_requirements' (list or str), 'job_description' and
+                optionally 'title', i.e. the inputs of ResumeAIUpdater.update_resume_with_ai.
+
+        Returns:
+            JobIndex: self, for chaining.
+        """
+        self.postings = list(postings)
+        vocabulary = {}
+        rows, cols, counts = [], [], []
+        for row, posting in enumerate(self.postings):
+            for token, count in Counter(tokenize(_posting_text(posting))).items():
+                rows.append(row)
+                cols.append(vocabulary.setdefault(token, len(vocabulary)))
+                counts.append(count)
+        self.vocabulary = vocabulary
+        tf = sparse.csr_matrix((np.asarray(counts, dtype=np.float32), (rows, cols)),
+                               shape=(len(self.postings), len(vocabulary)))
+        self.weights = self._weigh(tf)
+        return self
+
+    def _weigh(self, tf):
+        n_docs = max(tf.shape[0], 1)
+        df = np.bincount(tf.indices, minlength=tf.shape[1]).astype(np.float32)
+        # tf.data is laid out row by row, so the per-row values below line up with it.
+        row_of_value = np.repeat(np.arange(tf.shape[0]), np.diff(tf.indptr))
+        weights = tf.copy()
+        if self.scoring == "bm25":
+            idf = np.log1p((n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+            doc_len = np.asarray(tf.sum(axis=1)).ravel()
+            norm = self.k1 * (1 - self.b + self.b * doc_len / max(doc_len.mean(), 1.0))
+            weights.data = idf[tf.indices] * tf.data * (self.k1 + 1) / (tf.data + norm[row_of_value])
+        else:
+            self._idf = (np.log((1 + n_docs) / (1 + df)) + 1).astype(np.float32)
+            weights.data = (1 + np.log(tf.data)) * self._idf[tf.indices]
+            row_norms = np.sqrt(np.asarray(weights.multiply(weights).sum(axis=1)).ravel())
+            weights.data /= np.maximum(row_norms, 1e-12)[row_of_value]
+        return weights.tocsr()
+
+    def _query_vector(self, terms):
+        query = np.zeros(len(self.vocabulary), dtype=np.float32)
+        for term, weight in terms.items():
+            column = self.vocabulary.get(term)
+            if column is not None:
+                query[column] = weight
+        if self.scoring == "tfidf":
+            query *= self._idf
+            query /= max(np.linalg.norm(query), 1e-12)
+        return query
+
+    def score(self, resume):
+        """
+        Scores every posting against the resume.
+
+        Returns:
+            numpy.ndarray: One score per posting, in posting order.
+        """
+        return self.weights @ self._query_vector(resume_terms(resume))
+
+    def top_k(self, resume, k=10):
+        """
+        Returns the k best-matching postings with an explanation of which resume skills matched.
+
+        Args:
+            resume (dict): Resume JSON (as produced by ResumeAIParser).
+            k (int): Number of postings to return.
+
+        Returns:
+            list: Dicts with 'id', 'score', 'posting', 'matched_skills' ([(skill, contribution)], largest
+            first) and 'missing_skills' (resume skills the posting does not mention), best match first.
+        """
+        if not self.postings:
+            return []
+        scores = self.score(resume)
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        skills = [(skill, [self.vocabulary.get(token) for token in skill_tokens(skill)])
+                  for skill in resume_skills(resume)]
+        return [self._explain(int(row), float(scores[row]), skills) for row in best]
+
+    def _explain(self, row, score, skills):
+        start, end = self.weights.indptr[row], self.weights.indptr[row + 1]
+        row_weights = dict(zip(self.weights.indices[start:end].tolist(), self.weights.data[start:end].tolist()))
+        matched, missing = [], []
+        for skill, columns in skills:
+            # A multi-word skill ('Power BI') only matches when every token appears in the posting.
+            if columns and all(column in row_weights for column in columns):
+                matched.append((skill, round(sum(row_weights[column] for column in columns), 4)))
+            else:
+                missing.append(skill)
+        matched.sort(key=lambda item: -item[1])
+        posting = self.postings[row]
+        return {"id": posting.get("id", row), "score": round(score, 4), "posting": posting,
+                "matched_skills": matched, "missing_skills": missing}
@@ -0,0 +1,263 @@
+"""local_resume_parser.py turns raw resume text (from resume_understander.analyze_read) into the resume JSON schema
+with compiled regexes and a section segmenter, and scores its confidence per field. ResumeAIParser only asks the
+agent for the fields scored below its threshold."""
+
+import re
+
+from resume_schema import RESUME_FIELDS, normalize_resume
+
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE_RE = re.compile(r"(?<![\w/])\+?\d[\d\s().-]{6,}\d(?![\w/])")
+LINKEDIN_RE = re.compile(r"(?:https?://)?(?:[a-z]{2,3}\.)?linkedin\.com/in/[\w%-]+/?", re.IGNORECASE)
+GITHUB_RE = re.compile(r"(?:https?://)?(?:www\.)?github\.com/[\w-]+/?", re.IGNORECASE)
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+_DATE = rf"(?:{_MONTH}\s+\d{{4}}|\d{{1,2}}/\d{{4}}|\d{{4}})"
+DATE_RANGE_RE = re.compile(rf"{_DATE}\s*(?:-|–|—|to)\s*(?:{_DATE}|present|current|now)", re.IGNORECASE)
+GPA_RE = re.compile(r"\b(?:GPA|CGPA|CPI)\s*[:\-]?\s*([\d.]+\s*(?:/\s*[\d.]+)?)", re.IGNORECASE)
+DEGREE_RE = re.compile(
+    r"\b(?:b\.?\s?e|b\.?\s?tech|b\.?\s?sc|b\.?\s?s|b\.?\s?a|bachelor'?s?|m\.?\s?tech|m\.?\s?sc|m\.?\s?s|m\.?\s?e|"
+    r"master'?s?|mba|ph\.?\s?d|doctor(?:ate)?|associate'?s? degree|diploma)\b\.?", re.IGNORECASE)
+# Bullet glyphs, including the private-use and DEL characters some PDF fonts extract for "•".
+BULLET_RE = re.compile(r"^\s*(?:[\u2022\u00b7\u25aa\u25cf\u25e6\uf0b7\x7f*\-\u2013]|\d+[.)])\s*")
+_LABEL_RE = re.compile(r"^([A-Za-z][A-Za-z /&]{1,40}):\s*(.*)$")
+# Words that make a short header line a job title rather than e.g. a tagline or location.
+TITLE_WORDS_RE = re.compile(
+    r"\b(?:analyst|engineer|developer|scientist|manager|consultant|designer|architect|administrator|specialist|"
+    r"intern|associate|lead|officer|coordinator|director|programmer|researcher|technician|strategist)s?\b",
+    re.IGNORECASE)
+
+# Heading aliases (lower case, without trailing colon) -> resume field.
+SECTION_HEADINGS = {
+    "summary": "summary", "professional summary": "summary", "profile": "summary", "objective": "summary",
+    "about me": "summary", "career objective": "summary",
+    "education": "education", "academic background": "education", "academics": "education",
+    "skills": "skills", "technical skills": "skills", "core competencies": "skills", "key skills": "skills",
+    "experience": "experience", "work experience": "experience", "professional experience": "experience",
+    "employment history": "experience", "work history": "experience", "internships": "experience",
+    "projects": "projects", "academic projects": "projects", "personal projects": "projects",
+    "certifications": "certifications", "certificates": "certifications", "licenses & certifications": "certifications",
+    "licenses and certifications": "certifications",
+}
+SKILL_LABELS = {
+    "programming": "programming", "programming languages": "programming", "languages": "programming",
+    "technical skills": "programming", "technologies": "programming", "tools": "programming",
+    "bi tools": "bi_tools", "business intelligence": "bi_tools", "visualization": "bi_tools",
+    "visualization tools": "bi_tools",
+    "relevant courses": "relevant_courses", "relevant coursework": "relevant_courses",
+    "coursework": "relevant_courses", "courses": "relevant_courses",
+}
+
+
+def _split_list(text):
+    """Splits on commas, semicolons, pipes and bullets, but not inside parentheses."""
+    items, depth, current = [], 0, []
+    for char in text:
+        depth += char == "("
+        depth -= char == ")" and depth > 0
+        if char in ",;|•" and depth == 0:
+            items.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    items.append("".join(current))
+    return [re.sub(r"\s+", " ", item).strip(" .") for item in items if item.strip(" .")]
+
+
+def _heading_of(line):
+    """Returns (field, inline content) if the line is a section heading, else (None, None)."""
+    match = re.match(r"^\s*([A-Za-z &]{3,40}?)\s*:?\s*(?::\s*(.*))?$", line)
+    if match and match.group(1).lower() in SECTION_HEADINGS:
+        return SECTION_HEADINGS[match.group(1).lower()], match.group(2) or ""
+    match = re.match(r"^\s*([A-Za-z &]{3,40}?)\s*:\s*(.+)$", line)
+    if match and match.group(1).isupper() and match.group(1).lower() in SECTION_HEADINGS:
+        return SECTION_HEADINGS[match.group(1).lower()], match.group(2)
+    return None, None
+
+
+def segment_sections(text):
+    """
+    Splits resume text into sections by recognised headings.
+
+    Returns:
+        dict: field -> list of lines; lines before the first heading are under 'header'.
+    """
+    sections = {"header": []}
+    current = "header"
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+        field, inline = _heading_of(line)
+        if field is not None:
+            current = field
+            sections.setdefault(current, [])
+            if inline:
+                sections[current].append(inline)
+            continue
+        sections.setdefault(current, []).append(raw_line.rstrip())
+    return sections
+
+
+class LocalResumeParser:
+    def parse(self, text):
+        """
+        Parses resume text into the resume schema.
+
+        Args:
+            text (str): Raw resume text.
+
+        Returns:
+            tuple: (resume dict normalized to the schema, {field: confidence between 0 and 1},
+                    {field: section text} for handing low-confidence sections to the agent)
+        """
+        sections = segment_sections(text or "")
+        resume, confidence = {}, {field: 0.0 for field in RESUME_FIELDS}
+
+        self._parse_header(sections.get("header", []), text or "", resume, confidence)
+        for field in ("summary", "education", "skills", "experience", "projects", "certifications"):
+            lines = sections.get(field)
+            if lines:
+                getattr(self, f"_parse_{field}")(lines, resume, confidence)
+
+        section_text = {field: "\n".join(lines) for field, lines in sections.items()}
+        return normalize_resume(resume), confidence, section_text
+
+    @staticmethod
+    def _parse_header(lines, text, resume, confidence):
+        contact = {}
+        for field, regex in (("email", EMAIL_RE), ("linkedin", LINKEDIN_RE), ("github", GITHUB_RE)):
+            match = regex.search(text)
+            contact[field] = match.group(0) if match else ""
+        phone = PHONE_RE.search("\n".join(lines) or text)
+        contact["phone"] = phone.group(0).strip() if phone else ""
+        resume["contact"] = contact
+        # Profile URLs are often only link targets and missing from extracted text, so email or phone is enough.
+        confidence["contact"] = 0.9 if contact["email"] or contact["phone"] else 0.0
+
+        candidates = []
+        for line in lines:
+            cleaned = line.strip()
+            if not cleaned or EMAIL_RE.search(cleaned) or PHONE_RE.search(cleaned) or ":" in cleaned:
+                continue
+            if cleaned.lower() in ("linkedin", "github", "portfolio"):
+                continue
+            candidates.append(cleaned)
+        if candidates:
+            resume["name"] = candidates[0]
+            words = candidates[0].split()
+            confidence["name"] = 0.9 if 2 <= len(words) <= 5 and all(w[:1].isalpha() for w in words) else 0.5
+        if len(candidates) > 1:
+            title = candidates[1]
+            resume["title"] = title
+            short = len(title.split()) <= 8 and not any(char.isdigit() for char in title)
+            confidence["title"] = 0.9 if short and TITLE_WORDS_RE.search(title) else (0.6 if short else 0.3)
+
+    @staticmethod
+    def _parse_summary(lines, resume, confidence):
+        resume["summary"] = " ".join(line.strip() for line in lines)
+        confidence["summary"] = 0.9
+
+    @staticmethod
+    def _parse_education(lines, resume, confidence):
+        entries = []
+        for line in (line.strip() for line in lines):
+            if DEGREE_RE.search(line) and not GPA_RE.search(line) and not (entries and not entries[-1]["institution"]):
+                entries.append({"degree": line, "institution": "", "duration": "", "gpa": ""})
+                continue
+            if not entries:
+                continue
+            entry = entries[-1]
+            gpa = GPA_RE.search(line)
+            dates = DATE_RANGE_RE.search(line)
+            if gpa:
+                entry["gpa"] = gpa.group(1).replace(" ", "")
+            if dates:
+                entry["duration"] = dates.group(0)
+            remainder = DATE_RANGE_RE.sub("", GPA_RE.sub("", line)).strip(" |-")
+            if remainder and not entry["duration"] and not entry["gpa"]:
+                entry["institution"] = f"{entry['institution']} {remainder}".strip()
+        for entry in entries:
+            entry["institution"] = entry["institution"].strip(" ,")
+        resume["education"] = entries
+        complete = entries and all(e["degree"] and e["institution"] and e["duration"] for e in entries)
+        confidence["education"] = 0.85 if complete else (0.4 if entries else 0.0)
+
+    @staticmethod
+    def _parse_skills(lines, resume, confidence):
+        skills, labeled = {}, False
+        merged = []
+        for line in (line.strip() for line in lines):
+            label = _LABEL_RE.match(line)
+            if label or not merged:
+                merged.append(line)
+            else:
+                # A wrapped line continues the previous labeled list.
+                merged[-1] = f"{merged[-1]} {line}"
+        for line in merged:
+            label = _LABEL_RE.match(line)
+            key = SKILL_LABELS.get(label.group(1).strip().lower()) if label else None
+            if key:
+                labeled = True
+                skills.setdefault(key, []).extend(_split_list(label.group(2)))
+            else:
+                skills.setdefault("programming", []).extend(_split_list(label.group(2) if label else line))
+        resume["skills"] = skills
+        confidence["skills"] = 0.9 if labeled else 0.6
+
+    @staticmethod
+    def _parse_experience(lines, resume, confidence):
+        lines = [line.strip() for line in lines if line.strip()]
+        date_rows = [i for i, line in enumerate(lines) if DATE_RANGE_RE.search(line)]
+        entries = []
+        for n, row in enumerate(date_rows):
+            dates = DATE_RANGE_RE.search(lines[row]).group(0)
+            same_line = DATE_RANGE_RE.sub("", lines[row]).strip(" ,|-")
+            header = ([same_line] if same_line else [])
+            previous_end = date_rows[n - 1] + 1 if n else 0
+            needed = 2 - len(header)
+            header = lines[max(previous_end, row - needed):row] + header
+            next_start = date_rows[n + 1] - (2 - bool(DATE_RANGE_RE.sub("", lines[date_rows[n + 1]]).strip(" ,|-"))) \
+                if n + 1 < len(date_rows) else len(lines)
+            company_line = header[0] if header else ""
+            company, _, location = company_line.partition(", ") if company_line.count(",") else (company_line, "", "")
+            entries.append({
+                "company": company,
+                "location": location,
+                "title": header[1] if len(header) > 1 else "",
+                "duration": dates,
+                "responsibilities": [BULLET_RE.sub("", line) for line in lines[row + 1:next_start]],
+            })
+        resume["experience"] = entries
+        # Entry boundaries are guessed from date lines, so the section is only as trustworthy as its weakest
+        # entry: each has its dates, and gains for a company, a title and at least one bullet.
+        scores = [0.35 + 0.2 * bool(entry["company"]) + 0.2 * bool(entry["title"]) + 0.2 * bool(entry["responsibilities"])
+                  for entry in entries]
+        confidence["experience"] = round(min(scores), 2) if scores else 0.0
+
+    @staticmethod
+    def _parse_projects(lines, resume, confidence):
+        entries = []
+        for line in (line.strip() for line in lines):
+            if line.endswith(":") and len(line.split()) <= 12:
+                entries.append({"title": line.rstrip(":").strip(), "description": ""})
+            elif entries:
+                entries[-1]["description"] = f"{entries[-1]['description']} {BULLET_RE.sub('', line)}".strip()
+        resume["projects"] = entries
+        confidence["projects"] = 0.85 if entries and all(e["description"] for e in entries) else 0.3
+
+    @staticmethod
+    def _parse_certifications(lines, resume, confidence):
+        if sum(1 for line in lines if BULLET_RE.match(line)) > 1:
+            # One certification per bullet; lines without a bullet wrap the previous one.
+            entries = []
+            for line in (line.strip() for line in lines):
+                if BULLET_RE.match(line) or not entries:
+                    entries.append(BULLET_RE.sub("", line))
+                else:
+                    entries[-1] = f"{entries[-1]} {line}"
+            items = [re.sub(r"\s+", " ", entry).strip(" .") for entry in entries if entry.strip(" .")]
+        else:
+            # A comma separated list that may wrap over several lines.
+            items = _split_list(" ".join(line.strip() for line in lines))
+        resume["certifications"] = items
+        confidence["certifications"] = 0.85 if items else 0.0
@@ -0,0 +1,90 @@
+"""pdf_text_extract.py pulls the embedded text layer out of digitally generated PDFs (for example ResumeBuilder
+output) and scores its quality, so resume_understander.analyze_read only sends scanned or image-only documents
+to Azure OCR. Uses pypdf, or pdfminer.six when pypdf is not installed."""
+
+import io
+import re
+
+# Text layers scoring at least this much are used instead of cloud OCR.
+LOCAL_TEXT_MIN_QUALITY = 0.6
+# A text-based resume page carries far more characters than this; scans usually have none at all.
+MIN_CHARS_PER_PAGE = 200
+
+_WORD_RE = re.compile(r"\S+")
+_REAL_WORD_RE = re.compile(r"^[^\W\d_]{2,}[\W]*$")
+# pdfminer emits (cid:NN) for glyphs it cannot map back to characters.
+_CID_RE = re.compile(r"\(cid:\d+\)")
+
+
+def is_pdf(document_bytes):
+    return document_bytes[:1024].lstrip().startswith(b"%PDF")
+
+
+def extract_text_layer(document_bytes):
+    """
+    Extracts the embedded text of a PDF.
+
+    Args:
+        document_bytes (bytes): The PDF file.
+
+    Returns:
+        tuple: (text, page_count), or (None, 0) when the bytes are not a readable PDF or no PDF
+        library is installed.
+    """
+    if not is_pdf(document_bytes):
+        return None, 0
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        PdfReader = None
+    try:
+        if PdfReader is not None:
+            reader = PdfReader(io.BytesIO(document_bytes))
+            pages = [page.extract_text() or "" for page in reader.pages]
+            return "\n".join(pages), len(pages)
+
+        from pdfminer.high_level import extract_text
+        from pdfminer.pdfpage import PDFPage
+        page_count = sum(1 for _ in PDFPage.get_pages(io.BytesIO(document_bytes)))
+        return extract_text(io.BytesIO(document_bytes)), page_count
+    except ImportError:
+        return None, 0
+    except Exception as e:
+        print(f"Could not read the PDF text layer: {e}")
+        return None, 0
+
+
+def score_text_quality(text, page_count):
+    """
+    Scores how usable an extracted text layer is, from 0 (empty or garbage) to 1.
+
+    The score combines text density per page, the share of word-like tokens and the absence of
+    unmapped glyphs. Scanned or image-only documents have little or no text and score near 0.
+
+    Returns:
+        float: The quality score.
+    """
+    if not text or not page_count:
+        return 0.0
+    stripped = text.strip()
+    if not stripped:
+        return 0.0
+    density = min(1.0, len(stripped) / (MIN_CHARS_PER_PAGE * page_count))
+    tokens = _WORD_RE.findall(stripped)
+    word_ratio = sum(1 for token in tokens if _REAL_WORD_RE.match(token)) / len(tokens)
+    bad_glyphs = stripped.count("�") + len(_CID_RE.findall(stripped))
+    glyph_penalty = min(1.0, bad_glyphs * 20 / len(stripped))
+    # Prose and resumes are roughly 60-80% dictionary-like words; scale so 0.6 already counts as clean.
+    return round(density * min(1.0, word_ratio / 0.6) * (1.0 - glyph_penalty), 3)
+
+
+def extract_local_text(document_bytes, min_quality=LOCAL_TEXT_MIN_QUALITY):
+    """
+    Returns the PDF's own text if it is good enough to skip cloud OCR.
+
+    Returns:
+        tuple: (text or None, quality score)
+    """
+    text, page_count = extract_text_layer(document_bytes)
+    quality = score_text_quality(text, page_count)
+    return (text if quality >= min_quality else None), quality
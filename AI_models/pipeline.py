@@ -0,0 +1,354 @@
+"""pipeline.py runs the whole flow for a batch of job postings: OCR -> parse -> tailor -> render -> notify.
+Stages are connected by bounded queues, so a slow stage throttles the stages feeding it. The OCR, parse, tailor and
+notify stages are I/O-bound and run on thread pools, while PDF rendering runs in worker processes. Every finished
+stage is checkpointed in SQLite, so a restarted run picks each item up where it stopped instead of calling the
+agents again."""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from instrumentation import get_metrics, span
+from resume_pdf import _init_render_worker, _render_job
+
+STAGES = ("ocr", "parse", "tailor", "render", "notify")
+DEFAULT_WORKERS = {"ocr": 2, "parse": 4, "tailor": 8, "render": None, "notify": 2}
+# Queue marker telling a stage worker that no more items will arrive.
+_STOP = object()
+
+
+class PipelineCheckpoint:
+    def __init__(self, db_path="pipeline_checkpoint.sqlite3"):
+        """
+        SQLite record of the last stage each item finished and what the finished stages produced
+        (OCR text, parsed resume, tailored resume, PDF path).
+
+        Args:
+            db_path (str): Path of the SQLite file, or ":memory:" for a throwaway store.
+        """
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pipeline_items ("
+            "item_id TEXT PRIMARY KEY, stage TEXT NOT NULL, state TEXT NOT NULL, error TEXT, updated_at REAL NOT NULL)"
+        )
+        # Parsed resumes by SHA-256 of their text: many postings share one resume, which is parsed once.
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS parsed_resumes (text_hash TEXT PRIMARY KEY, resume TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def load(self, item_id):
+        """
+        Returns:
+            tuple: (last finished stage or None, state dict, last error or None)
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT stage, state, error FROM pipeline_items WHERE item_id = ?", (str(item_id),)
+            ).fetchone()
+        if row is None:
+            return None, {}, None
+        return row[0], json.loads(row[1]), row[2]
+
+    def save(self, item_id, stage, state, error=None):
+        """
+        Records that ``stage`` is the last stage the item finished; ``error`` is the failure of the stage after it.
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pipeline_items (item_id, stage, state, error, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (str(item_id), stage or "", json.dumps(state, ensure_ascii=False), error, time.time())
+            )
+            self._conn.commit()
+
+    def get_parsed(self, text_hash):
+        with self._lock:
+            row = self._conn.execute("SELECT resume FROM parsed_resumes WHERE text_hash = ?", (text_hash,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set_parsed(self, text_hash, resume):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO parsed_resumes (text_hash, resume) VALUES (?, ?)",
+                               (text_hash, json.dumps(resume, ensure_ascii=False)))
+            self._conn.commit()
+
+    def summary(self):
+        """
+        Returns:
+            dict: Number of items per last finished stage, plus 'with_errors'.
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT stage, COUNT(*), COUNT(error) FROM pipeline_items GROUP BY stage").fetchall()
+        counts = {stage or "none": count for stage, count, _ in rows}
+        counts["with_errors"] = sum(errors for _, _, errors in rows)
+        return counts
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class JobPipeline:
+    def __init__(self, checkpoint=None, ocr=None, parse=None, tailor=None, notify=None, output_dir="tailored_resumes",
+                 workers=None, queue_size=16, max_retries=2, backoff_base=1.0, history=None, user_id=None):
+        """
+        Staged OCR -> parse -> tailor -> render -> notify runner.
+
+        Each stage function can be replaced, e.g. to reuse configured clients or to run without Azure.
+        The defaults are resume_understander.analyze_read, ResumeAIParser.parse_resume_hybrid,
+        ResumeAIUpdater.update_resume_with_ai and a print.
+
+        Args:
+            checkpoint (PipelineCheckpoint): Where progress is stored; 'pipeline_checkpoint.sqlite3' if None.
+            ocr (callable): ocr(item) -> resume text.
+            parse (callable): parse(text) -> resume dict.
+            tailor (callable): tailor(item, resume) -> tailored resume dict (None counts as a failure).
+            notify (callable): notify(item, pdf_path), called once the PDF exists.
+            output_dir (str): Directory the PDFs are written to, one '<item id>.pdf' per item.
+            workers (dict): Workers per stage, merged over DEFAULT_WORKERS; 'render' is the number of
+                processes and defaults to os.cpu_count().
+            queue_size (int): Capacity of each queue between stages. A full queue blocks the stage (or the
+                caller) feeding it, so memory stays bounded however many items are passed to run().
+            max_retries (int): Retries of a failing stage per item before the item is marked failed.
+            backoff_base (float): First retry delay in seconds, doubled on every retry.
+            history (ApplicationHistory): When given, jobs the user already applied to are skipped before any
+                work, and each notified item is recorded as an application.
+            user_id: The applying user, required with history.
+        """
+        self.checkpoint = checkpoint or PipelineCheckpoint()
+        self.output_dir = output_dir
+        self.workers = dict(DEFAULT_WORKERS, **(workers or {}))
+        self.workers["render"] = self.workers["render"] or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.history = history
+        self.user_id = user_id
+        self._ocr = ocr or self._default_ocr
+        self._parse = parse or self._default_parse
+        self._tailor = tailor or self._default_tailor
+        self._notify = notify or self._default_notify
+        self._parser = None
+        self._updater = None
+        self._clients_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._executor = None
+        self.stats = {stage: {"done": 0, "failed": 0, "retries": 0, "seconds": 0.0} for stage in STAGES}
+
+    @staticmethod
+    def _default_ocr(item):
+        from resume_understander import analyze_read
+        return analyze_read(item["resume"])
+
+    def _default_parse(self, text):
+        with self._clients_lock:
+            if self._parser is None:
+                from resume_Parser import ResumeAIParser
+                self._parser = ResumeAIParser()
+        return self._parser.parse_resume_hybrid(text)
+
+    def _default_tailor(self, item, resume):
+        with self._clients_lock:
+            if self._updater is None:
+                from resume_agent import ResumeAIUpdater
+                self._updater = ResumeAIUpdater()
+        return self._updater.update_resume_with_ai(json.dumps(item.get("job_requirements") or []),
+                                                   json.dumps(item.get("job_description") or ""),
+                                                   json.dumps(resume))
+
+    @staticmethod
+    def _default_notify(item, pdf_path):
+        print(f"Tailored resume for {item.get('title') or item['id']} ready: {pdf_path}")
+
+    def run(self, items):
+        """
+        Runs every item through the remaining stages and blocks until all are finished or failed.
+
+        Items whose checkpoint shows all stages done are skipped. Other items re-enter at the stage after
+        the last one they finished, so OCR, parsing and tailoring are not repeated.
+
+        Args:
+            items (iterable): Dicts with a unique 'id', 'resume' (path or bytes of the resume document),
+                'job_requirements' and 'job_description', and optionally 'company' and 'title'. Can be a
+                long generator; it is consumed as the first stage makes room.
+
+        Returns:
+            dict: 'completed', 'skipped' and 'resumed' counts, 'failed' {item id: 'stage: error'},
+            'elapsed' seconds and the per-stage 'stages' stats.
+        """
+        report = {"completed": 0, "skipped": 0, "resumed": 0, "failed": {}, "elapsed": 0.0}
+        start = time.perf_counter()
+        os.makedirs(self.output_dir, exist_ok=True)
+        queues = {stage: queue.Queue(self.queue_size) for stage in STAGES}
+        handlers = {"ocr": self._run_ocr, "parse": self._run_parse, "tailor": self._run_tailor,
+                    "render": self._run_render, "notify": self._run_notify}
+        threads = []
+        # Render workers are spawned rather than forked: the pool starts its processes lazily, after the stage
+        # threads are running, and a forked child could inherit a lock another thread was holding.
+        with ProcessPoolExecutor(max_workers=self.workers["render"], initializer=_init_render_worker,
+                                 mp_context=multiprocessing.get_context("spawn")) as executor:
+            self._executor = executor
+            for position, stage in enumerate(STAGES):
+                next_stage = STAGES[position + 1] if position + 1 < len(STAGES) else None
+                remaining = [self.workers[stage]]
+                for _ in range(self.workers[stage]):
+                    thread = threading.Thread(target=self._stage_worker, daemon=True,
+                                              args=(stage, handlers[stage], queues, next_stage, remaining, report))
+                    thread.start()
+                    threads.append(thread)
+
+            for item in items:
+                entry_stage, state = self._entry_stage(item)
+                if entry_stage is None:
+                    report["skipped"] += 1
+                    continue
+                if entry_stage != STAGES[0]:
+                    report["resumed"] += 1
+                queues[entry_stage].put((item, state))
+            # Resumed items went straight into later queues before any stop marker, so none of them is lost.
+            for _ in range(self.workers[STAGES[0]]):
+                queues[STAGES[0]].put(_STOP)
+            for thread in threads:
+                thread.join()
+            self._executor = None
+
+        report["elapsed"] = time.perf_counter() - start
+        report["stages"] = {stage: dict(values) for stage, values in self.stats.items()}
+        return report
+
+    def _entry_stage(self, item):
+        """Returns (stage to start at, checkpointed state), or (None, state) when the item needs no work."""
+        if self.history is not None and self.history.has_applied(
+                self.user_id, item.get("company"), item.get("title"), item.get("job_description")):
+            print(f"Already applied to {item.get('title') or item['id']}, skipping.")
+            return None, {}
+        finished, state, _ = self.checkpoint.load(item["id"])
+        if finished == STAGES[-1]:
+            return None, state
+        if finished == "render" and not os.path.exists(state.get("pdf", "")):
+            finished = "tailor"
+        position = STAGES.index(finished) + 1 if finished in STAGES else 0
+        return STAGES[position], state
+
+    def _stage_worker(self, stage, handler, queues, next_stage, remaining, report):
+        inbox = queues[stage]
+        try:
+            while True:
+                entry = inbox.get()
+                if entry is _STOP:
+                    break
+                item, state = entry
+                try:
+                    succeeded = self._attempt(stage, handler, item, state, report)
+                except Exception as e:
+                    # A dead worker would leave its share of the queue, and the stop markers, unconsumed.
+                    print(f"Item {item['id']} failed at {stage}: {type(e).__name__}: {e}")
+                    with self._stats_lock:
+                        report["failed"][item["id"]] = f"{stage}: {type(e).__name__}: {e}"
+                    continue
+                if succeeded:
+                    if next_stage is not None:
+                        queues[next_stage].put((item, state))
+                    else:
+                        with self._stats_lock:
+                            report["completed"] += 1
+        finally:
+            # The last worker of a stage to exit tells every worker of the next stage to stop.
+            with self._stats_lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last and next_stage is not None:
+                for _ in range(self.workers[next_stage]):
+                    queues[next_stage].put(_STOP)
+
+    def _attempt(self, stage, handler, item, state, report):
+        """
+        Runs one stage for one item with retries and checkpoints the outcome. Returns True on success.
+        A checkpoint that cannot be written fails the item; the stats and report are updated either way.
+        """
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                with span("pipeline.stage", stage=stage):
+                    handler(item, state)
+                error = None
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            elapsed = time.perf_counter() - started
+            if error is None or attempt >= self.max_retries:
+                break
+            with self._stats_lock:
+                self.stats[stage]["seconds"] += elapsed
+                self.stats[stage]["retries"] += 1
+            time.sleep(self.backoff_base * 2 ** attempt)
+            attempt += 1
+
+        try:
+            if error is None:
+                self.checkpoint.save(item["id"], stage, state)
+            else:
+                print(f"Item {item['id']} failed at {stage}: {error}")
+                previous = STAGES[STAGES.index(stage) - 1] if stage != STAGES[0] else None
+                self.checkpoint.save(item["id"], previous, state, error=f"{stage}: {error}")
+        except Exception as e:
+            print(f"Could not checkpoint item {item['id']} after {stage}: {type(e).__name__}: {e}")
+            error = error or f"checkpoint: {type(e).__name__}: {e}"
+        finally:
+            with self._stats_lock:
+                self.stats[stage]["seconds"] += elapsed
+                if error is None:
+                    self.stats[stage]["done"] += 1
+                else:
+                    self.stats[stage]["failed"] += 1
+                    report["failed"][item["id"]] = f"{stage}: {error}"
+        return error is None
+
+    def _run_ocr(self, item, state):
+        state["text"] = self._ocr(item)
+
+    def _run_parse(self, item, state):
+        text_hash = hashlib.sha256(state["text"].encode("utf-8")).hexdigest()
+        resume = self.checkpoint.get_parsed(text_hash)
+        if resume is None:
+            resume = self._parse(state["text"])
+            if not isinstance(resume, dict):
+                raise ValueError("the parser returned no resume")
+            self.checkpoint.set_parsed(text_hash, resume)
+        state["resume"] = resume
+
+    def _run_tailor(self, item, state):
+        tailored = self._tailor(item, state["resume"])
+        if not isinstance(tailored, dict):
+            raise ValueError("the update agent returned no resume")
+        state["tailored"] = tailored
+
+    def _run_render(self, item, state):
+        pdf_path = os.path.join(self.output_dir, f"{item['id']}.pdf")
+        _, _, error, worker_metrics = self._executor.submit(_render_job, 0, state["tailored"], pdf_path).result()
+        get_metrics().merge(worker_metrics)
+        if error is not None:
+            raise RuntimeError(error)
+        state["pdf"] = pdf_path
+
+    def _run_notify(self, item, state):
+        self._notify(item, state["pdf"])
+        if self.history is not None:
+            self.history.record_application(self.user_id, item.get("company"), item.get("title"),
+                                            item.get("job_description"), resume_name=state["pdf"])
+
+
+# Example usage:
+# if __name__ == "__main__":
+#     from job_matcher import JobIndex
+#     best = JobIndex().build(postings).top_k(resume, k=20)
+#     items = ({"id": match["id"], "resume": "../resume.pdf", **match["posting"]} for match in best)
+#     report = JobPipeline(output_dir="tailored_resumes").run(items)
+#     print(report)
@@ -0,0 +1,205 @@
+"""prompt_builder.py builds the compact, token-budgeted prompt for ResumeAIUpdater.update_resume_with_ai. Only the
+sections the agent is allowed to edit are sent, job descriptions lose their EEO and benefits boilerplate, and the
+agent's partial reply is merged back into the full resume locally."""
+
+import copy
+import json
+import re
+
+# Rough characters-per-token ratio used to size prompts without a tokenizer.
+CHARS_PER_TOKEN = 4
+# The only resume sections the update agent may change; everything else stays local.
+EDITABLE_SECTIONS = ("summary", "skills", "projects")
+DEFAULT_MAX_PROMPT_TOKENS = 3000
+
+# Legal and compensation statements that are boilerplate wherever they appear. Every alternative is anchored on
+# word boundaries so e.g. "eeo" does not match inside another word.
+_BOILERPLATE_RE = re.compile(
+    r"\b(?:equal (?:employment )?opportunity|eeo|without regard to|regardless of (?:race|gender|age|sex)|"
+    r"protected (?:veteran|characteristic|status|class)|affirmative action|reasonable accommodations?|e-verify|"
+    r"pay transparency|(?:salary|pay|compensation) range|employee assistance program)\b", re.IGNORECASE)
+# Benefit terms are also ordinary job content ("analyze dental claims", "PTO analytics"), so a sentence holding
+# one is only dropped in a benefits context: after a _BENEFITS_PHRASE_RE match in the same paragraph.
+_BENEFIT_TERM_RE = re.compile(
+    r"\b(?:paid time off|pto|dental|vision insurance|medical insurance|health insurance|parental leave|"
+    r"tuition reimbursement|wellness (?:program|stipend)s?)\b|\b401\(?k\)?", re.IGNORECASE)
+_BENEFITS_PHRASE_RE = re.compile(
+    r"\b(?:we offer|we provide|(?:benefits|perks) (?:include|including|such as)|(?:our|full|comprehensive) "
+    r"benefits|benefits package|you(?:'ll| will) (?:get|receive|enjoy)|eligible for)\b", re.IGNORECASE)
+_BOILERPLATE_HEADING_RE = re.compile(
+    r"^(?:our |what we |why )?(?:benefits|perks|offer|join us|equal (?:employment )?opportunity[\w\s]*|eeo[\w\s]*|"
+    r"compensation(?: and benefits)?|total rewards)\s*:?\s*$", re.IGNORECASE)
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def estimate_tokens(text):
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _compact(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _is_heading(line):
+    line = line.strip()
+    return bool(line) and len(line.split()) <= 6 and not line.endswith(".") and (line.endswith(":") or line.istitle())
+
+
+def strip_boilerplate(job_description):
+    """
+    Removes EEO statements, benefits and compensation blurbs from a job description.
+
+    Paragraphs under a boilerplate heading ('Benefits', 'What we offer', 'Equal Opportunity Employer', ...)
+    are dropped up to the next heading. Elsewhere, EEO and compensation sentences are dropped, and sentences
+    naming a benefit (dental, PTO, ...) only once the paragraph has said it is listing benefits ('we offer',
+    'benefits include', ...), so postings about e.g. health insurance data keep their requirements.
+
+    Args:
+        job_description (str): The job description text.
+
+    Returns:
+        str: The description with whitespace collapsed per sentence.
+    """
+    kept, skipping = [], False
+    for paragraph in re.split(r"\n\s*\n", job_description or ""):
+        lines = [line.strip() for line in paragraph.strip().splitlines() if line.strip()]
+        if not lines:
+            continue
+        if _BOILERPLATE_HEADING_RE.match(lines[0]):
+            skipping = True
+            continue
+        if skipping and not _is_heading(lines[0]):
+            continue
+        skipping = False
+        benefits_context = False
+        for sentence in (" ".join(part.split()) for part in _SENTENCE_RE.split("\n".join(lines))):
+            introduces_benefits = bool(_BENEFITS_PHRASE_RE.search(sentence))
+            benefits_context = benefits_context or introduces_benefits
+            if not sentence or _BOILERPLATE_RE.search(sentence) or (introduces_benefits and sentence.endswith(":")) \
+                    or (benefits_context and _BENEFIT_TERM_RE.search(sentence)):
+                continue
+            kept.append(sentence)
+    return "\n".join(kept)
+
+
+class UpdatePromptBuilder:
+    def __init__(self, max_prompt_tokens=DEFAULT_MAX_PROMPT_TOKENS):
+        """
+        Builds update prompts within a token budget and keeps totals of the tokens saved.
+
+        Args:
+            max_prompt_tokens (int): Estimated token budget per prompt. The job description is cut sentence
+                by sentence from the end, then the requirements list, until the prompt fits. The editable
+                resume sections are always sent in full, so a prompt can still end up over budget.
+        """
+        self.max_prompt_tokens = max_prompt_tokens
+        self.stats = {"prompts": 0, "prompt_tokens": 0, "full_prompt_tokens": 0, "saved_tokens": 0, "over_budget": 0}
+
+    @staticmethod
+    def _instructions():
+        return (
+            "Given the following job requirements, job description, and the editable sections of my resume "
+            "in JSON format, update the 'resume' by incorporating relevant keywords from the "
+            "'job_description' and 'job_requirements' into 'summary', the 'projects' descriptions and 'skills'. "
+            "'missing_keywords', when present, lists job skills the resume does not mention yet; work in only "
+            "those the existing experience and projects support. "
+            "Return ONLY a valid JSON object with a single 'resume' key holding the same keys as the input resume. "
+            "Do not include any additional text or formatting outside the JSON.\n\n"
+        )
+
+    @staticmethod
+    def full_prompt(job_requirements, job_description, resume):
+        """The uncompacted prompt (whole resume, indent=2) used before this builder, for savings reports."""
+        input_data = {"job_requirements": job_requirements, "job_description": job_description, "resume": resume}
+        return UpdatePromptBuilder._instructions() + json.dumps(input_data, indent=2)
+
+    def build(self, job_requirements, job_description, resume, missing_keywords=None, measure_savings=True):
+        """
+        Args:
+            job_requirements: Parsed job requirements (list of strings).
+            job_description: Parsed job description (string).
+            resume (dict): The full resume.
+            missing_keywords (list): Job skills the resume lacks (see skill_taxonomy), sent so the agent
+                does not have to work them out itself.
+            measure_savings (bool): Also render the full prompt to compute the tokens saved. When False,
+                'full_prompt_tokens' and 'saved_tokens' are None and left out of the totals.
+
+        Returns:
+            tuple: (prompt, {'prompt_tokens', 'full_prompt_tokens', 'saved_tokens'}) for this call.
+        """
+        editable = {section: resume[section] for section in EDITABLE_SECTIONS if section in resume}
+        requirements = list(job_requirements) if isinstance(job_requirements, list) else job_requirements
+        if isinstance(job_description, str):
+            sentences = strip_boilerplate(job_description).split("\n")
+        else:
+            sentences = [_compact(job_description)]
+
+        def render():
+            payload = {"job_requirements": requirements, "job_description": "\n".join(sentences), "resume": editable}
+            if missing_keywords:
+                payload["missing_keywords"] = list(missing_keywords)
+            return self._instructions() + _compact(payload)
+
+        prompt = render()
+        # At least one sentence and one requirement are always kept.
+        while estimate_tokens(prompt) > self.max_prompt_tokens and (len(sentences) > 1 or
+                                                                    (isinstance(requirements, list) and len(requirements) > 1)):
+            if len(sentences) > 1:
+                sentences.pop()
+            else:
+                requirements.pop()
+            prompt = render()
+
+        usage = {"prompt_tokens": estimate_tokens(prompt), "full_prompt_tokens": None, "saved_tokens": None}
+        self.stats["prompts"] += 1
+        self.stats["over_budget"] += usage["prompt_tokens"] > self.max_prompt_tokens
+        self.stats["prompt_tokens"] += usage["prompt_tokens"]
+        if measure_savings:
+            usage["full_prompt_tokens"] = estimate_tokens(self.full_prompt(job_requirements, job_description, resume))
+            usage["saved_tokens"] = usage["full_prompt_tokens"] - usage["prompt_tokens"]
+            self.stats["full_prompt_tokens"] += usage["full_prompt_tokens"]
+            self.stats["saved_tokens"] += usage["saved_tokens"]
+        return prompt, usage
+
+
+def merge_update(resume, updated_sections, keep_unmatched_projects=True):
+    """
+    Applies the agent's partial result to a copy of the full resume.
+
+    Only EDITABLE_SECTIONS the agent actually returned are taken. Skills are merged per category and
+    projects by title (falling back to position), so fields the agent dropped keep their values.
+
+    Args:
+        resume (dict): The full original resume.
+        updated_sections (dict): The agent's 'resume' object.
+        keep_unmatched_projects (bool): Append original projects the agent left out after the ones it
+            returned; pass False when the agent is meant to remove projects.
+
+    Returns:
+        dict: The merged resume.
+    """
+    merged = copy.deepcopy(resume)
+    if isinstance(updated_sections.get("summary"), str):
+        merged["summary"] = updated_sections["summary"]
+    if isinstance(updated_sections.get("skills"), dict):
+        merged["skills"] = dict(merged.get("skills") or {}, **updated_sections["skills"])
+    if isinstance(updated_sections.get("projects"), list):
+        original = [project for project in merged.get("projects") or [] if isinstance(project, dict)]
+        by_title = {project.get("title"): index for index, project in enumerate(original)}
+        returned = [project for project in updated_sections["projects"] if isinstance(project, dict)]
+        returned_titles = {project.get("title") for project in returned}
+        projects, used = [], set()
+        for index, project in enumerate(returned):
+            match = by_title.get(project.get("title"))
+            # A renamed project takes the place of the original at its position, unless that one was returned too.
+            if match is None and index < len(original) and original[index].get("title") not in returned_titles:
+                match = index
+            if match is not None and match not in used:
+                used.add(match)
+                projects.append(dict(original[match], **project))
+            else:
+                projects.append(project)
+        if keep_unmatched_projects:
+            projects.extend(project for index, project in enumerate(original) if index not in used)
+        merged["projects"] = projects
+    return merged
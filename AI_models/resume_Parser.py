@@ -1,88 +1,183 @@
 import json
 import re
 import os
-from azure.ai.projects import AIProjectClient
-from azure.identity import DefaultAzureCredential
-from resume_pdf import ResumeBuilder  # Assuming this is the function to create PDF resumes
+from agent_client import send_message, send_message_async, create_async_credential, create_async_project_client, AsyncThreadManager, LazyAgentConnection
+from agent_scheduler import AgentCallScheduler
+from agent_response import AgentResponseHandler
+from local_resume_parser import LocalResumeParser
+from resume_schema import normalize_resume, validate_resume
+from instrumentation import count, span, timed
 import dotenv
 
 dotenv.load_dotenv()
 
-class ResumeAIParser:
-    def __init__(self, connection_string=os.environ.get("Parser_Connection_String"), agent_id=os.environ.get("Parser_Agent_ID")):
+class ResumeAIParser(LazyAgentConnection):
+    def __init__(self, connection_string=None, agent_id=None):
         """
-        Initializes the ResumeAIParser with Azure AI Project Client.
+        Initializes the ResumeAIParser. The Azure AI Project Client and credential are created on the
+        first agent call (see agent_client.LazyAgentConnection), so construction makes no network calls.
 
         Args:
-            connection_string (str): The connection string for the AI Project Client.
-            agent_id (str): The ID of the AI agent to use for resume updates.
+            connection_string (str): The connection string for the AI Project Client; defaults to Parser_Connection_String.
+            agent_id (str): The ID of the AI agent to use for resume parsing; defaults to Parser_Agent_ID.
         """
-        self.project_client = AIProjectClient.from_connection_string(
-            credential=DefaultAzureCredential(),
-            conn_str=connection_string
-        )
-        self.agent_id = agent_id
-        self.agent = self.project_client.agents.get_agent(self.agent_id)
-
+        self.connection_string = connection_string or os.environ.get("Parser_Connection_String")
+        self.agent_id = agent_id or os.environ.get("Parser_Agent_ID")
+        self._async_project_client = None
+        self._async_credential = None
+        self._default_scheduler = None
+        self.response_handler = AgentResponseHandler()
+        self._async_thread_manager = None
+
+    @timed("resume_parser.parse")
     def parse_resume_with_ai(self, resume):
         """
-        Updates the resume JSON by incorporating relevant keywords from job requirements and description
-        using an Azure AI agent.
+        Sends the raw resume text to the parser agent, which turns it into the resume JSON
+        schema consumed by ResumeBuilder.
 
         Args:
-            job_requirements_json (str): JSON string of job requirements (list of strings).
-            job_description_json (str): JSON string of the job description (string).
-            resume_json (str): JSON string of the original resume data.
+            resume (str): The resume text, e.g. from resume_understander.analyze_read().
 
         Returns:
-            dict: The updated resume data as a Python dictionary, or None if an error occurs.
+            str: The agent's raw reply (expected to be the resume JSON), or None if there was no reply.
         """
-        input_data = {
-            "resume": resume
-        }
-
-        json_input_content = json.dumps(input_data, indent=2)
-
-        thread = self.project_client.agents.create_thread()
-        message = self.project_client.agents.create_message(
-            thread_id=thread.id,
-            role="user",
-            content=(
-                "Just follow instruction mentioned and don't add any '```json' or '```' in the response.\n"
-                f"{json_input_content}"
-            )
-        )
-
         print("Sending message to agent and processing run...")
-        run = self.project_client.agents.create_and_process_run(
-            thread_id=thread.id,
-            agent_id=self.agent.id
-        )
+        message_content = send_message(self.project_client, self.agent_id, self._build_parse_prompt(resume),
+                                       self.thread_manager, "resume_parse")
         print("Run completed. Retrieving messages...")
-
-        messages_list_response = self.project_client.agents.list_messages(thread_id=thread.id)
-        print(messages_list_response.data)
-        updated_resume = None
-        if not messages_list_response.data:
+        if message_content is None:
             print("No messages found in the thread after run completion.")
-        else:
-            for message_obj in messages_list_response.data:
-                message_role = getattr(message_obj, 'role', 'unknown_role_from_message_obj')
-                message_content = ""
-                if hasattr(message_obj, 'content') and message_obj.content:
-                    for content_part in message_obj.content:
-                        if getattr(content_part, 'type', None) == 'text':
-                            text_value_dict = getattr(content_part, 'text', {})
-                            message_content = getattr(text_value_dict, 'value', '')
-                            break
+        return message_content
 
-                if message_role == 'assistant':
-                    
-                    return message_content
+    @timed("resume_parser.parse_hybrid")
+    def parse_resume_hybrid(self, resume, min_confidence=0.8):
+        """
+        Parses the resume text locally and asks the parser agent only for the fields the local
+        parser could not fill with at least min_confidence.
 
+        Args:
+            resume (str): The resume text, e.g. from resume_understander.analyze_read().
+            min_confidence (float): Fields scored below this by LocalResumeParser are sent to the agent.
 
+        Returns:
+            dict: The resume JSON, normalized to the schema consumed by ResumeBuilder.
+        """
+        with span("resume_parser.local_parse"):
+            parsed, confidence, section_text = LocalResumeParser().parse(resume)
+        low_confidence = [field for field, score in confidence.items() if score < min_confidence]
+        count("resume_parser.fields", len(confidence) - len(low_confidence), source="local")
+        count("resume_parser.fields", len(low_confidence), source="agent")
+        if not low_confidence:
+            print("Resume parsed locally; no agent call needed.")
+            return parsed
+
+        print(f"Asking the agent for low-confidence fields: {', '.join(low_confidence)}")
+        message_content = send_message(self.project_client, self.agent_id,
+                                       self._build_fields_prompt(resume, low_confidence, section_text),
+                                       self.thread_manager, "resume_fields")
+        agent_fields = self.response_handler.parse(message_content)
+        if not isinstance(agent_fields, dict):
+            print("Could not decode the agent reply, keeping the local parse.")
+            agent_fields = {}
+        # The agent sometimes nests its answer the way it does for full parses: {"resume": {...}}.
+        if isinstance(agent_fields.get("resume"), dict) and not any(field in agent_fields for field in low_confidence):
+            agent_fields = agent_fields["resume"]
+        returned = [field for field in low_confidence if field in agent_fields]
+        count("resume_parser.agent_fields_returned", len(returned))
+        if agent_fields and not returned:
+            print(f"Agent reply held none of the requested fields ({', '.join(sorted(agent_fields))}), "
+                  f"keeping the local parse.")
+
+        # Keep local values for high-confidence fields; the agent only fills the ones it was asked for.
+        merged = dict(parsed, **{field: agent_fields[field] for field in returned})
+        problems = validate_resume(merged)
+        if problems:
+            print(f"Filling schema defaults for: {'; '.join(problems)}")
+        return normalize_resume(merged)
+
+    def parse_resume_to_json(self, resume):
+        """
+        parse_resume_with_ai followed by JSON extraction, repair and schema validation. A second agent
+        run is only made when the first reply cannot be repaired.
 
+        Args:
+            resume (str): The resume text, e.g. from resume_understander.analyze_read().
 
+        Returns:
+            dict or None: The resume JSON normalized to the schema, or None if no usable reply was received.
+        """
+        return self.response_handler.parse_resume(self.parse_resume_with_ai(resume), unwrap_key="resume",
+                                                  retry=lambda: self.parse_resume_with_ai(resume))
+
+    async def parse_resume_with_ai_async(self, resume, scheduler=None):
+        """
+        asyncio variant of parse_resume_with_ai built on the async Azure AI Projects client.
+
+        Args:
+            resume (str): The resume text, e.g. from resume_understander.analyze_read().
+            scheduler (AgentCallScheduler): Shared scheduler bounding concurrency; a default one is used if None.
+
+        Returns:
+            str: The agent's raw reply (expected to be the resume JSON), or None if there was no reply.
+        """
+        if scheduler is None:
+            if self._default_scheduler is None:
+                self._default_scheduler = AgentCallScheduler()
+            scheduler = self._default_scheduler
+        if self._async_project_client is None:
+            self._async_credential = create_async_credential()
+            self._async_project_client = create_async_project_client(self.connection_string, self._async_credential)
+            self._async_thread_manager = AsyncThreadManager(self._async_project_client)
+        client, thread_manager = self._async_project_client, self._async_thread_manager
+        content = self._build_parse_prompt(resume)
+        return await scheduler.run(lambda: send_message_async(client, self.agent_id, content, thread_manager, "resume_parse"))
+
+    def close(self):
+        """Deletes the idle agent threads of the synchronous client."""
+        if getattr(self, "_thread_manager", None) is not None:
+            self._thread_manager.close()
+
+    async def aclose(self):
+        """
+        Deletes idle async agent threads and closes the async Azure AI Project client and its credential
+        if they were created.
+        """
+        if self._async_thread_manager is not None:
+            await self._async_thread_manager.aclose()
+            self._async_thread_manager = None
+        if self._async_project_client is not None:
+            await self._async_project_client.close()
+            self._async_project_client = None
+        if self._async_credential is not None:
+            await self._async_credential.close()
+            self._async_credential = None
+
+    @staticmethod
+    def _build_fields_prompt(resume, fields, section_text):
+        # Send the matching sections when the segmenter found them, otherwise the whole text.
+        sections = [section_text[field] for field in fields if section_text.get(field)]
+        header_fields = {"name", "title", "contact"}
+        if header_fields & set(fields) and section_text.get("header"):
+            sections.insert(0, section_text["header"])
+        missing_section = any(field not in header_fields and not section_text.get(field) for field in fields)
+        input_data = {
+            "resume": resume if missing_section or not sections else "\n\n".join(sections),
+            "fields": fields,
+        }
+        return (
+            "Just follow instruction mentioned and don't add any '```json' or '```' in the response. "
+            "Return a JSON object with only the keys listed in 'fields'.\n"
+            f"{json.dumps(input_data, indent=2)}"
+        )
 
+    @staticmethod
+    def _build_parse_prompt(resume):
+        input_data = {
+            "resume": resume
+        }
 
-    
+        json_input_content = json.dumps(input_data, indent=2)
+        return (
+            "Just follow instruction mentioned and don't add any '```json' or '```' in the response.\n"
+            f"{json_input_content}"
+        )
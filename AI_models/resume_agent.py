@@ -1,86 +1,251 @@
 """resume_agent.py which uses Azure AI to analyze resumes and update them based on job requirements and descriptions.
 which is key in updating and send the json resume to the agent for updating. and send the result to resume_pdf.py to create a PDF resume. in well formatted template"""
 
+import asyncio
 import json
-from azure.ai.projects import AIProjectClient
-from azure.identity import DefaultAzureCredential
-from resume_pdf import ResumeBuilder  # Assuming this is the function to create PDF resumes
+import re
+from agent_client import send_message, send_message_async, create_async_credential, create_async_project_client, AsyncThreadManager, LazyAgentConnection
+from agent_scheduler import AgentCallScheduler
+from agent_response import AgentResponseHandler
+from resume_cache import TailoredResumeCache, make_cache_key
+from prompt_builder import CHARS_PER_TOKEN, UpdatePromptBuilder, merge_update
+from skill_taxonomy import get_default_taxonomy
+from instrumentation import count, get_metrics, observe, timed
 import os
 import dotenv
 dotenv.load_dotenv()
 
-class ResumeAIUpdater:
-    def __init__(self, connection_string=os.environ.get("Updating_Connection_String"), agent_id=os.environ.get("Updating_Agent_ID")):
+EMAIL_LABELS = (0, 1, 2)
+# Part of the tailored-resume cache key; bump it whenever the update prompt changes.
+UPDATE_PROMPT_VERSION = 3
+
+
+class ResumeAIUpdater(LazyAgentConnection):
+    def __init__(self, connection_string=None, agent_id=None, cache=None, max_prompt_tokens=3000,
+                 async_project_client=None):
         """
-        Initializes the ResumeAIUpdater with Azure AI Project Client.
+        Initializes the ResumeAIUpdater. The Azure AI Project Client and credential are created on the
+        first agent call (see agent_client.LazyAgentConnection), so construction makes no network calls.
 
         Args:
-            connection_string (str): The connection string for the AI Project Client.
-            agent_id (str): The ID of the AI agent to use for resume updates.
+            connection_string (str): The connection string for the AI Project Client; defaults to Updating_Connection_String.
+            agent_id (str): The ID of the AI agent to use for resume updates; defaults to Updating_Agent_ID.
+            cache (TailoredResumeCache): Optional cache of tailored resumes; identical requests skip the agent.
+            max_prompt_tokens (int): Estimated token budget of each update prompt (see prompt_builder).
+            async_project_client: An existing async AI Project Client (e.g. a mock); created on the first
+                async call when None.
+
+        Agent replies are parsed by self.response_handler, whose stats show how often repair saved a re-run.
+        Agent threads are recycled per task type by self.thread_manager; call close() (or aclose()) when done
+        so idle threads are deleted.
         """
-        self.project_client = AIProjectClient.from_connection_string(
-            credential=DefaultAzureCredential(),
-            conn_str=connection_string
-        )
-        self.agent_id = agent_id
-        self.agent = self.project_client.agents.get_agent(self.agent_id)
+        self.connection_string = connection_string or os.environ.get("Updating_Connection_String")
+        self.agent_id = agent_id or os.environ.get("Updating_Agent_ID")
+        self._async_project_client = async_project_client
+        self._async_credential = None
+        self._default_scheduler = None
+        self.cache = cache
+        self.response_handler = AgentResponseHandler()
+        self.prompt_builder = UpdatePromptBuilder(max_prompt_tokens)
+        self._async_thread_manager = None
 
 
+    @timed("resume_agent.classify_email")
     def update_process_email_content(self, body):
-      """
-      Sends the provided message body to the Azure AI agent and instructs it to classify the message:
-      - Return 1 if it is a job application reply which is qualifying or moving forward.
-      - Return 0 if it is a rejecting mail.
-      - Return 2 if it is not a job application reply or just an applied message.
-
-      Args:
-        body (str): The message body to be classified.
-
-      Returns:
-        int: 1 for qualifying/moving forward, 0 for rejection, 2 for not a job application reply/applied message.
-      """
-      thread = self.project_client.agents.create_thread()
-      message = self.project_client.agents.create_message(
-        thread_id=thread.id,
-        role="user",
-        content=(
-          "Classify the following message body. "
-          "Return ONLY a single integer value: "
-          "1 if this is a job application reply which is qualifying or moving forward, "
-          "0 if it is a rejecting mail, "
-          "2 if it is not a job application reply or just an applied message. "
-          "Do not return any explanation or text, only the integer.\n\n"
-          f"{body}"
+        """
+        Sends the provided message body to the Azure AI agent and instructs it to classify the message:
+        - Return 1 if it is a job application reply which is qualifying or moving forward.
+        - Return 0 if it is a rejecting mail.
+        - Return 2 if it is not a job application reply or just an applied message.
+
+        Args:
+            body (str): The message body to be classified.
+
+        Returns:
+            int: 1 for qualifying/moving forward, 0 for rejection, 2 for not a job application reply/applied message.
+        """
+        return self._parse_email_reply(self._send_to_agent(self._build_email_prompt(body), task="email"))
+
+    async def update_process_email_content_async(self, body, scheduler=None):
+        """
+        asyncio variant of update_process_email_content built on the async Azure AI Projects client.
+
+        Args:
+            body (str): The message body to be classified.
+            scheduler (AgentCallScheduler): Shared scheduler bounding concurrency; a default one is used if None.
+
+        Returns:
+            int: Same labels as update_process_email_content.
+        """
+        reply = await self._send_to_agent_async(self._build_email_prompt(body), scheduler, task="email")
+        return self._parse_email_reply(reply)
+
+    @staticmethod
+    def _build_email_prompt(body):
+        return (
+            "Classify the following message body. "
+            "Return ONLY a single integer value: "
+            "1 if this is a job application reply which is qualifying or moving forward, "
+            "0 if it is a rejecting mail, "
+            "2 if it is not a job application reply or just an applied message. "
+            "Do not return any explanation or text, only the integer.\n\n"
+            f"{body}"
         )
-      )
-
-      run = self.project_client.agents.create_and_process_run(
-        thread_id=thread.id,
-        agent_id=self.agent.id
-      )
-
-      messages_list_response = self.project_client.agents.list_messages(thread_id=thread.id)
-      result = None
-      if messages_list_response.data:
-        for message_obj in messages_list_response.data:
-          message_role = getattr(message_obj, 'role', 'unknown_role_from_message_obj')
-          message_content = ""
-          if hasattr(message_obj, 'content') and message_obj.content:
-            for content_part in message_obj.content:
-              if getattr(content_part, 'type', None) == 'text':
-                text_value_dict = getattr(content_part, 'text', {})
-                message_content = getattr(text_value_dict, 'value', '')
-                break
-          if message_role == 'assistant':
+
+    @staticmethod
+    def _parse_email_reply(message_content):
+        if message_content is None:
+            return None
+        try:
+            return int(message_content.strip())
+        except Exception as e:
+            print(f"Error parsing agent response: {e}")
+            print("Agent's raw response content:")
+            print(message_content)
+            return None
+
+    @timed("resume_agent.classify_emails_batch")
+    def classify_emails_batch(self, emails, max_batch_tokens=6000, retry_missing=True):
+        """
+        Classifies many email bodies with as few agent runs as possible.
+
+        The emails are split into chunks that fit in ``max_batch_tokens`` and each chunk is
+        sent as a single prompt asking for a JSON object of id -> label. Items the agent
+        leaves out or answers with something other than 0/1/2 are retried one by one with
+        update_process_email_content when ``retry_missing`` is set, otherwise they map to None.
+
+        Args:
+            emails (list): (message_id, body) pairs.
+            max_batch_tokens (int): Approximate prompt token budget per agent run.
+            retry_missing (bool): Classify unanswered items individually as a fallback.
+
+        Returns:
+            dict: message_id -> 0, 1, 2 or None, using the same labels as update_process_email_content.
+        """
+        results = {}
+        for chunk in self._chunk_emails(emails, max_batch_tokens):
+            reply = self._send_to_agent(self._build_batch_prompt(chunk), task="email_batch")
+            labels = self._parse_batch_reply(reply, [message_id for message_id, _ in chunk])
+            for message_id, body in chunk:
+                label = labels.get(message_id)
+                if label is None and retry_missing:
+                    print(f"No valid label for email {message_id} in batch reply, classifying it on its own.")
+                    label = self.update_process_email_content(body)
+                results[message_id] = label if label in EMAIL_LABELS else None
+        return results
+
+    @staticmethod
+    def _chunk_emails(emails, max_batch_tokens):
+        """
+        Splits (message_id, body) pairs into chunks whose estimated token count fits the budget.
+        A body that is larger than the whole budget is truncated and sent in a chunk of its own.
+        """
+        max_chars = max_batch_tokens * CHARS_PER_TOKEN
+        chunk, chunk_chars = [], 0
+        for message_id, body in emails:
+            body = (body or "")[:max_chars]
+            # Every item also pays for its id and the JSON punctuation around it.
+            item_chars = len(body) + len(str(message_id)) + 32
+            if chunk and chunk_chars + item_chars > max_chars:
+                yield chunk
+                chunk, chunk_chars = [], 0
+            chunk.append((str(message_id), body))
+            chunk_chars += item_chars
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def _build_batch_prompt(chunk):
+        items = [{"id": message_id, "body": body} for message_id, body in chunk]
+        return (
+            "Classify each of the following messages by its 'body'. For every message use: "
+            "1 if it is a job application reply which is qualifying or moving forward, "
+            "0 if it is a rejecting mail, "
+            "2 if it is not a job application reply or just an applied message. "
+            "Return ONLY a JSON object mapping each message 'id' to its integer label, "
+            'for example {"abc": 0, "def": 2}. Do not return any explanation or text.\n\n'
+            f"{json.dumps(items, ensure_ascii=False)}"
+        )
+
+    @staticmethod
+    def _parse_batch_reply(reply, expected_ids):
+        """
+        Extracts id -> label pairs from the agent reply, tolerating code fences, extra prose
+        and a truncated object. Only ids that were sent and labels in EMAIL_LABELS are kept.
+        """
+        if not reply:
+            return {}
+        expected = set(expected_ids)
+        labels = {}
+        start, end = reply.find("{"), reply.rfind("}")
+        if start != -1 and end > start:
             try:
-              result = int(message_content.strip())
-            except Exception as e:
-              print(f"Error parsing agent response: {e}")
-              print("Agent's raw response content:")
-              print(message_content)
-      return result
-        
+                parsed = json.loads(reply[start:end + 1])
+            except json.JSONDecodeError:
+                parsed = {}
+            if isinstance(parsed, dict):
+                for message_id, label in parsed.items():
+                    try:
+                        labels[str(message_id)] = int(label)
+                    except (TypeError, ValueError):
+                        continue
+        if not labels:
+            # Fall back to scanning "id": label pairs so a malformed or cut-off reply still yields what it can.
+            for message_id, label in re.findall(r'"?([\w\-]+)"?\s*[:=]\s*"?([0-2])\b', reply):
+                labels.setdefault(message_id, int(label))
+        return {k: v for k, v in labels.items() if k in expected and v in EMAIL_LABELS}
+
+    def _send_to_agent(self, content, task="resume_update"):
+        """
+        Sends one user message to the agent on a pooled thread for the task type and returns the assistant's text reply.
+        """
+        return send_message(self.project_client, self.agent_id, content, self.thread_manager, task)
+
+    async def _send_to_agent_async(self, content, scheduler=None, task="resume_update"):
+        """
+        Async counterpart of _send_to_agent; the call runs under the scheduler's concurrency,
+        timeout and rate-limit backoff policy.
+        """
+        scheduler = scheduler or self._get_default_scheduler()
+        client = self._get_async_project_client()
+        return await scheduler.run(
+            lambda: send_message_async(client, self.agent_id, content, self._async_thread_manager, task))
+
+    def _get_async_project_client(self):
+        if self._async_project_client is None:
+            self._async_credential = create_async_credential()
+            self._async_project_client = create_async_project_client(self.connection_string, self._async_credential)
+        if self._async_thread_manager is None:
+            self._async_thread_manager = AsyncThreadManager(self._async_project_client)
+        return self._async_project_client
+
+    def _get_default_scheduler(self):
+        if self._default_scheduler is None:
+            self._default_scheduler = AgentCallScheduler()
+        return self._default_scheduler
 
+    def close(self):
+        """Deletes the idle agent threads of the synchronous client."""
+        if getattr(self, "_thread_manager", None) is not None:
+            self._thread_manager.close()
+
+    async def aclose(self):
+        """
+        Deletes idle async agent threads and closes the async Azure AI Project client and its credential
+        if they were created.
+        """
+        if self._async_thread_manager is not None:
+            await self._async_thread_manager.aclose()
+            self._async_thread_manager = None
+        if self._async_project_client is not None:
+            await self._async_project_client.close()
+            self._async_project_client = None
+        if self._async_credential is not None:
+            await self._async_credential.close()
+            self._async_credential = None
+
+
+    @timed("resume_agent.update")
     def update_resume_with_ai(self, job_requirements_json, job_description_json, resume_json):
         """
         Updates the resume JSON by incorporating relevant keywords from job requirements and description
@@ -94,6 +259,72 @@ class ResumeAIUpdater:
         Returns:
             dict: The updated resume data as a Python dictionary, or None if an error occurs.
         """
+        inputs = self._load_update_inputs(job_requirements_json, job_description_json, resume_json)
+        if inputs is None:
+            return None
+        cache_key, cached = self._lookup_cache(inputs)
+        if cached is not None:
+            print("Tailored resume found in cache, skipping agent call.")
+            return cached
+        print("Sending message to agent and processing run...")
+        prompt = self._build_update_prompt(*inputs)
+        message_content = self._send_to_agent(prompt)
+        print("Run completed. Retrieving messages...")
+        # A new run is only requested when the reply cannot be repaired.
+        updated_resume, outcome = self._parse_update_reply(message_content, inputs[2],
+                                                           retry=lambda: self._send_to_agent(prompt))
+        return self._store_cache(cache_key, updated_resume, outcome)
+
+    @timed("resume_agent.update_async")
+    async def update_resume_with_ai_async(self, job_requirements_json, job_description_json, resume_json, scheduler=None):
+        """
+        asyncio variant of update_resume_with_ai built on the async Azure AI Projects client.
+
+        Args:
+            job_requirements_json (str): JSON string of job requirements (list of strings).
+            job_description_json (str): JSON string of the job description (string).
+            resume_json (str): JSON string of the original resume data.
+            scheduler (AgentCallScheduler): Shared scheduler bounding concurrency; a default one is used if None.
+
+        Returns:
+            dict: The updated resume data as a Python dictionary, or None if an error occurs.
+        """
+        inputs = self._load_update_inputs(job_requirements_json, job_description_json, resume_json)
+        if inputs is None:
+            return None
+        cache_key, cached = self._lookup_cache(inputs)
+        if cached is not None:
+            return cached
+        prompt = self._build_update_prompt(*inputs)
+        reply = await self._send_to_agent_async(prompt, scheduler)
+        updated_resume, outcome = self._parse_update_reply(reply, inputs[2])
+        if updated_resume is None:
+            self.response_handler.stats["retries"] += 1
+            reply = await self._send_to_agent_async(prompt, scheduler)
+            updated_resume, outcome = self._parse_update_reply(reply, inputs[2])
+        return self._store_cache(cache_key, updated_resume, outcome)
+
+    async def update_resume_for_jobs_async(self, jobs, resume_json, scheduler=None):
+        """
+        Tailors one resume to many job postings concurrently.
+
+        Args:
+            jobs (list): (job_requirements_json, job_description_json) pairs.
+            resume_json (str): JSON string of the original resume data.
+            scheduler (AgentCallScheduler): Shared scheduler bounding concurrency; a default one is used if None.
+
+        Returns:
+            list: Updated resume dicts in job order; None or the raised exception for jobs that failed.
+        """
+        scheduler = scheduler or self._get_default_scheduler()
+        return await asyncio.gather(
+            *(self.update_resume_with_ai_async(requirements, description, resume_json, scheduler)
+              for requirements, description in jobs),
+            return_exceptions=True
+        )
+
+    @staticmethod
+    def _load_update_inputs(job_requirements_json, job_description_json, resume_json):
         try:
             job_requirements = json.loads(job_requirements_json)
             job_description = json.loads(job_description_json)
@@ -101,65 +332,56 @@ class ResumeAIUpdater:
         except json.JSONDecodeError as e:
             print(f"Error decoding input JSON: {e}")
             return None
+        return job_requirements, job_description, resume
 
-        input_data = {
-            "job_requirements": job_requirements,
-            "job_description": job_description,
-            "resume": resume
-        }
-
-        json_input_content = json.dumps(input_data, indent=2)
-
-        thread = self.project_client.agents.create_thread()
-        message = self.project_client.agents.create_message(
-            thread_id=thread.id,
-            role="user",
-            content=(
-                "Given the following job requirements, job description, and my resume in JSON format, "
-                "please update the 'resume' section by incorporating relevant keywords from the "
-                "'job_description' and 'job_requirements' into the 'summary', 'projects description' and 'skills' sections. "
-                "Ensure the updated resume is returned ONLY as a valid JSON object. "
-                "Do not include any additional text or formatting outside the JSON.\n\n"
-                f"{json_input_content}"
-            )
-        )
+    def _lookup_cache(self, inputs):
+        """
+        Returns (cache_key, cached_resume); both are None when no cache is configured.
+        """
+        if self.cache is None:
+            return None, None
+        job_requirements, job_description, resume = inputs
+        cache_key = make_cache_key(resume, job_requirements, job_description, self.agent_id, UPDATE_PROMPT_VERSION)
+        cached = self.cache.get(cache_key)
+        count("resume_agent.cache", result="miss" if cached is None else "hit")
+        return cache_key, cached
 
-        print("Sending message to agent and processing run...")
-        run = self.project_client.agents.create_and_process_run(
-            thread_id=thread.id,
-            agent_id=self.agent.id
-        )
-        print("Run completed. Retrieving messages...")
+    def _store_cache(self, cache_key, updated_resume, outcome):
+        # Failed, empty or repaired replies are not cached so the next call gets another chance.
+        if cache_key is not None and updated_resume and outcome != "repaired":
+            self.cache.set(cache_key, updated_resume)
+        return updated_resume
+
+    def _build_update_prompt(self, job_requirements, job_description, resume):
+        """
+        Builds the compact prompt holding only the editable resume sections, the trimmed job description
+        and the job skills the resume is missing (see prompt_builder and skill_taxonomy). The estimated tokens
+        saved against the full prompt are only measured, and observed, while metrics are enabled.
+        """
+        missing_keywords = get_default_taxonomy().missing_keywords(resume, job_requirements, job_description)
+        metrics = get_metrics()
+        prompt, usage = self.prompt_builder.build(job_requirements, job_description, resume, missing_keywords,
+                                                  measure_savings=metrics.enabled)
+        observe("resume_agent.prompt_tokens", usage["prompt_tokens"])
+        if usage["saved_tokens"] is not None:
+            observe("resume_agent.saved_tokens", usage["saved_tokens"])
+        return prompt
 
-        messages_list_response = self.project_client.agents.list_messages(thread_id=thread.id)
- 
-        updated_resume = None
-        if not messages_list_response.data:
+    def _parse_update_reply(self, message_content, resume, retry=None):
+        """
+        Extracts the updated sections from the reply, repairing noisy or truncated JSON, merges them into
+        the original resume and fills schema defaults, so ResumeBuilder gets every section it reads.
+
+        Returns:
+            tuple: (updated resume or None, AgentResponseHandler.parse_with_outcome() outcome of the reply used)
+        """
+        if message_content is None:
             print("No messages found in the thread after run completion.")
-        else:
-            for message_obj in messages_list_response.data:
-                message_role = getattr(message_obj, 'role', 'unknown_role_from_message_obj')
-                message_content = ""
-                if hasattr(message_obj, 'content') and message_obj.content:
-                    for content_part in message_obj.content:
-                        if getattr(content_part, 'type', None) == 'text':
-                            text_value_dict = getattr(content_part, 'text', {})
-                            message_content = getattr(text_value_dict, 'value', '')
-                            break
-
-                if message_role == 'assistant':
-                    try:
-                        parsed_response = json.loads(message_content)
-                        updated_resume = parsed_response.get('resume', {})
-                    except json.JSONDecodeError as e:
-                        print(f"\nError decoding JSON from agent's response: {e}")
-                        print("Agent's raw response content:")
-                        print(message_content)
-                    except Exception as e:
-                        print(f"\nAn unexpected error occurred while processing assistant message: {e}")
-                        print("Agent's raw response content:")
-                        print(message_content)
-        return updated_resume
+        updated_resume, outcome = self.response_handler.parse_resume(
+            message_content, unwrap_key='resume', retry=retry, merge=lambda updated: merge_update(resume, updated),
+            with_outcome=True)
+        count("resume_agent.replies", outcome="failed" if updated_resume is None else "ok")
+        return updated_resume, outcome
     
 
 json_data = """
@@ -257,13 +479,15 @@ json_data = """
 """
 
 if __name__ == "__main__":
+    # Imported here so email classification and worker processes never load ReportLab.
+    from resume_pdf import ResumeBuilder
 
     # Example usage of the ResumeAIUpdater class
     # Replace with your actual connection string and agent ID
     connection_string = os.environ.get("Updating_Connection_String")
     agent_id = os.environ.get("Updating_Agent_ID")
 
-    resume_updater = ResumeAIUpdater(connection_string, agent_id)
+    resume_updater = ResumeAIUpdater(connection_string, agent_id, cache=TailoredResumeCache())
 
     # Define your job requirements, job description, and resume as JSON strings
     job_requirements_str = json.dumps([
@@ -295,11 +519,13 @@ if __name__ == "__main__":
         print("\n--- Final Updated Resume Data ---")
         print(json.dumps(updated_resume_data, indent=2))
         # You can now use updated_resume_data to generate a new PDF if needed
-        resume_builder = ResumeBuilder(json.dumps(updated_resume_data), "updated_resume.pdf")
+        resume_builder = ResumeBuilder(updated_resume_data, "updated_resume.pdf")
         resume_builder.create_resume_pdf()
-        rsbuilder=ResumeBuilder(json.dumps(updated_resume_data), "updated_resume.pdf")
-        rsbuilder.create_resume_pdf()
+        # To upload or attach the PDF without writing it to disk: pdf_bytes = resume_builder.to_bytes()
     else:
         print("Failed to get an updated resume.")
+    print(resume_updater.response_handler.report())
+    resume_updater.close()
+    print(f"Agent threads: {resume_updater.thread_manager.stats}")
 
     
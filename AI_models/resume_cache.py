@@ -0,0 +1,191 @@
+"""resume_cache.py is a persistent, content-addressed cache for tailored resumes returned by
+ResumeAIUpdater.update_resume_with_ai. Entries live in an in-memory LRU tier in front of an on-disk SQLite store."""
+
+import copy
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+_WHITESPACE_RE = re.compile(r"\s+")
+# Splits a job description into lines, bullets and sentences so their order does not change the key.
+_SEGMENT_RE = re.compile(r"[\n\r•;]+|(?<=[.!?])\s+")
+
+
+def _normalize_text(text):
+    return _WHITESPACE_RE.sub(" ", text).strip().casefold()
+
+
+def _canonical_value(value):
+    """Recursively collapses whitespace in every string of a JSON value."""
+    if isinstance(value, str):
+        return _WHITESPACE_RE.sub(" ", value).strip()
+    if isinstance(value, dict):
+        return {key: _canonical_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_canonical_value(item) for item in value]
+    return value
+
+
+def _canonical_segments(value):
+    """Turns job requirements or a description into a sorted, de-duplicated list of normalized segments."""
+    if isinstance(value, list):
+        segments = []
+        for item in value:
+            segments.extend(_canonical_segments(item))
+    elif isinstance(value, str):
+        segments = [_normalize_text(part) for part in _SEGMENT_RE.split(value)]
+    else:
+        segments = [json.dumps(value, sort_keys=True)]
+    return sorted(set(segment for segment in segments if segment))
+
+
+def make_cache_key(resume, job_requirements, job_description, agent_id, prompt_version):
+    """
+    Builds the canonical SHA-256 key of one tailoring request.
+
+    Resume keys are sorted and whitespace inside its strings is collapsed. Requirements and the
+    description are split into normalized segments and sorted, so reposted listings that differ only in
+    whitespace, casing or the order of their bullets/sentences hash the same.
+
+    Args:
+        resume (dict): The parsed resume.
+        job_requirements: The parsed job requirements (usually a list of strings).
+        job_description: The parsed job description (usually a string).
+        agent_id (str): The agent that does the tailoring.
+        prompt_version (int or str): Version of the prompt; bump it to invalidate old entries.
+
+    Returns:
+        str: Hex digest identifying the request.
+    """
+    payload = {
+        "resume": _canonical_value(resume),
+        "job_requirements": _canonical_segments(job_requirements),
+        "job_description": _canonical_segments(job_description),
+        "agent_id": agent_id,
+        "prompt_version": prompt_version,
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class TailoredResumeCache:
+    def __init__(self, db_path="tailored_resume_cache.sqlite3", max_memory_entries=256,
+                 max_disk_entries=10000, ttl_seconds=30 * 24 * 3600):
+        """
+        Initializes the cache and creates the SQLite table if needed.
+
+        Args:
+            db_path (str): Path of the SQLite file, or ":memory:" for a throwaway store.
+            max_memory_entries (int): Size of the in-memory LRU tier.
+            max_disk_entries (int): Entries kept on disk; the least recently used are evicted beyond this.
+            ttl_seconds (float): Age after which an entry is treated as missing; None disables expiry.
+        """
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tailored_resumes ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tailored_resumes_accessed ON tailored_resumes (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key):
+        """
+        Looks a key up in memory first, then on disk.
+
+        Returns:
+            dict or None: A copy of the cached resume, or None on a miss or an expired entry.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and not self._expired(entry[1], now):
+                self._memory.move_to_end(key)
+                self.hits += 1
+                self.memory_hits += 1
+                return copy.deepcopy(entry[0])
+            self._memory.pop(key, None)
+
+            row = self._conn.execute(
+                "SELECT value, created_at FROM tailored_resumes WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or self._expired(row[1], now):
+                if row is not None:
+                    self._conn.execute("DELETE FROM tailored_resumes WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE tailored_resumes SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            value = json.loads(row[0])
+            self._remember(key, value, row[1])
+            self.hits += 1
+            return copy.deepcopy(value)
+
+    def set(self, key, value):
+        """
+        Stores a tailored resume under ``key`` in both tiers and applies size-based eviction.
+
+        Args:
+            key (str): Key from make_cache_key().
+            value (dict): The tailored resume.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tailored_resumes (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now, now)
+            )
+            self._evict_disk(now)
+            self._conn.commit()
+            self._remember(key, copy.deepcopy(value), now)
+
+    def stats(self):
+        """
+        Returns:
+            dict: hits, memory_hits, misses, hit_rate and the number of entries in each tier.
+        """
+        with self._lock:
+            disk_entries = self._conn.execute("SELECT COUNT(*) FROM tailored_resumes").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _expired(self, created_at, now):
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def _remember(self, key, value, created_at):
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self, now):
+        if self.ttl_seconds is not None:
+            self._conn.execute("DELETE FROM tailored_resumes WHERE created_at < ?", (now - self.ttl_seconds,))
+        self._conn.execute(
+            "DELETE FROM tailored_resumes WHERE key IN ("
+            "SELECT key FROM tailored_resumes ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,)
+        )
@@ -1,7 +1,13 @@
 """resume_pdf.py is a module that generates a PDF resume from JSON data. generated from resume_agent.py."""
 
+import hashlib
+import io
 import json
-from annotated_types import doc
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
@@ -10,37 +16,74 @@ from reportlab.lib.pagesizes import letter
 from reportlab.lib.enums import TA_RIGHT 
 from reportlab.graphics.shapes import Drawing
 from reportlab.graphics.shapes import Line
+from instrumentation import count, get_metrics, observe, span
 
 
-class ResumeBuilder:
-    def __init__(self, json_data_str, output_filename="resume.pdf"):
+# Story order of the resume sections and the resume keys each one reads.
+RESUME_SECTIONS = (
+    ('header', ('name', 'title', 'contact')),
+    ('summary', ('summary',)),
+    ('education', ('education',)),
+    ('skills', ('skills',)),
+    ('experience', ('experience',)),
+    ('projects', ('projects',)),
+    ('certifications', ('certifications',)),
+)
+
+
+class ResumeRenderer:
+    def __init__(self, pagesize=letter, margin=0.4*inch, section_cache_size=512):
         """
-        Initializes the ResumeBuilder with JSON data and output filename.
+        Long-lived PDF renderer. The stylesheet, table styles and the section rule are built once
+        here and shared by every resume rendered afterwards.
 
         Args:
-            json_data_str (str): A JSON string containing the resume data.
-            output_filename (str): The name of the output PDF file.
+            pagesize (tuple): Page size in points.
+            margin (float): Page margin on every side in points.
+            section_cache_size (int): Number of per-section flowable lists kept for reuse; 0 disables the cache.
         """
-        self.json_data_str = json_data_str
-        self.output_filename = output_filename
+        self.section_cache_size = section_cache_size
+        self.section_cache_hits = 0
+        self.section_cache_misses = 0
+        self._section_cache = OrderedDict()
+        self._build_lock = threading.Lock()
+        self.pagesize = pagesize
+        self.margin = margin
+        # Same as SimpleDocTemplate's doc.width for these margins.
+        self.frame_width = pagesize[0] - 2 * margin
+        self.styles = self._build_styles()
 
+        # Define column widths for the header table
+        # Adjust these values as needed to control spacing between left and right sections
+        self.header_col_widths = [4.5*inch, 3.0*inch]
+        self.header_table_style = TableStyle([
+            ('ALIGN', (0,0), (0,-1), 'LEFT'),      # Left column content aligned left
+            ('ALIGN', (1,0), (1,-1), 'RIGHT'),     # Right column content aligned right
+            ('VALIGN', (0,0), (-1,-1), 'TOP'),     # Align content to the top of cells
+            ('BOTTOMPADDING', (0,0), (-1,-1), 0),  # Remove default bottom padding
+            ('TOPPADDING', (0,0), (-1,-1), 0),     # Remove default top padding
+            ('LEFTPADDING', (1,0), (1,-1), 0.1*inch), # Add slight left padding to right column
+        ])
+        self.duration_col_widths = [3.5*inch, 3.5*inch]
+        self.duration_table_style = TableStyle([
+            ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+            ('VALIGN', (0,0), (-1,-1), 'TOP'),
+            ('BOTTOMPADDING', (0,0), (-1,-1), 0),
+            ('TOPPADDING', (0,0), (-1,-1), 0),
+        ])
 
-    def create_resume_pdf(self):
+    def _section_rule(self):
         """
-        Generates a PDF resume from JSON data, formatted to resemble the provided sample.
-
-        Args:
-            json_data_str (str): A JSON string containing the resume data.
-            output_filename (str): The name of the output PDF file.
+        Horizontal line under a section heading. Every section gets its own instance because ReportLab
+        keeps per-build state on a flowable that is pushed to the next page.
         """
-        # Parse the JSON data
-        data = json.loads(self.json_data_str)
+        line_drawing = Drawing(self.frame_width, 1) # Width of the line, height of the drawing container
+        line_drawing.add(Line(0, 0, self.frame_width, 0)) # Draw a line from (x1, y1) to (x2, y2) within the drawing
+        return line_drawing
 
-        doc = SimpleDocTemplate(self.output_filename, pagesize=letter,
-                                rightMargin=0.4*inch, leftMargin=0.4*inch,
-                                topMargin=0.4*inch, bottomMargin=0.4*inch)
+    @staticmethod
+    def _build_styles():
         styles = getSampleStyleSheet()
-        story = []
 
         # --- Define Custom Styles ---
         # Name style
@@ -105,25 +148,59 @@ class ResumeBuilder:
                                 textColor=colors.black,
                                 alignment=TA_RIGHT, # Right alignment
                                 spaceAfter=0))
+        return styles
+
+    def build_story(self, data):
+        """
+        Builds the list of flowables for one resume. Each section's flowables are cached by a hash of the
+        data that section reads, so renders of variants of one base resume only rebuild the sections that
+        changed (typically summary, skills and projects).
+
+        Args:
+            data (dict): The parsed resume data.
+
+        Returns:
+            list: Flowables ready for SimpleDocTemplate.build().
+        """
+        story = []
+        for section, keys in RESUME_SECTIONS:
+            story.extend(self._section_flowables(section, keys, data))
+        return story
+
+    def _section_flowables(self, section, keys, data):
+        builder = getattr(self, f"_build_{section}_section")
+        if self.section_cache_size <= 0:
+            return builder(data)
+        section_data = json.dumps([data.get(key) for key in keys], sort_keys=True, ensure_ascii=False)
+        cache_key = (section, hashlib.sha1(section_data.encode("utf-8")).hexdigest())
+        flowables = self._section_cache.get(cache_key)
+        if flowables is not None:
+            self._section_cache.move_to_end(cache_key)
+            self.section_cache_hits += 1
+            count("pdf.section_cache", result="hit")
+            return flowables
+        self.section_cache_misses += 1
+        count("pdf.section_cache", result="miss")
+        flowables = builder(data)
+        self._section_cache[cache_key] = flowables
+        while len(self._section_cache) > self.section_cache_size:
+            self._section_cache.popitem(last=False)
+        return flowables
+
+    def _build_header_section(self, data):
+        story = []
         # --- Header Section: Name, Title, Contact Info ---
         header_data = [
-            [Paragraph(data['name'], styles['NameStyle']), Paragraph(f"Email: {data['contact']['email']}", styles['rightAlign'])],
-            [Paragraph(data['title'], styles['TitleStyle']), Paragraph(f"Phone: {data['contact']['phone']}", styles['rightAlign'])],
-            [Spacer(1, 0.0 * inch), Paragraph(f"<link href='{data['contact']['linkedin']}'>LinkedIn</link>", styles['LinkStyle'])],
-            [Spacer(1, 0.0 * inch), Paragraph(f"<link href='{data['contact']['github']}'>GitHub</link>", styles['LinkStyle'])]
+            [Paragraph(data['name'], self.styles['NameStyle']), Paragraph(f"Email: {data['contact']['email']}", self.styles['rightAlign'])],
+            [Paragraph(data['title'], self.styles['TitleStyle']), Paragraph(f"Phone: {data['contact']['phone']}", self.styles['rightAlign'])],
+            [Spacer(1, 0.0 * inch), Paragraph(f"<link href='{data['contact']['linkedin']}'>LinkedIn</link>", self.styles['LinkStyle'])],
+            [Spacer(1, 0.0 * inch), Paragraph(f"<link href='{data['contact']['github']}'>GitHub</link>", self.styles['LinkStyle'])]
         ]
 
         # Define column widths for the header table
         # Adjust these values as needed to control spacing between left and right sections
-        header_table = Table(header_data, colWidths=[4.5*inch, 3.0*inch])
-        header_table.setStyle(TableStyle([
-            ('ALIGN', (0,0), (0,-1), 'LEFT'),      # Left column content aligned left
-            ('ALIGN', (1,0), (1,-1), 'RIGHT'),     # Right column content aligned right
-            ('VALIGN', (0,0), (-1,-1), 'TOP'),     # Align content to the top of cells
-            ('BOTTOMPADDING', (0,0), (-1,-1), 0),  # Remove default bottom padding
-            ('TOPPADDING', (0,0), (-1,-1), 0),     # Remove default top padding
-            ('LEFTPADDING', (1,0), (1,-1), 0.1*inch), # Add slight left padding to right column
-        ]))
+        header_table = Table(header_data, colWidths=self.header_col_widths)
+        header_table.setStyle(self.header_table_style)
         story.append(header_table)
         story.append(Spacer(1, 0.1 * inch))
         # contact_table = Table(contact_data, colWidths=[3.5*inch, 3.5*inch])
@@ -135,93 +212,296 @@ class ResumeBuilder:
         # ]))
         # story.append(contact_table)
         # story.append(Spacer(1, 0.0 * inch)) # Small space after header
+        return story
 
+    def _build_summary_section(self, data):
+        story = []
         # --- Summary Section ---
-        story.append(Paragraph("SUMMARY", styles['SectionHeading']))
-        line_drawing = Drawing(doc.width, 1) # Width of the line, height of the drawing container
-        line_drawing.add(Line(0, 0, doc.width, 0)) # Draw a line from (x1, y1) to (x2, y2) within the drawing
-        story.append(line_drawing)# Horizontal line
-        story.append(Paragraph(data['summary'], styles['NormalText']))
+        story.append(Paragraph("SUMMARY", self.styles['SectionHeading']))
+        story.append(self._section_rule()) # Horizontal line
+        story.append(Paragraph(data['summary'], self.styles['NormalText']))
         story.append(Spacer(1, 0.0 * inch))
+        return story
 
+    def _build_education_section(self, data):
+        story = []
         # --- Education Section ---
-        story.append(Paragraph("EDUCATION", styles['SectionHeading']))
-        line_drawing = Drawing(doc.width, 1) # Width of the line, height of the drawing container
-        line_drawing.add(Line(0, 0, doc.width, 0)) # Draw a line from (x1, y1) to (x2, y2) within the drawing
-        story.append(line_drawing)
+        story.append(Paragraph("EDUCATION", self.styles['SectionHeading']))
+        story.append(self._section_rule())
         for edu in data['education']:
-            story.append(Paragraph(f"<b>{edu['degree']}</b>", styles['SubHeading']))
-            duration_data=[ [Paragraph(edu['institution'], styles['NormalText']),
-                             Paragraph(edu['duration'], styles['rightAlign'])],
-                              [Paragraph(f"GPA: {edu['gpa']}", styles['NormalText'])] ]
-            duration_table = Table(duration_data, colWidths=[3.5*inch, 3.5*inch])
-            duration_table.setStyle(TableStyle([
-                ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-                ('VALIGN', (0,0), (-1,-1), 'TOP'),
-                ('BOTTOMPADDING', (0,0), (-1,-1), 0),
-                ('TOPPADDING', (0,0), (-1,-1), 0),
-            ]))
+            story.append(Paragraph(f"<b>{edu['degree']}</b>", self.styles['SubHeading']))
+            duration_data=[ [Paragraph(edu['institution'], self.styles['NormalText']),
+                             Paragraph(edu['duration'], self.styles['rightAlign'])],
+                              [Paragraph(f"GPA: {edu['gpa']}", self.styles['NormalText'])] ]
+            duration_table = Table(duration_data, colWidths=self.duration_col_widths)
+            duration_table.setStyle(self.duration_table_style)
             story.append(duration_table)
             story.append(Spacer(1, 0.0 * inch))
+        return story
 
+    def _build_skills_section(self, data):
+        story = []
         # --- Skills Section ---
-        story.append(Paragraph("SKILLS", styles['SectionHeading']))
-        line_drawing = Drawing(doc.width, 1) # Width of the line, height of the drawing container
-        line_drawing.add(Line(0, 0, doc.width, 0)) # Draw a line from (x1, y1) to (x2, y2) within the drawing
-        story.append(line_drawing)
-        story.append(Paragraph(f"<b>Programming:</b> {', '.join(data['skills']['programming'])}", styles['NormalText']))
-        story.append(Paragraph(f"<b>BI Tools:</b> {', '.join(data['skills']['bi_tools'])}", styles['NormalText']))
-        story.append(Paragraph(f"<b>Relevant Courses:</b> {', '.join(data['skills']['relevant_courses'])}", styles['NormalText']))
+        story.append(Paragraph("SKILLS", self.styles['SectionHeading']))
+        story.append(self._section_rule())
+        story.append(Paragraph(f"<b>Programming:</b> {', '.join(data['skills']['programming'])}", self.styles['NormalText']))
+        story.append(Paragraph(f"<b>BI Tools:</b> {', '.join(data['skills']['bi_tools'])}", self.styles['NormalText']))
+        story.append(Paragraph(f"<b>Relevant Courses:</b> {', '.join(data['skills']['relevant_courses'])}", self.styles['NormalText']))
         story.append(Spacer(1, 0.0 * inch))
+        return story
 
+    def _build_experience_section(self, data):
+        story = []
         # --- Work Experience Section ---
-        story.append(Paragraph("WORK EXPERIENCE", styles['SectionHeading']))
-        line_drawing = Drawing(doc.width, 1) # Width of the line, height of the drawing container
-        line_drawing.add(Line(0, 0, doc.width, 0)) # Draw a line from (x1, y1) to (x2, y2) within the drawing
-        story.append(line_drawing)
+        story.append(Paragraph("WORK EXPERIENCE", self.styles['SectionHeading']))
+        story.append(self._section_rule())
         for exp in data['experience']:
-            story.append(Paragraph(f"<b>{exp['company']}</b>, {exp['location']}", styles['SubHeading']))
+            story.append(Paragraph(f"<b>{exp['company']}</b>, {exp['location']}", self.styles['SubHeading']))
             duration_data = [
-                [Paragraph(exp['title'], styles['NormalText']),
-                 Paragraph(exp['duration'], styles['rightAlign'])]
+                [Paragraph(exp['title'], self.styles['NormalText']),
+                 Paragraph(exp['duration'], self.styles['rightAlign'])]
             ]
-            duration_table = Table(duration_data, colWidths=[3.5*inch, 3.5*inch])
-            duration_table.setStyle(TableStyle([
-                ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-                ('VALIGN', (0,0), (-1,-1), 'TOP'),
-                ('BOTTOMPADDING', (0,0), (-1,-1), 0),
-                ('TOPPADDING', (0,0), (-1,-1), 0),
-            ]))
+            duration_table = Table(duration_data, colWidths=self.duration_col_widths)
+            duration_table.setStyle(self.duration_table_style)
             story.append(duration_table)
             for resp in exp['responsibilities']:
-                story.append(Paragraph(f"• {resp}", styles['BulletPoint']))
+                story.append(Paragraph(f"• {resp}", self.styles['BulletPoint']))
             story.append(Spacer(1, 0.0 * inch))
+        return story
 
+    def _build_projects_section(self, data):
+        story = []
         # --- Projects Section ---
-        story.append(Paragraph("PROJECTS", styles['SectionHeading']))
-        line_drawing = Drawing(doc.width, 1) # Width of the line, height of the drawing container
-        line_drawing.add(Line(0, 0, doc.width, 0)) # Draw a line from (x1, y1) to (x2, y2) within the drawing
-        story.append(line_drawing)
+        story.append(Paragraph("PROJECTS", self.styles['SectionHeading']))
+        story.append(self._section_rule())
         for proj in data['projects']:
-            story.append(Paragraph(f"<b>{proj['title']}:</b>", styles['SubHeading']))
-            story.append(Paragraph(proj['description'], styles['NormalText']))
+            story.append(Paragraph(f"<b>{proj['title']}:</b>", self.styles['SubHeading']))
+            story.append(Paragraph(proj['description'], self.styles['NormalText']))
             story.append(Spacer(1, 0.1 * inch))
+        return story
 
+    def _build_certifications_section(self, data):
+        story = []
         # --- Certifications Section ---
-        story.append(Paragraph(f"<b>CERTIFICATIONS:</b> {', '.join(data['certifications'])}", styles['NormalText']))
-        # story.append(Paragraph("CERTIFICATIONS", styles['SectionHeading']))
+        story.append(Paragraph(f"<b>CERTIFICATIONS:</b> {', '.join(data['certifications'])}", self.styles['NormalText']))
+        # story.append(Paragraph("CERTIFICATIONS", self.styles['SectionHeading']))
         # for cert in data['certifications']:
-        #     story.append(Paragraph(f"{cert},", styles['BulletPoint']))
+        #     story.append(Paragraph(f"{cert},", self.styles['BulletPoint']))
         # story.append(Spacer(1, 0.1 * inch))
+        return story
+
+    def render(self, data, output):
+        """
+        Renders one resume into a PDF.
+
+        Args:
+            data (dict): The parsed resume data; no JSON round-trip is needed.
+            output (str or file-like): Output file name, or a writable binary file object.
+        """
+        doc = SimpleDocTemplate(output, pagesize=self.pagesize,
+                                rightMargin=self.margin, leftMargin=self.margin,
+                                topMargin=self.margin, bottomMargin=self.margin)
+        # Cached flowables carry layout state from wrap(), so builds sharing them must not overlap.
+        with self._build_lock:
+            with span("pdf.build_story"):
+                story = self.build_story(data)
+            for flowable in story:
+                # Set by doc.build() on a flowable moved to the next frame and never cleared; a stale flag
+                # from an earlier build would make a reused flowable fail with LayoutError.
+                flowable.__dict__.pop('_postponed', None)
+            with span("pdf.doc_build"):
+                doc.build(story)
+
+    def render_bytes(self, data):
+        """
+        Renders one resume in memory.
+
+        Returns:
+            bytes: The PDF document.
+        """
+        buffer = io.BytesIO()
+        self.render(data, buffer)
+        observe("pdf.bytes", buffer.tell())
+        return buffer.getvalue()
+
+
+_default_renderer = None
+
+
+def get_default_renderer():
+    """
+    Returns the process-wide ResumeRenderer, creating it on first use.
+    """
+    global _default_renderer
+    if _default_renderer is None:
+        _default_renderer = ResumeRenderer()
+    return _default_renderer
+
+
+# Renderer owned by a render_many worker process, built once by _init_render_worker.
+_worker_renderer = None
+
+
+def _init_render_worker():
+    global _worker_renderer
+    # A forked worker starts with a copy of the parent's metrics, which must not be sent back a second time.
+    get_metrics().reset()
+    _worker_renderer = ResumeRenderer()
+
+
+def _render_job(index, data, output_path):
+    """
+    Renders one bulk job inside a worker process. Jobs whose output is a buffer are rendered to bytes
+    and written into the caller's buffer by the parent process.
+
+    Returns:
+        tuple: (index, pdf bytes or None, error message or None, metrics recorded by the job for
+        Metrics.merge() in the parent)
+    """
+    pdf_bytes, error = None, None
+    try:
+        if isinstance(data, (str, bytes)):
+            data = json.loads(data)
+        if output_path is None:
+            buffer = io.BytesIO()
+            _worker_renderer.render(data, buffer)
+            pdf_bytes = buffer.getvalue()
+        else:
+            _worker_renderer.render(data, output_path)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return index, pdf_bytes, error, get_metrics().drain()
 
 
+def render_many(jobs, max_workers=None, progress=None):
+    """
+    Renders many resumes in parallel in a ProcessPoolExecutor; each worker keeps its own warm ResumeRenderer.
+
+    A failing job is recorded and the rest of the batch carries on. Jobs are submitted lazily with a bounded
+    number in flight, so ``jobs`` can be a long generator.
+
+    Args:
+        jobs (iterable): (resume dict or JSON string, output) pairs, where output is a file path or a
+            writable binary buffer such as io.BytesIO.
+        max_workers (int): Worker processes; defaults to os.cpu_count().
+        progress (callable): Optional progress(done, index, error) called as each job finishes.
+
+    Returns:
+        dict: 'rendered' count, 'failed' {job index: error message}, 'elapsed' seconds and 'pdfs_per_second'.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    report = {'rendered': 0, 'failed': {}, 'elapsed': 0.0, 'pdfs_per_second': 0.0}
+    buffers = {}
+    in_flight = {}
+    done_count = 0
+    start = time.perf_counter()
+
+    def _collect(finished):
+        nonlocal done_count
+        for future in finished:
+            index = in_flight.pop(future)
+            try:
+                _, pdf_bytes, error, worker_metrics = future.result()
+            except Exception as e:
+                # The worker died (e.g. BrokenProcessPool) or its result could not be unpickled.
+                pdf_bytes, error, worker_metrics = None, f"{type(e).__name__}: {e}", None
+            get_metrics().merge(worker_metrics)
+            buffer = buffers.pop(index, None)
+            if error is None and buffer is not None:
+                buffer.write(pdf_bytes)
+            if error is None:
+                report['rendered'] += 1
+            else:
+                report['failed'][index] = error
+            done_count += 1
+            if progress is not None:
+                progress(done_count, index, error)
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_render_worker) as executor:
+        for index, (data, output) in enumerate(jobs):
+            output_path = output if isinstance(output, (str, os.PathLike)) else None
+            if output_path is None:
+                buffers[index] = output
+            in_flight[executor.submit(_render_job, index, data, output_path)] = index
+            if len(in_flight) >= max_workers * 4:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                _collect(finished)
+        finished, _ = wait(in_flight)
+        _collect(finished)
+
+    report['elapsed'] = time.perf_counter() - start
+    if report['elapsed'] > 0:
+        report['pdfs_per_second'] = report['rendered'] / report['elapsed']
+    return report
+
+
+class ResumeBuilder:
+    def __init__(self, json_data_str, output_filename="resume.pdf", renderer=None):
+        """
+        Initializes the ResumeBuilder with JSON data and output filename.
+
+        Args:
+            json_data_str (str or dict): A JSON string containing the resume data, or the already parsed dict.
+            output_filename (str or file-like): The name of the output PDF file, or a writable binary
+                buffer/stream (e.g. io.BytesIO or an upload stream) to render into without touching disk.
+            renderer (ResumeRenderer): Renderer to use; the shared process-wide one when None.
+        """
+        self.json_data_str = json_data_str
+        self.output_filename = output_filename
+        self.renderer = renderer or get_default_renderer()
+
+    def _data(self):
+        data = self.json_data_str
+        if isinstance(data, (str, bytes)):
+            data = json.loads(data)
+        return data
+
+
+    def create_resume_pdf(self):
+        """
+        Generates a PDF resume from JSON data, formatted to resemble the provided sample.
+
+        Args:
+            json_data_str (str): A JSON string containing the resume data.
+            output_filename (str or file-like): The name of the output PDF file, or a writable binary buffer.
+        """
+        # Parse the JSON data
+        data = self._data()
+
         # Build the PDF
         try:
-            doc.build(story)
-            print(f"Resume PDF '{self.output_filename}' created successfully!")
+            self.renderer.render(data, self.output_filename)
+            target = self.output_filename if isinstance(self.output_filename, (str, os.PathLike)) else "in-memory buffer"
+            print(f"Resume PDF '{target}' created successfully!")
         except Exception as e:
             print(f"Error building PDF: {e}")
 
+    def to_bytes(self):
+        """
+        Renders the resume in memory, ignoring output_filename.
+
+        Returns:
+            bytes: The PDF document.
+        """
+        return self.renderer.render_bytes(self._data())
+
+    def write_to(self, sink, chunk_size=64 * 1024):
+        """
+        Renders the resume in memory and streams it to a file-like sink in chunks, e.g. a storage
+        upload stream or an HTTP response body.
+
+        Args:
+            sink: Object with a write(bytes) method.
+            chunk_size (int): Bytes per write() call.
+
+        Returns:
+            int: Number of bytes written.
+        """
+        pdf_bytes = memoryview(self.to_bytes())
+        for start in range(0, len(pdf_bytes), chunk_size):
+            sink.write(pdf_bytes[start:start + chunk_size])
+        return len(pdf_bytes)
+
 # Your provided JSON data
 json_data = """
 {
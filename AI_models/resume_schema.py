@@ -0,0 +1,111 @@
+"""resume_schema.py describes the resume JSON consumed by resume_pdf.ResumeBuilder and produced by the parser and
+updating agents, and fills in defaults so a partial resume never crashes the PDF builder with a KeyError."""
+
+import copy
+
+CONTACT_FIELDS = ("email", "phone", "linkedin", "github")
+SKILL_FIELDS = ("programming", "bi_tools", "relevant_courses")
+EDUCATION_DEFAULTS = {"degree": "", "institution": "", "duration": "", "gpa": ""}
+EXPERIENCE_DEFAULTS = {"company": "", "location": "", "title": "", "duration": "", "responsibilities": []}
+PROJECT_DEFAULTS = {"title": "", "description": ""}
+
+RESUME_DEFAULTS = {
+    "name": "",
+    "title": "",
+    "contact": {field: "" for field in CONTACT_FIELDS},
+    "summary": "",
+    "education": [],
+    "skills": {field: [] for field in SKILL_FIELDS},
+    "experience": [],
+    "projects": [],
+    "certifications": [],
+}
+RESUME_FIELDS = tuple(RESUME_DEFAULTS)
+
+
+def _as_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return ", ".join(_as_text(item) for item in value)
+    return str(value).strip()
+
+
+def _as_text_list(value):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [part.strip() for part in value.split(",") if part.strip()]
+    if isinstance(value, list):
+        return [_as_text(item) for item in value if _as_text(item)]
+    return [_as_text(value)]
+
+
+def _as_records(value, defaults, list_fields=()):
+    records = []
+    for item in value if isinstance(value, list) else []:
+        if not isinstance(item, dict):
+            continue
+        record = {}
+        for field, default in defaults.items():
+            raw = item.get(field, copy.deepcopy(default))
+            record[field] = _as_text_list(raw) if field in list_fields else _as_text(raw)
+        records.append(record)
+    return records
+
+
+def validate_resume(resume):
+    """
+    Checks a resume against the schema without changing it.
+
+    Returns:
+        list: Human readable problems (missing fields or wrong types); empty when the resume is valid.
+    """
+    if not isinstance(resume, dict):
+        return ["resume is not a JSON object"]
+    problems = []
+    for field, default in RESUME_DEFAULTS.items():
+        if field not in resume:
+            problems.append(f"missing '{field}'")
+        elif not isinstance(resume[field], type(default)):
+            problems.append(f"'{field}' should be {type(default).__name__}, got {type(resume[field]).__name__}")
+    for field in CONTACT_FIELDS:
+        if isinstance(resume.get("contact"), dict) and field not in resume["contact"]:
+            problems.append(f"missing 'contact.{field}'")
+    for field in SKILL_FIELDS:
+        if isinstance(resume.get("skills"), dict) and not isinstance(resume["skills"].get(field), list):
+            problems.append(f"'skills.{field}' should be a list")
+    return problems
+
+
+def normalize_resume(resume):
+    """
+    Returns a copy of the resume that satisfies the schema: missing fields get defaults, scalars are
+    coerced to strings and comma-separated strings to lists. Unknown keys are kept.
+
+    Args:
+        resume (dict): A possibly partial resume.
+
+    Returns:
+        dict: The normalized resume.
+    """
+    resume = copy.deepcopy(resume) if isinstance(resume, dict) else {}
+    normalized = dict(resume)
+    normalized["name"] = _as_text(resume.get("name"))
+    normalized["title"] = _as_text(resume.get("title"))
+    normalized["summary"] = _as_text(resume.get("summary"))
+
+    contact = resume.get("contact") if isinstance(resume.get("contact"), dict) else {}
+    normalized["contact"] = dict(contact, **{field: _as_text(contact.get(field)) for field in CONTACT_FIELDS})
+
+    skills = resume.get("skills")
+    if isinstance(skills, list):
+        skills = {"programming": skills}
+    skills = skills if isinstance(skills, dict) else {}
+    normalized["skills"] = dict(skills, **{field: _as_text_list(skills.get(field)) for field in SKILL_FIELDS})
+
+    normalized["education"] = _as_records(resume.get("education"), EDUCATION_DEFAULTS)
+    normalized["experience"] = _as_records(resume.get("experience"), EXPERIENCE_DEFAULTS, ("responsibilities",))
+    normalized["projects"] = _as_records(resume.get("projects"), PROJECT_DEFAULTS)
+    normalized["certifications"] = _as_text_list(resume.get("certifications"))
+    return normalized
@@ -57,11 +57,18 @@ PREREQUISITES:
        python sample_analyze_read.py
 """
 
+import hashlib
 import json
 import os
 import dotenv
+from pdf_text_extract import extract_local_text
+from instrumentation import count, get_metrics, observe, span, timed
 
 dotenv.load_dotenv()
+
+# Directory of the OCR text cache, one <sha256 of the document>.<source>.txt file per analyzed document and
+# extraction source ('text_layer' or 'ocr').
+DEFAULT_CACHE_DIR = os.environ.get("Understander_Cache_Dir", ".ocr_cache")
 # ...existing code...
 
 # To learn the detailed concept of "polygon" in the following content, visit: https://aka.ms/V3.1-bounding-region
@@ -80,7 +87,88 @@ def format_polygon(polygon):
     return ", ".join([f"[{p.x}, {p.y}]" for p in polygon])
 
 
-def analyze_read():
+def _read_source(source):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    with open(source, "rb") as f:
+        return f.read()
+
+
+CACHE_SOURCES = ("text_layer", "ocr")
+
+
+def _cache_path(cache_dir, digest, source):
+    return os.path.join(cache_dir, f"{digest}.{source}.txt")
+
+
+def load_cached_text(document_bytes, cache_dir=None, sources=CACHE_SOURCES):
+    """
+    Returns previously extracted text for a document, or None if it was never analyzed.
+
+    Args:
+        sources (tuple): Extraction sources to accept, in order of preference.
+    """
+    cache_dir = cache_dir or DEFAULT_CACHE_DIR
+    digest = hashlib.sha256(document_bytes).hexdigest()
+    for source in sources:
+        path = _cache_path(cache_dir, digest, source)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+    return None
+
+
+def store_cached_text(document_bytes, text, cache_dir=None, source="ocr"):
+    """
+    Stores extracted text keyed by the SHA-256 of the document bytes and the source it came from
+    ('text_layer' or 'ocr').
+    """
+    cache_dir = cache_dir or DEFAULT_CACHE_DIR
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _cache_path(cache_dir, hashlib.sha256(document_bytes).hexdigest(), source)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+@timed("ocr.analyze_read")
+def analyze_read(source, cache_dir=None, use_cache=True, local_first=True):
+    """
+    Extracts the text of a resume with the Azure Document Intelligence "prebuilt-read" model.
+
+    Digitally generated PDFs are read from their own text layer when it scores well enough
+    (see pdf_text_extract), so only scanned or image-only documents go to cloud OCR. Results are
+    cached on disk keyed by the SHA-256 of the file bytes and the extraction source, so re-uploads of an
+    identical resume skip extraction entirely; with local_first=False only cached OCR output is used.
+
+    Args:
+        source (str, os.PathLike or bytes): Path of the document, or its raw bytes.
+        cache_dir (str): Directory of the text cache; defaults to Understander_Cache_Dir or '.ocr_cache'.
+        use_cache (bool): Set to False to force a fresh extraction (the result is still stored).
+        local_first (bool): Try the PDF's text layer before calling Azure.
+
+    Returns:
+        str: The document's paragraphs, one per line.
+    """
+    document_bytes = _read_source(source)
+    observe("ocr.document_bytes", len(document_bytes))
+    if use_cache:
+        cached = load_cached_text(document_bytes, cache_dir, CACHE_SOURCES if local_first else ("ocr",))
+        count("ocr.cache", result="miss" if cached is None else "hit")
+        if cached is not None:
+            print("----OCR result found in cache, skipping Document Intelligence call----")
+            return cached
+
+    if local_first:
+        with span("ocr.local_text_layer"):
+            local_text, quality = extract_local_text(document_bytes)
+        if local_text is not None:
+            count("ocr.source", source="text_layer")
+            print(f"----Using the PDF text layer (quality {quality}), skipping Document Intelligence call----")
+            store_cached_text(document_bytes, local_text, cache_dir, source="text_layer")
+            return local_text
+
     from azure.core.credentials import AzureKeyCredential
     from azure.ai.formrecognizer import DocumentAnalysisClient, AnalysisFeature
 
@@ -103,15 +191,13 @@ def analyze_read():
     #     "prebuilt-read", document_url=url, features=[AnalysisFeature.LANGUAGES]
     # )
 
-    # If analyzing a local document, remove the comment markers (#) at the beginning of these 8 lines.
-    # Delete or comment out the part of "Analyze a document at a URL" above.
-    # Replace <path to your sample file>  with your actual file path.
-    path_to_sample_document = "D:\\Downloads\\Harish Resume.pdf"
-    with open(path_to_sample_document, "rb") as f:
+    count("ocr.source", source="document_intelligence")
+    with span("ocr.document_intelligence"):
         poller = document_analysis_client.begin_analyze_document(
-            "prebuilt-read", document=f, features=[AnalysisFeature.LANGUAGES]
+            "prebuilt-read", document=document_bytes, features=[AnalysisFeature.LANGUAGES]
         )
-    result = poller.result()
+        # result() blocks while the SDK polls the long-running analysis.
+        result = poller.result()
 
 
 
@@ -147,12 +233,12 @@ def analyze_read():
 ##############################################################################################################################################################
 
     # Analyze paragraphs.
-    if len(result.paragraphs) > 0:
+    total_text = ""
+    if result.paragraphs:
         print(f"----Detected #{len(result.paragraphs)} paragraphs in the document----")
-        total_text = ""
-        for paragraph in result.paragraphs:
-            total_text += paragraph.content + "\n"
+        total_text = "".join(f"{paragraph.content}\n" for paragraph in result.paragraphs)
     print("----------------------------------------")
+    store_cached_text(document_bytes, total_text, cache_dir, source="ocr")
     return total_text
     # [END analyze_read]
 if __name__ == "__main__":
@@ -162,10 +248,15 @@ if __name__ == "__main__":
 
     resumeparser= ResumeAIParser()
 
+    # Usage: python resume_understander.py <path to resume pdf>
+    path_to_sample_document = sys.argv[1] if len(sys.argv) > 1 else "D:\\Downloads\\Harish Resume.pdf"
+
     try:
-        text=analyze_read()
-        updated_resume_data=resumeparser.parse_resume_with_ai(text)
-        updated_resume_data=json.loads(updated_resume_data)
+        text=analyze_read(path_to_sample_document)
+        updated_resume_data=resumeparser.parse_resume_to_json(text)
+        print(resumeparser.response_handler.report())
+        print(get_metrics().report())
+        resumeparser.close()
         if updated_resume_data:
             print("\n--- Final Updated Resume Data ---")
             print(json.dumps(updated_resume_data, indent=2))
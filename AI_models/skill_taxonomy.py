@@ -0,0 +1,292 @@
+"""skill_taxonomy.py normalizes skill names ('MS-Excel' == 'Excel', 'Tableau/Spotfire' -> Tableau, Spotfire) and
+extracts canonical skills from resume and job text in one pass with a word-level trie. It also keeps an inverted
+index from skill to postings and computes the job keywords a resume is missing, which are passed to the update
+agent instead of asking it to find them."""
+
+import re
+import threading
+from collections import Counter
+
+# Canonical skill -> aliases. Matching is case-insensitive on whole words; hyphens and slashes separate words,
+# so 'ms-excel' and 'MS Excel' are the same alias.
+SKILL_ALIASES = {
+    "Python": ["python", "python3"],
+    "R": ["r", "r programming"],
+    "SQL": ["sql"],
+    "MySQL": ["mysql"],
+    "PostgreSQL": ["postgresql", "postgres"],
+    "SQL Server": ["sql server", "ms sql", "mssql", "microsoft sql server"],
+    "Teradata": ["teradata"],
+    "Snowflake": ["snowflake"],
+    "Java": ["java"],
+    "Scala": ["scala"],
+    "Golang": ["golang", "go lang"],
+    "C++": ["c++", "cpp"],
+    "C#": ["c#", "csharp"],
+    "JavaScript": ["javascript", "js", "ecmascript"],
+    "TypeScript": ["typescript", "ts"],
+    "Node.js": ["node.js", "nodejs", "node"],
+    "React": ["react", "reactjs", "react.js"],
+    "Flask": ["flask"],
+    "Django": ["django"],
+    "REST APIs": ["rest", "rest api", "rest apis", "restful", "restful apis"],
+    "Excel": ["excel", "ms excel", "microsoft excel", "advanced excel"],
+    "Power BI": ["power bi", "powerbi"],
+    "Tableau": ["tableau"],
+    "Spotfire": ["spotfire", "tibco spotfire"],
+    "Looker": ["looker"],
+    "Pandas": ["pandas"],
+    "NumPy": ["numpy"],
+    "Scikit-learn": ["scikit learn", "sklearn"],
+    "TensorFlow": ["tensorflow", "tf"],
+    "PyTorch": ["pytorch", "torch"],
+    "Keras": ["keras"],
+    "Machine Learning": ["machine learning", "ml"],
+    "Deep Learning": ["deep learning", "dl"],
+    "Natural Language Processing": ["natural language processing", "nlp"],
+    "Computer Vision": ["computer vision"],
+    "Statistics": ["statistics", "statistical analysis", "probability and statistics"],
+    "Data Analysis": ["data analysis", "data analytics"],
+    "Data Visualization": ["data visualization", "data visualisation", "visualizations", "visualization"],
+    "Data Mining": ["data mining"],
+    "ETL": ["etl", "elt", "data pipelines"],
+    "Spark": ["spark", "apache spark", "pyspark"],
+    "Hadoop": ["hadoop"],
+    "Hive": ["hive", "apache hive"],
+    "Kafka": ["kafka", "apache kafka"],
+    "Airflow": ["airflow", "apache airflow"],
+    "dbt": ["dbt"],
+    "Azure": ["azure", "microsoft azure"],
+    "AWS": ["aws", "amazon web services"],
+    "GCP": ["gcp", "google cloud", "google cloud platform"],
+    "Docker": ["docker"],
+    "Kubernetes": ["kubernetes", "k8s"],
+    "Terraform": ["terraform"],
+    "Git": ["git", "github", "gitlab"],
+    "Linux": ["linux", "unix"],
+    "Heroku": ["heroku"],
+    "Web Scraping": ["web scraping", "scraping"],
+    "Feature Engineering": ["feature engineering"],
+    "Big Data": ["big data", "big data technologies"],
+    "Communication": ["communication", "communication skills"],
+}
+
+_WORD_RE = re.compile(r"[a-z0-9+#]+(?:\.[a-z0-9]+)*", re.IGNORECASE)
+# Aliases that are also everyday words or abbreviations; they only count when written in upper case
+# (or as the skill's exact casing) in free text, e.g. 'R' but not 'r', 'TS' but not 'ts'.
+_CASE_SENSITIVE_ALIASES = {"r", "ts", "tf", "dl", "ml", "rest", "node", "torch", "js"}
+
+
+def normalize_words(text):
+    return _WORD_RE.findall((text or "").lower())
+
+
+class SkillTaxonomy:
+    def __init__(self, aliases=None):
+        """
+        Builds the alias trie.
+
+        Args:
+            aliases (dict): canonical skill -> list of aliases; SKILL_ALIASES when None. The canonical
+                name itself is always an alias.
+        """
+        self.aliases = SKILL_ALIASES if aliases is None else aliases
+        self._trie = {}
+        self._max_words = 1
+        for canonical, alias_list in self.aliases.items():
+            for alias in [canonical, *alias_list]:
+                words = normalize_words(alias)
+                if not words:
+                    continue
+                node = self._trie
+                for word in words:
+                    node = node.setdefault(word, {})
+                node[None] = canonical
+                self._max_words = max(self._max_words, len(words))
+
+    def spans(self, text):
+        """
+        Finds every longest alias match, left to right.
+
+        Yields:
+            tuple: (start, end, canonical skill) with character offsets into text.
+        """
+        matches = list(_WORD_RE.finditer(text or ""))
+        words = [m.group().lower() for m in matches]
+        trie = self._trie
+        # Only words that start an alias can start a match; the trie walk is skipped for all the others.
+        resume_at = 0
+        for index in [index for index, word in enumerate(words) if word in trie]:
+            if index < resume_at:
+                continue
+            node, match, match_end = trie, None, index
+            for end in range(index, min(len(words), index + self._max_words)):
+                node = node.get(words[end])
+                if node is None:
+                    break
+                if None in node:
+                    match, match_end = node[None], end + 1
+            if match is None:
+                continue
+            raw = matches[index].group()
+            start, stop = matches[index].start(), matches[match_end - 1].end()
+            if match_end - index == 1 and words[index] in _CASE_SENSITIVE_ALIASES and raw not in (raw.upper(), match):
+                continue
+            # Letters joined by '&' are an abbreviation ('R&D', 'P&L'), not a skill.
+            if text[start - 1:start] == "&" or text[stop:stop + 1] == "&":
+                continue
+            yield start, stop, match
+            resume_at = match_end
+
+    def _scan(self, text):
+        """Yields the canonical skill of every longest alias match, left to right."""
+        return (canonical for _, _, canonical in self.spans(text))
+
+    def extract(self, text):
+        """
+        Canonical skills mentioned in a text, in order of first mention.
+
+        Args:
+            text (str): Free text such as a job description or experience bullet.
+
+        Returns:
+            list: Canonical skill names.
+        """
+        return list(dict.fromkeys(self._scan(text)))
+
+    def extract_counts(self, text):
+        return Counter(self._scan(text))
+
+    def canonical(self, skill):
+        """
+        Normalizes one skill name from a resume's skills list, e.g. 'MS-Excel' -> 'Excel'.
+
+        Returns:
+            list: Canonical names; 'Tableau/Spotfire' gives two, and unknown skills are returned as written.
+        """
+        found = []
+        for part in re.split(r"\s*/\s*", skill or ""):
+            words = normalize_words(part)
+            node = self._trie
+            for word in words:
+                node = node.get(word) if node is not None else None
+            if node is not None and words and None in node:
+                found.append(node[None])
+            elif part.strip():
+                found.append(part.strip())
+        return found
+
+    def resume_skills(self, resume):
+        """
+        Canonical skills of a resume JSON: the skills lists plus skills mentioned in the summary,
+        experience bullets and project descriptions.
+
+        Returns:
+            list: Canonical skill names without duplicates.
+        """
+        skills = []
+        for values in (resume.get("skills") or {}).values():
+            for value in values or []:
+                skills.extend(self.canonical(value))
+        texts = [resume.get("summary") or ""]
+        for job in resume.get("experience") or []:
+            texts.extend(job.get("responsibilities") or [])
+        texts.extend(project.get("description") or "" for project in resume.get("projects") or [])
+        for text in texts:
+            skills.extend(self.extract(text))
+        return list(dict.fromkeys(skills))
+
+    def job_skills(self, job_requirements, job_description):
+        """
+        Canonical skills of a posting, most frequently mentioned first (requirements count double).
+
+        Args:
+            job_requirements: List of requirement strings, or one string.
+            job_description: The description text.
+
+        Returns:
+            list: Canonical skill names.
+        """
+        if isinstance(job_requirements, list):
+            job_requirements = "\n".join(str(item) for item in job_requirements)
+        counts = self.extract_counts(str(job_requirements or ""))
+        counts.update(counts)
+        counts.update(self.extract_counts(job_description if isinstance(job_description, str) else ""))
+        return [skill for skill, _ in counts.most_common()]
+
+    def missing_keywords(self, resume, job_requirements, job_description):
+        """
+        Job skills the resume does not cover yet, most important first.
+
+        Returns:
+            list: Canonical skill names.
+        """
+        covered = {skill.casefold() for skill in self.resume_skills(resume)}
+        return [skill for skill in self.job_skills(job_requirements, job_description) if skill.casefold() not in covered]
+
+
+_default_taxonomy = None
+_default_taxonomy_lock = threading.Lock()
+
+
+def get_default_taxonomy():
+    """Returns a process-wide SkillTaxonomy over SKILL_ALIASES, built on first use."""
+    global _default_taxonomy
+    with _default_taxonomy_lock:
+        if _default_taxonomy is None:
+            _default_taxonomy = SkillTaxonomy()
+        return _default_taxonomy
+
+
+class SkillIndex:
+    def __init__(self, taxonomy=None):
+        """
+        Inverted index from canonical skill to posting ids, so postings can be filtered by skill without
+        scanning their text.
+
+        Args:
+            taxonomy (SkillTaxonomy): Used to extract skills; the default taxonomy when None.
+        """
+        self.taxonomy = taxonomy or get_default_taxonomy()
+        self._postings = {}
+        self._skills_by_posting = {}
+
+    def add(self, posting_id, job_requirements, job_description):
+        """Indexes (or re-indexes) one posting and returns its canonical skills."""
+        self.remove(posting_id)
+        skills = self.taxonomy.job_skills(job_requirements, job_description)
+        self._skills_by_posting[posting_id] = skills
+        for skill in skills:
+            self._postings.setdefault(skill.casefold(), set()).add(posting_id)
+        return skills
+
+    def add_many(self, postings):
+        """
+        Args:
+            postings (list): Dicts with 'id', 'job_requirements' and 'job_description'.
+        """
+        for posting in postings:
+            self.add(posting["id"], posting.get("job_requirements"), posting.get("job_description"))
+
+    def remove(self, posting_id):
+        for skill in self._skills_by_posting.pop(posting_id, []):
+            ids = self._postings.get(skill.casefold())
+            if ids is not None:
+                ids.discard(posting_id)
+                if not ids:
+                    del self._postings[skill.casefold()]
+
+    def skills_of(self, posting_id):
+        return list(self._skills_by_posting.get(posting_id, []))
+
+    def postings_with(self, skill):
+        """Ids of postings mentioning the skill (any alias of it); 'Tableau/Spotfire' matches either."""
+        names = self.taxonomy.canonical(skill) or [skill]
+        return set().union(*(self._postings.get(name.casefold(), set()) for name in names))
+
+    def postings_with_all(self, skills):
+        sets = sorted((self.postings_with(skill) for skill in skills), key=len)
+        return set.intersection(*sets) if sets else set()
+
+    def postings_with_any(self, skills):
+        return set().union(*(self.postings_with(skill) for skill in skills))
@@ -0,0 +1,32 @@
+"""The AI_models modules import each other as top-level scripts, so the directory itself goes on sys.path."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TEST_DB_NAME = "ai_models_test"
+
+
+@pytest.fixture
+def mongo_client(monkeypatch):
+    """
+    Makes Database_Handler.database_link.get_mongo_client hand out mongomock clients (set MONGO_TEST_URI to
+    run against a local mongod instead) and returns the shared client for the test URI.
+    """
+    from Database_Handler import database_link
+
+    uri = os.environ.get("MONGO_TEST_URI")
+    if uri is None:
+        mongomock = pytest.importorskip("mongomock")
+        monkeypatch.setattr(database_link, "MongoClient", mongomock.MongoClient)
+        uri = "mongodb://mongomock.test:27017/"
+    monkeypatch.setattr(database_link, "_clients", {})
+    monkeypatch.setenv("Mongo_URI", uri)
+    client = database_link.get_mongo_client(uri)
+    client.drop_database(TEST_DB_NAME)
+    yield client
+    client.drop_database(TEST_DB_NAME)
+    database_link.close_mongo_clients()
@@ -0,0 +1,254 @@
+"""In-memory stand-ins for the remote services AI_models talks to, shared by the tests."""
+
+import asyncio
+import base64
+import json
+import time
+from types import SimpleNamespace
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+
+def assistant_messages(text):
+    """A list_messages() response holding one assistant text message."""
+    content = [SimpleNamespace(type="text", text=SimpleNamespace(value=text))]
+    return SimpleNamespace(data=[SimpleNamespace(role="assistant", content=content)])
+
+
+class FakeAgents:
+    """
+    Local fake of the synchronous project_client.agents interface used by agent_client.ThreadManager.
+
+    Args:
+        reply (callable): reply(prompt) -> assistant text; echoes the prompt when None.
+        status (callable): status(prompt) -> run status; always 'completed' when None.
+        latency (float): Seconds every run takes, to stand in for the service in benchmarks.
+    """
+
+    def __init__(self, reply=None, status=None, latency=0.0):
+        self.reply = reply or (lambda prompt: prompt)
+        self.status = status or (lambda prompt: "completed")
+        self.latency = latency
+        self.threads = {}
+        self.created = []
+        self.deleted = []
+        self.runs = []
+        self.list_calls = []
+
+    def create_thread(self):
+        thread_id = f"thread_{len(self.created) + 1}"
+        self.created.append(thread_id)
+        self.threads[thread_id] = []
+        return SimpleNamespace(id=thread_id)
+
+    def create_message(self, thread_id, role, content):
+        self.threads[thread_id].append((role, content))
+
+    def create_and_process_run(self, thread_id, agent_id, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._run(thread_id, agent_id, kwargs)
+
+    def _run(self, thread_id, agent_id, kwargs):
+        prompt = self.threads[thread_id][-1][1]
+        run = SimpleNamespace(id=f"run_{len(self.runs) + 1}", thread_id=thread_id, agent_id=agent_id,
+                              status=self.status(prompt), kwargs=kwargs, prompt=prompt)
+        self.runs.append(run)
+        self.threads[thread_id].append(("assistant", self.reply(prompt)))
+        return run
+
+    def list_messages(self, thread_id, **kwargs):
+        self.list_calls.append(dict(kwargs, thread_id=thread_id))
+        return assistant_messages(self.threads[thread_id][-1][1])
+
+    def delete_thread(self, thread_id):
+        self.deleted.append(thread_id)
+        del self.threads[thread_id]
+
+
+class FakeProjectClient:
+    def __init__(self, agents=None):
+        self.agents = agents or FakeAgents()
+
+
+class AsyncFakeAgents(FakeAgents):
+    """FakeAgents with the coroutine interface of the azure.ai.projects.aio client used by AsyncThreadManager."""
+
+    async def create_thread(self):
+        return FakeAgents.create_thread(self)
+
+    async def create_message(self, thread_id, role, content):
+        FakeAgents.create_message(self, thread_id, role, content)
+
+    async def create_and_process_run(self, thread_id, agent_id, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._run(thread_id, agent_id, kwargs)
+
+    async def list_messages(self, thread_id, **kwargs):
+        return FakeAgents.list_messages(self, thread_id, **kwargs)
+
+    async def delete_thread(self, thread_id):
+        FakeAgents.delete_thread(self, thread_id)
+
+
+class AsyncFakeProjectClient:
+    def __init__(self, agents=None):
+        self.agents = agents or AsyncFakeAgents()
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+def batch_labels(labels):
+    """A FakeAgents reply function answering batch email prompts with labels[id] for the ids it knows."""
+    def reply(prompt):
+        items = json.loads(prompt[prompt.index("["):])
+        return json.dumps({item["id"]: labels[item["id"]] for item in items if item["id"] in labels})
+    return reply
+
+
+def gmail_message(message_id, subject="Hello", sender="recruiter@example.com", body="Body"):
+    """A messages().get(format='full') response with a single-part plain-text body."""
+    data = base64.urlsafe_b64encode(body.encode()).decode()
+    headers = [{"name": "Subject", "value": subject}, {"name": "From", "value": sender}]
+    return {"id": message_id, "payload": {"headers": headers, "body": {"data": data}}}
+
+
+def http_error(status):
+    return HttpError(httplib2.Response({"status": status}), b"{}")
+
+
+class _Request:
+    def __init__(self, fn):
+        self._fn = fn
+
+    def execute(self):
+        return self._fn()
+
+
+class _FakeMessages:
+    def __init__(self, service):
+        self._service = service
+
+    def list(self, userId, maxResults=100, q=None, labelIds=None, pageToken=None):
+        def execute():
+            self._service.calls.append(("list", pageToken))
+            ids = self._service.inbox
+            start = int(pageToken or 0)
+            response = {"messages": [{"id": message_id} for message_id in ids[start:start + maxResults]]}
+            if start + maxResults < len(ids):
+                response["nextPageToken"] = str(start + maxResults)
+            return response
+        return _Request(execute)
+
+    def get(self, userId, id, format=None):
+        def execute():
+            self._service.calls.append(("get", id))
+            if id not in self._service.mailbox:
+                raise http_error(404)
+            return self._service.mailbox[id]
+        return _Request(execute)
+
+    def batchModify(self, userId, body):
+        def execute():
+            self._service.calls.append(("batchModify", tuple(body["ids"])))
+            if self._service.fail_batch_modify:
+                raise http_error(500)
+            for email_id in body["ids"]:
+                self._service.apply_labels(email_id, body)
+        return _Request(execute)
+
+    def modify(self, userId, id, body):
+        def execute():
+            self._service.calls.append(("modify", id))
+            if self._service.modify_error_status:
+                raise http_error(self._service.modify_error_status)
+            if id not in self._service.mailbox:
+                raise http_error(404)
+            self._service.apply_labels(id, body)
+        return _Request(execute)
+
+
+class _FakeHistory:
+    def __init__(self, service):
+        self._service = service
+
+    def list(self, userId, startHistoryId, historyTypes=None, pageToken=None):
+        def execute():
+            self._service.calls.append(("history", startHistoryId))
+            if self._service.history_expired:
+                raise http_error(404)
+            added = [message_id for history_id, message_id in self._service.history_log if history_id > int(startHistoryId)]
+            return {"history": [{"messagesAdded": [{"message": {"id": message_id}}]} for message_id in added],
+                    "historyId": str(self._service.history_id)}
+        return _Request(execute)
+
+
+class _FakeBatch:
+    def __init__(self, service, callback):
+        self._service = service
+        self._callback = callback
+        self._requests = []
+
+    def add(self, request, request_id):
+        self._requests.append((request_id, request))
+
+    def execute(self):
+        self._service.calls.append(("batch", len(self._requests)))
+        for request_id, request in self._requests:
+            if request_id in self._service.fail_in_batch:
+                self._callback(request_id, None, http_error(500))
+                continue
+            try:
+                self._callback(request_id, request.execute(), None)
+            except HttpError as e:
+                self._callback(request_id, None, e)
+
+
+class FakeGmailService:
+    """
+    Local fake of the Gmail API service object: messages().list/get/batchModify/modify, history().list,
+    getProfile and batch HTTP requests, all against an in-memory mailbox.
+    """
+
+    def __init__(self):
+        self.mailbox = {}
+        self.inbox = []
+        self.labels = {}
+        self.history_log = []
+        self.history_id = 100
+        self.history_expired = False
+        self.fail_in_batch = set()
+        self.fail_batch_modify = False
+        self.modify_error_status = None
+        self.calls = []
+
+    def deliver(self, message_id, **fields):
+        """Adds a message to the top of the inbox and records it in the mailbox history."""
+        self.mailbox[message_id] = gmail_message(message_id, **fields)
+        self.inbox.insert(0, message_id)
+        self.history_id += 1
+        self.history_log.append((self.history_id, message_id))
+
+    def apply_labels(self, email_id, body):
+        labels = self.labels.setdefault(email_id, set())
+        labels.update(body.get("addLabelIds", []))
+        labels.difference_update(body.get("removeLabelIds", []))
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return _FakeMessages(self)
+
+    def history(self):
+        return _FakeHistory(self)
+
+    def getProfile(self, userId):
+        return _Request(lambda: {"historyId": str(self.history_id)})
+
+    def new_batch_http_request(self, callback):
+        return _FakeBatch(self, callback)
@@ -0,0 +1,125 @@
+import asyncio
+
+from agent_client import ThreadManager, send_message
+from resume_agent import ResumeAIUpdater
+from tests.fakes import FakeAgents, FakeProjectClient, batch_labels
+
+
+def make_manager(agents=None, max_uses=20):
+    agents = agents or FakeAgents()
+    return agents, ThreadManager(FakeProjectClient(agents), max_uses=max_uses)
+
+
+def test_threads_are_reused_per_task():
+    agents, manager = make_manager()
+    assert manager.send("agent", "first", task="email") == "first"
+    assert manager.send("agent", "second", task="email") == "second"
+    manager.send("agent", "third", task="resume_update")
+
+    assert agents.created == ["thread_1", "thread_2"]
+    assert [run.thread_id for run in agents.runs] == ["thread_1", "thread_1", "thread_2"]
+    assert manager.stats["created"] == 2
+    assert manager.stats["reused"] == 1
+
+
+def test_thread_is_rotated_at_the_use_cap():
+    agents, manager = make_manager(max_uses={"email": 2, "default": 20})
+    for prompt in ("a", "b", "c"):
+        manager.send("agent", prompt, task="email")
+    manager.close(wait=True)
+
+    assert [run.thread_id for run in agents.runs] == ["thread_1", "thread_1", "thread_2"]
+    assert agents.deleted == ["thread_1", "thread_2"]
+    assert manager.stats["deleted"] == 2
+
+
+def test_unhealthy_thread_is_deleted_not_reused():
+    agents, manager = make_manager(FakeAgents(status=lambda prompt: "failed" if prompt == "bad" else "completed"))
+    manager.send("agent", "bad", task="email")
+    manager.send("agent", "good", task="email")
+    manager.close(wait=True)
+
+    assert [run.thread_id for run in agents.runs] == ["thread_1", "thread_2"]
+    assert agents.deleted[0] == "thread_1"
+
+
+def test_reused_threads_truncate_to_the_last_message():
+    agents, manager = make_manager()
+    manager.send("agent", "hello", task="email")
+
+    strategy = agents.runs[0].kwargs["truncation_strategy"]
+    assert strategy.type == "last_messages"
+    assert strategy.last_messages == 1
+    assert agents.list_calls[0]["limit"] == 1
+    assert agents.list_calls[0]["order"] == "desc"
+    assert agents.list_calls[0]["run_id"] == agents.runs[0].id
+
+
+def test_single_use_threads_skip_truncation_and_are_deleted():
+    agents, manager = make_manager(max_uses=1)
+    assert send_message(manager.project_client, "agent", "once", thread_manager=manager) == "once"
+    manager.close(wait=True)
+
+    assert "truncation_strategy" not in agents.runs[0].kwargs
+    assert agents.deleted == ["thread_1"]
+
+
+def make_updater(agents):
+    updater = ResumeAIUpdater(connection_string="fake", agent_id="fake-agent")
+    updater.project_client = FakeProjectClient(agents)
+    return updater
+
+
+def test_classify_emails_batch_uses_one_run_per_chunk():
+    agents = FakeAgents(reply=batch_labels({"m1": 0, "m2": 1, "m3": 2}))
+    updater = make_updater(agents)
+    labels = updater.classify_emails_batch([("m1", "no thanks"), ("m2", "next round"), ("m3", "newsletter")])
+
+    assert labels == {"m1": 0, "m2": 1, "m3": 2}
+    assert len(agents.runs) == 1
+
+
+def test_classify_emails_batch_splits_by_token_budget():
+    emails = [(f"m{i}", "x" * 400) for i in range(10)]
+    agents = FakeAgents(reply=batch_labels({message_id: 2 for message_id, _ in emails}))
+    labels = make_updater(agents).classify_emails_batch(emails, max_batch_tokens=300)
+
+    assert set(labels.values()) == {2}
+    assert len(agents.runs) > 1
+
+
+def test_classify_emails_batch_retries_missing_items_individually():
+    def reply(prompt):
+        if prompt.startswith("Classify each"):
+            return '```json\n{"m1": 1, "m2": "maybe"}\n```'
+        return "0"
+
+    agents = FakeAgents(reply=reply)
+    labels = make_updater(agents).classify_emails_batch([("m1", "a"), ("m2", "b")])
+
+    assert labels == {"m1": 1, "m2": 0}
+    assert len(agents.runs) == 2
+
+
+def test_classify_emails_batch_without_retry_leaves_gaps():
+    agents = FakeAgents(reply=lambda prompt: "not json at all")
+    labels = make_updater(agents).classify_emails_batch([("m1", "a")], retry_missing=False)
+    assert labels == {"m1": None}
+
+
+class _Closable:
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+def test_aclose_closes_the_async_client_and_its_credential():
+    updater = ResumeAIUpdater(connection_string="fake", agent_id="fake-agent")
+    client, credential = _Closable(), _Closable()
+    updater._async_project_client, updater._async_credential = client, credential
+    asyncio.run(updater.aclose())
+
+    assert client.closed and credential.closed
+    assert updater._async_project_client is None and updater._async_credential is None
@@ -0,0 +1,81 @@
+import json
+
+from agent_response import AgentResponseHandler, extract_json_text, is_truncated, repair_json
+from resume_agent import ResumeAIUpdater, json_data
+from resume_cache import TailoredResumeCache
+from tests.fakes import FakeAgents, FakeProjectClient
+
+TRUNCATED = ('{"resume": {"summary": "Analyst skilled in SQL, Tab", "projects": [{"title": "Churn", '
+             '"description": "Regression')
+
+
+def test_extract_json_text_ignores_fences_and_prose():
+    assert extract_json_text('Here you go:\n```json\n{"a": [1, 2]}\n```\nThanks') == '{"a": [1, 2]}'
+    assert extract_json_text('Result: {"a": {"b": "}"}} trailing') == '{"a": {"b": "}"}}'
+    assert extract_json_text('{"a": [1, ') == '{"a": [1, '
+    assert extract_json_text("no json here") is None
+
+
+def test_repair_json_fixes_quotes_and_trailing_commas():
+    assert json.loads(repair_json('{“a”: [1, 2,], }')) == {"a": [1, 2]}
+
+
+def test_repair_json_drops_dangling_keys():
+    assert json.loads(repair_json('{"skills": {"programming": ["a", "b"], "bi_to')) == \
+        {"skills": {"programming": ["a", "b"]}}
+    assert json.loads(repair_json('{"a": 1, "b": ')) == {"a": 1}
+    assert json.loads(repair_json('{"a": 1, "b"')) == {"a": 1}
+    assert json.loads(repair_json('{"a": ["x", ')) == {"a": ["x"]}
+
+
+def test_is_truncated():
+    assert is_truncated(TRUNCATED)
+    assert is_truncated('{"a": "open')
+    assert not is_truncated('{"a": 1,}')
+
+
+def test_handler_counts_how_each_reply_was_recovered():
+    handler = AgentResponseHandler()
+    assert handler.parse_with_outcome('{"a": 1}') == ({"a": 1}, "clean")
+    assert handler.parse_with_outcome('```json\n{"a": 1}\n```') == ({"a": 1}, "extracted")
+    assert handler.parse_with_outcome('{"a": 1,}') == ({"a": 1}, "repaired")
+    assert handler.parse_with_outcome(TRUNCATED) == (None, "truncated")
+    assert handler.parse_with_outcome("") == (None, "failed")
+    assert handler.stats["truncated"] == 1 and handler.stats["failed"] == 2
+    assert handler.saved_calls == 2
+
+
+def test_truncated_resume_is_requested_again():
+    replies = iter([TRUNCATED, json.dumps({"resume": {"summary": "Complete"}})])
+    handler = AgentResponseHandler()
+    resume = handler.parse_resume(next(replies), unwrap_key="resume", retry=lambda: next(replies))
+
+    assert resume["summary"] == "Complete"
+    assert handler.stats["retries"] == 1
+
+
+def make_updater(tmp_path, replies):
+    cache = TailoredResumeCache(str(tmp_path / "cache.sqlite3"))
+    updater = ResumeAIUpdater(connection_string="fake", agent_id="fake-agent", cache=cache)
+    updater.project_client = FakeProjectClient(FakeAgents(reply=lambda prompt: next(replies)))
+    return updater, cache
+
+
+def update(updater):
+    return updater.update_resume_with_ai(json.dumps(["SQL"]), json.dumps("Write SQL."), json_data)
+
+
+def test_truncated_update_reply_is_retried_and_only_the_full_reply_cached(tmp_path):
+    full = json.dumps({"resume": {"summary": "Complete"}})
+    updater, cache = make_updater(tmp_path, iter([TRUNCATED, full]))
+
+    assert update(updater)["summary"] == "Complete"
+    assert updater.response_handler.stats["repaired"] == 0
+    assert cache.stats()["disk_entries"] == 1
+
+
+def test_repaired_update_reply_is_returned_but_not_cached(tmp_path):
+    updater, cache = make_updater(tmp_path, iter(['{"resume": {"summary": "Fixed",},}']))
+
+    assert update(updater)["summary"] == "Fixed"
+    assert cache.stats()["disk_entries"] == 0
@@ -0,0 +1,129 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import agent_scheduler
+from agent_scheduler import AgentCallScheduler
+from resume_agent import ResumeAIUpdater, json_data
+from tests.fakes import AsyncFakeAgents, AsyncFakeProjectClient
+
+
+class ServiceError(Exception):
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers={"Retry-After": retry_after} if retry_after else {})
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Records backoff delays instead of sleeping them."""
+    delays = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(agent_scheduler.asyncio, "sleep", fake_sleep)
+    return delays
+
+
+def test_map_never_exceeds_max_in_flight():
+    running, peak = 0, 0
+
+    async def call(item):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return item * 2
+
+    results = asyncio.run(AgentCallScheduler(max_in_flight=3).map(call, range(10)))
+
+    assert results == [item * 2 for item in range(10)]
+    assert peak == 3
+
+
+def test_timed_out_attempts_are_retried_then_raised(sleeps):
+    attempts = []
+
+    async def hang():
+        attempts.append(1)
+        await asyncio.Event().wait()
+
+    scheduler = AgentCallScheduler(timeout=0.01, max_retries=2)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(scheduler.run(hang))
+    assert len(attempts) == 3
+    assert len(sleeps) == 2
+
+
+def test_throttled_call_retries_with_jittered_backoff(sleeps, monkeypatch):
+    monkeypatch.setattr(agent_scheduler.random, "uniform", lambda low, high: high / 2)
+    outcomes = [ServiceError(429), ServiceError(503), ServiceError(429), "done"]
+
+    async def call():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    scheduler = AgentCallScheduler(backoff_base=1.0, backoff_max=3.0)
+    assert asyncio.run(scheduler.run(call)) == "done"
+    assert sleeps == [0.5, 1.0, 1.5]
+
+
+def test_jitter_stays_below_the_exponential_bound():
+    scheduler = AgentCallScheduler(backoff_base=1.0, backoff_max=60.0)
+    delays = [scheduler._retry_delay(ServiceError(429), attempt=3) for _ in range(200)]
+
+    assert all(0 <= delay <= 8 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_retry_after_header_wins_over_backoff(sleeps):
+    outcomes = [ServiceError(429, retry_after="2"), "done"]
+
+    async def call():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert asyncio.run(AgentCallScheduler().run(call)) == "done"
+    assert sleeps == [2.0]
+
+
+def test_client_errors_are_not_retried(sleeps):
+    async def call():
+        raise ServiceError(400)
+
+    results = asyncio.run(AgentCallScheduler().map(lambda _: call(), [1]))
+
+    assert isinstance(results[0], ServiceError)
+    assert sleeps == []
+
+
+def test_updater_runs_jobs_through_the_scheduler():
+    def echo_resume(prompt):
+        return json.dumps({"resume": json.loads(prompt[prompt.index("{"):])["resume"]})
+
+    client = AsyncFakeProjectClient(AsyncFakeAgents(echo_resume))
+    updater = ResumeAIUpdater(connection_string="fake", agent_id="fake-agent", async_project_client=client)
+    jobs = [(json.dumps(["Python"]), json.dumps(f"Posting {i}")) for i in range(4)]
+
+    async def run():
+        try:
+            return await updater.update_resume_for_jobs_async(jobs, json_data, AgentCallScheduler(max_in_flight=2))
+        finally:
+            await updater.aclose()
+
+    results = asyncio.run(run())
+
+    assert all(result["name"] == json.loads(json_data)["name"] for result in results)
+    assert len(client.agents.runs) == 4
+    assert client.closed
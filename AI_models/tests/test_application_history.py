@@ -0,0 +1,72 @@
+import pytest
+
+from Database_Handler.application_history import ApplicationHistory, BloomFilter, job_fingerprint
+from Database_Handler.profile_setting import ProfileDatabaseHandler
+from tests.conftest import TEST_DB_NAME
+
+DESCRIPTION = "Build dashboards in Power BI. Apply at https://acme.example.com/jobs/1"
+
+
+@pytest.fixture
+def handler(mongo_client):
+    return ProfileDatabaseHandler(client=mongo_client, db_name=TEST_DB_NAME)
+
+
+def test_fingerprint_matches_reposts_of_the_same_job():
+    original = job_fingerprint("Acme, Inc.", "Sr. Data Analyst", DESCRIPTION)
+
+    assert job_fingerprint("ACME inc", "senior data analyst ",
+                           "build dashboards in power bi!  Apply at https://other.example.com/x") == original
+    assert job_fingerprint("Acme", "Data Analyst", DESCRIPTION) != original
+    assert job_fingerprint("Globex", "Sr. Data Analyst", DESCRIPTION) != original
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(500, error_rate=0.01)
+    items = [f"user:{i}" for i in range(500)]
+    for item in items:
+        bloom.add(item)
+
+    assert all(item in bloom for item in items)
+    assert sum(f"other:{i}" in bloom for i in range(2000)) < 100
+    assert bloom.count == 500
+
+
+def test_record_application_rejects_a_repost(handler):
+    history = handler.get_application_history()
+
+    assert history.record_application("u1", "Acme, Inc.", "Sr. Data Analyst", DESCRIPTION, job_url="a")
+    assert not history.record_application("u1", "ACME", "Senior Data Analyst", DESCRIPTION, job_url="b")
+    assert history.record_application("u2", "Acme", "Senior Data Analyst", DESCRIPTION)
+    assert handler.applications.count_documents({}) == 2
+    assert handler.applications.find_one({"user_id": "u1"})["job_url"] == "a"
+
+
+def test_has_applied_uses_the_filter_then_the_database(handler):
+    history = handler.get_application_history()
+    history.record_application("u1", "Acme", "Data Analyst", DESCRIPTION)
+
+    assert history.has_applied("u1", "Acme Corp", "Data Analyst", DESCRIPTION)
+    assert not history.has_applied("u1", "Globex", "Data Analyst", DESCRIPTION)
+    assert not history.has_applied("u2", "Acme", "Data Analyst", DESCRIPTION)
+    assert history.stats["confirmed_duplicates"] == 1
+    assert history.stats["checks"] == 3
+    assert history.stats["filter_negatives"] + history.stats["false_positives"] == 2
+
+
+def test_filter_is_rebuilt_from_stored_applications(handler):
+    handler.get_application_history().record_application("u1", "Acme", "Data Analyst", DESCRIPTION)
+
+    reopened = ApplicationHistory(handler.applications)
+    assert reopened.has_applied("u1", "Acme", "Data Analyst", DESCRIPTION)
+    assert reopened.stats["confirmed_duplicates"] == 1
+
+
+def test_filter_grows_past_its_capacity(handler):
+    history = ApplicationHistory(handler.applications, capacity=1)
+    capacity = history._bloom.capacity
+    for i in range(capacity + 1):
+        history.record_application("u1", "Acme", f"Analyst {i}", DESCRIPTION)
+
+    assert history._bloom.capacity > capacity
+    assert history.has_applied("u1", "Acme", "Analyst 0", DESCRIPTION)
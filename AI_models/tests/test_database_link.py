@@ -0,0 +1,91 @@
+import pytest
+from pymongo import DeleteOne, InsertOne, UpdateOne
+
+from Database_Handler import database_link
+from Database_Handler.database_link import (ProfileRepository, ResumeRepository, get_document_from_mongodb,
+                                            get_mongo_client)
+from tests.conftest import TEST_DB_NAME
+
+
+def test_client_is_shared_per_uri_and_options(mongo_client):
+    uri = "mongodb://mongomock.test:27017/"
+    assert get_mongo_client(uri) is mongo_client
+    assert get_mongo_client() is mongo_client
+
+    other_options = get_mongo_client(uri, maxPoolSize=5)
+    assert other_options is not mongo_client
+    assert get_mongo_client(uri, maxPoolSize=5) is other_options
+    assert len(database_link._clients) == 2
+
+
+def test_close_mongo_clients_forgets_shared_clients(mongo_client):
+    database_link.close_mongo_clients()
+    assert database_link._clients == {}
+
+
+def test_resume_round_trip_with_projection(mongo_client):
+    resumes = ResumeRepository.from_uri(db_name=TEST_DB_NAME)
+    assert resumes.collection.name == "resumes"
+    ids = resumes.insert_many([
+        {"name": "data-analyst", "user_id": "u1", "created_at": 1, "skills": ["SQL"]},
+        {"name": "bi-developer", "user_id": "u1", "created_at": 2, "skills": ["Power BI"]},
+        {"name": "engineer", "user_id": "u2", "created_at": 3, "skills": ["Python"]},
+    ])
+    assert len(ids) == 3
+
+    assert resumes.get_by_name("engineer", {"_id": 0, "user_id": 1}) == {"user_id": "u2"}
+    found = resumes.find({"user_id": "u1"}, {"_id": 0, "name": 1}, sort=[("created_at", -1)])
+    assert found == [{"name": "bi-developer"}, {"name": "data-analyst"}]
+    assert [doc["name"] for doc in resumes.get_by_user("u1")] == ["data-analyst", "bi-developer"]
+    assert resumes.find({}, limit=1, batch_size=10)[0]["name"] == "data-analyst"
+
+
+def test_upsert_round_trip(mongo_client):
+    resumes = ResumeRepository.from_client(mongo_client, TEST_DB_NAME)
+    assert resumes.upsert({"name": "a"}, {"version": 1}).upserted_id is not None
+    assert resumes.upsert({"name": "a"}, {"version": 2}).upserted_id is None
+    assert resumes.find({"name": "a"}, {"_id": 0}) == [{"name": "a", "version": 2}]
+
+
+def test_bulk_write(mongo_client):
+    resumes = ResumeRepository.from_client(mongo_client, TEST_DB_NAME)
+    assert resumes.insert_many([]) == []
+    assert resumes.bulk_write([]) is None
+
+    result = resumes.bulk_write([InsertOne({"name": "a"}), InsertOne({"name": "b"}), DeleteOne({"name": "a"})],
+                                ordered=True)
+    assert result.inserted_count == 2
+    assert result.deleted_count == 1
+    assert resumes.find({}, {"_id": 0}) == [{"name": "b"}]
+
+
+def test_bulk_write_update_upserts(mongo_client):
+    if "mongomock" in type(mongo_client).__module__:
+        # mongomock's bulk builder does not accept the 'sort' argument newer pymongo passes for updates.
+        pytest.skip("UpdateOne in bulk_write needs a real mongod (set MONGO_TEST_URI)")
+    resumes = ResumeRepository.from_client(mongo_client, TEST_DB_NAME)
+    resumes.insert_many([{"name": "a", "version": 1}])
+    result = resumes.bulk_write([UpdateOne({"name": "b"}, {"$set": {"version": 1}}, upsert=True),
+                                 UpdateOne({"name": "a"}, {"$set": {"version": 2}})])
+    assert result.upserted_count == 1
+    assert result.modified_count == 1
+    assert resumes.get_by_name("a", {"_id": 0, "version": 1}) == {"version": 2}
+
+
+def test_profile_lookups(mongo_client):
+    profiles = ProfileRepository.from_client(mongo_client, TEST_DB_NAME)
+    assert profiles.collection.name == "userprofiles"
+    profiles.insert_many([{"user": "u1", "city": "Austin"}, {"user": "u2", "city": "Denver"},
+                          {"user": "u3", "city": "Boston"}])
+
+    assert profiles.get_by_user("u2", {"_id": 0}) == {"user": "u2", "city": "Denver"}
+    assert profiles.get_by_user("missing") is None
+    assert sorted(doc["user"] for doc in profiles.get_by_users(["u1", "u3", "nobody"])) == ["u1", "u3"]
+
+
+def test_get_document_from_mongodb_uses_the_shared_client(mongo_client):
+    mongo_client[TEST_DB_NAME]["resumes"].insert_one({"name": "John", "title": "Analyst"})
+    uri = "mongodb://mongomock.test:27017/"
+    doc = get_document_from_mongodb(uri, TEST_DB_NAME, "resumes", {"name": "John"}, {"_id": 0})
+    assert doc == {"name": "John", "title": "Analyst"}
+    assert len(database_link._clients) == 1
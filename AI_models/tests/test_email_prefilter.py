@@ -0,0 +1,57 @@
+from email_prefilter import EmailTriage, RuleBasedEmailClassifier
+from resume_agent import ResumeAIUpdater
+from tests.fakes import FakeAgents, FakeProjectClient, batch_labels
+
+REJECTION = ("Hi Jane,\n\nThank you for your interest in the Data Analyst position at Acme. After careful "
+             "consideration, we have decided to move forward with other candidates whose experience more closely "
+             "matches our needs. We wish you the best in your search.\n\nAcme Talent Team")
+SOFT_REJECTION = ("Thank you for applying to Acme. Unfortunately, the position has been filled. "
+                  "We will keep your resume on file.")
+CONFIRMATION = ("Thank you for applying to the Data Analyst role at Acme! We have received your application "
+                "and our recruiting team will review it shortly.")
+COURTESY_ONLY = "Thank you for your application to Acme. Our team reviews every submission carefully."
+INTERVIEW = ("Hi Jane, thank you for your interest in Acme. We would like to invite you to an interview for the "
+             "Data Analyst role. Please share your availability for next week.")
+AMBIGUOUS = "Unfortunately the recruiter is out this week; next steps will follow."
+
+
+def test_templated_rejections_are_decided_locally():
+    rules = RuleBasedEmailClassifier()
+    assert rules.predict(REJECTION) == (0, 0.95)
+    assert rules.predict(SOFT_REJECTION) == (0, 0.95)
+
+
+def test_confirmations_and_interviews_are_decided_locally():
+    rules = RuleBasedEmailClassifier()
+    assert rules.predict(CONFIRMATION) == (2, 0.95)
+    assert rules.predict(COURTESY_ONLY) == (2, 0.9)
+    assert rules.predict(INTERVIEW) == (1, 0.9)
+
+
+def test_conflicting_rules_lower_the_confidence():
+    label, confidence = RuleBasedEmailClassifier().predict(AMBIGUOUS)
+    assert label == 0 and confidence < 0.85
+    assert RuleBasedEmailClassifier().predict("Lunch on Friday?") == (None, 0.0)
+
+
+def make_triage(reply):
+    updater = ResumeAIUpdater(connection_string="fake", agent_id="fake-agent")
+    agents = FakeAgents(reply=reply)
+    updater.project_client = FakeProjectClient(agents)
+    return agents, EmailTriage(agent=updater)
+
+
+def test_triage_only_sends_undecided_emails_to_the_agent():
+    agents, triage = make_triage(lambda prompt: "1")
+    assert [triage.classify(body) for body in (REJECTION, CONFIRMATION, INTERVIEW, AMBIGUOUS)] == [0, 2, 1, 1]
+    assert len(agents.runs) == 1
+    assert triage.avoided_calls() == {"handled_locally": 3, "sent_to_agent": 1, "avoided_ratio": 0.75}
+
+
+def test_classify_many_batches_the_undecided_emails():
+    agents, triage = make_triage(batch_labels({"m4": 0}))
+    labels = triage.classify_many([("m1", REJECTION), ("m2", CONFIRMATION), ("m3", INTERVIEW), ("m4", AMBIGUOUS)])
+
+    assert labels == {"m1": 0, "m2": 2, "m3": 1, "m4": 0}
+    assert len(agents.runs) == 1
+    assert EmailTriage().classify_many([("m4", AMBIGUOUS)]) == {"m4": None}
@@ -0,0 +1,130 @@
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+
+from embedding_index import EmbeddingIndex, HashingEmbedder
+
+POSTINGS = [
+    {"id": "bi", "title": "BI Developer", "job_requirements": ["Power BI", "SQL"], "job_description": "Dashboards."},
+    {"id": "ml", "title": "ML Engineer", "job_requirements": ["PyTorch"], "job_description": "Train models."},
+]
+RESUME = {
+    "summary": "Analyst building Power BI dashboards with SQL.",
+    "experience": [{"title": "Analyst", "company": "Acme", "responsibilities": ["Built dashboards"]}],
+    "projects": [{"title": "Churn model", "description": "Trained models in PyTorch."}],
+}
+
+
+def make_index(tmp_path, **kwargs):
+    index = EmbeddingIndex(str(tmp_path / "index"), embedder=HashingEmbedder(dim=256), **kwargs)
+    index.add_postings(POSTINGS)
+    return index
+
+
+def test_rank_postings_only_returns_postings(tmp_path):
+    ranked = make_index(tmp_path).rank_postings(RESUME, resume_id="resume:1", k=5)
+    assert [item["id"] for item in ranked][0] == "bi"
+    assert {item["id"] for item in ranked} == {"bi", "ml"}
+    assert ranked[0]["best_section"].startswith("resume:1:")
+
+
+def test_rank_postings_removes_sections_the_resume_no_longer_has(tmp_path):
+    index = make_index(tmp_path)
+    index.rank_postings(RESUME, resume_id="resume:1")
+    index.rank_postings(dict(RESUME, projects=[]), resume_id="resume:1:extra")
+    index.rank_postings(dict(RESUME, projects=[]), resume_id="resume:1")
+
+    assert "resume:1:project:0" not in index.ids
+    assert "resume:1:summary" in index.ids
+    # A different resume whose id merely starts with the same text keeps its sections.
+    assert "resume:1:extra:summary" in index.ids
+
+
+class _StubHnswIndex:
+    """Brute-force stand-in for hnswlib.Index with the same calls and inner-product distances."""
+
+    built = []
+
+    def __init__(self, space, dim):
+        assert space == "ip"
+        self.dim = dim
+        self.vectors = np.zeros((0, dim), dtype=np.float32)
+        self.labels = np.zeros(0, dtype=np.int64)
+        _StubHnswIndex.built.append(self)
+
+    def init_index(self, max_elements, ef_construction, M):
+        self.max_elements = max_elements
+
+    def add_items(self, vectors, labels):
+        assert len(vectors) <= self.max_elements
+        self.vectors, self.labels = np.asarray(vectors), np.asarray(labels)
+
+    def set_ef(self, ef):
+        self.ef = ef
+
+    def knn_query(self, queries, k):
+        scores = np.asarray(queries) @ self.vectors.T
+        top = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+        return self.labels[top], 1 - np.take_along_axis(scores, top, axis=1)
+
+
+def test_prefixed_search_uses_the_hnsw_index(tmp_path, monkeypatch):
+    _StubHnswIndex.built = []
+    monkeypatch.setitem(sys.modules, "hnswlib", SimpleNamespace(Index=_StubHnswIndex))
+    index = make_index(tmp_path, use_ann=True)
+    ranked = index.rank_postings(RESUME, resume_id="resume:1", k=5)
+
+    assert {item["id"] for item in ranked} == {"bi", "ml"}
+    assert ranked == make_index(tmp_path / "brute").rank_postings(RESUME, resume_id="resume:1", k=5)
+    assert "job:" in index._ann
+    assert len(_StubHnswIndex.built) == 1 and len(_StubHnswIndex.built[0].labels) == len(POSTINGS)
+
+    index.search(["Power BI dashboards"], k=1, prefix="job:")
+    assert len(_StubHnswIndex.built) == 1
+    index.add_postings([{"id": "new", "title": "Data Engineer", "job_requirements": ["Spark"]}])
+    assert index.search(["Spark pipelines"], k=1, prefix="job:")[0][0][0] == "job:new"
+    assert len(_StubHnswIndex.built) == 2
+
+
+def test_search_falls_back_to_brute_force_without_hnswlib(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "hnswlib", None)
+    index = make_index(tmp_path, use_ann=True)
+
+    assert index.search(["Power BI dashboards"], k=1, prefix="job:")[0][0][0] == "job:bi"
+    assert index.use_ann is False
+
+
+def test_reopened_index_skips_unchanged_texts(tmp_path):
+    embedder = HashingEmbedder(dim=256)
+    index = EmbeddingIndex(str(tmp_path / "index"), embedder=embedder)
+    index.add_postings(POSTINGS)
+    index.save()
+    before = index.vectors_for(["job:bi", "job:ml"])
+
+    reopened = EmbeddingIndex(str(tmp_path / "index"), embedder=embedder)
+    assert reopened.add_postings(POSTINGS) == 0
+    assert reopened.stats == {"embedded": 0, "unchanged": 2}
+    assert np.array_equal(reopened.vectors_for(["job:bi", "job:ml"]), before)
+    assert reopened.add_postings([dict(POSTINGS[0], job_description="Reports.")]) == 1
+
+
+def test_reopening_with_another_embedder_re_embeds(tmp_path):
+    index = make_index(tmp_path)
+    index.save()
+
+    reopened = EmbeddingIndex(str(tmp_path / "index"), embedder=HashingEmbedder(dim=128))
+    assert len(reopened) == 0
+    assert reopened.add_postings(POSTINGS) == 2
+
+
+def test_vectors_file_grows_past_initial_capacity(tmp_path):
+    index = EmbeddingIndex(str(tmp_path / "index"), embedder=HashingEmbedder(dim=64), initial_capacity=2)
+    items = [(f"job:{i}", f"posting number {i} with sql") for i in range(5)]
+    index.upsert(items)
+    index.save()
+
+    assert index._vectors.shape[0] == 8
+    reopened = EmbeddingIndex(str(tmp_path / "index"), embedder=HashingEmbedder(dim=64))
+    assert len(reopened) == 5
+    assert np.allclose(reopened.vectors_for(["job:0", "job:4"]), index.embedder.embed([items[0][1], items[4][1]]))
@@ -0,0 +1,87 @@
+import time
+
+from agentconnectsemail import GmailMutationQueue
+from tests.fakes import FakeGmailService
+
+
+def make_service(*message_ids):
+    service = FakeGmailService()
+    for message_id in message_ids:
+        service.deliver(message_id)
+    return service
+
+
+def test_flush_groups_changes_per_action():
+    service = make_service("a", "b", "c")
+    queue = GmailMutationQueue(service, max_delay=None)
+    queue.enqueue("star", "a")
+    queue.enqueue("star", "b")
+    queue.enqueue("trash", "c")
+    report = queue.flush()
+
+    assert report == {"applied": {"star": 2, "trash": 1}, "failed": {}}
+    assert [call for call in service.calls if call[0] == "batchModify"] == [("batchModify", ("a", "b")),
+                                                                            ("batchModify", ("c",))]
+    assert service.labels["c"] == {"TRASH"}
+    assert queue.pending() == {"star": [], "trash": []}
+
+
+def test_size_trigger_flushes_on_enqueue():
+    service = make_service("a", "b")
+    queue = GmailMutationQueue(service, max_pending=2, max_delay=None)
+    assert queue.enqueue("star", "a") is None
+    assert queue.enqueue("star", "b")["applied"]["star"] == 2
+
+
+def test_timer_flushes_a_partial_batch():
+    service = make_service("a")
+    queue = GmailMutationQueue(service, max_delay=0.05)
+    queue.enqueue("star", "a")
+    deadline = time.monotonic() + 2
+    while "a" not in service.labels and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert service.labels["a"] == {"STARRED"}
+    assert queue.pending()["star"] == []
+
+
+def test_journal_survives_a_restart_and_is_compacted(tmp_path):
+    journal = str(tmp_path / "mutations.jsonl")
+    service = make_service("a", "b")
+    first = GmailMutationQueue(service, journal_path=journal, max_delay=None)
+    first.enqueue("star", "a")
+    first.enqueue("trash", "b")
+    first.enqueue("star", "a")
+    with open(journal) as f:
+        assert len(f.readlines()) == 2
+
+    second = GmailMutationQueue(service, journal_path=journal, max_delay=None)
+    assert second.pending() == {"star": ["a"], "trash": ["b"]}
+    second.flush()
+    with open(journal) as f:
+        assert f.read() == ""
+
+
+def test_failed_batch_falls_back_to_single_modifies():
+    service = make_service("a", "b")
+    service.fail_batch_modify = True
+    queue = GmailMutationQueue(service, max_delay=None)
+    queue.enqueue("star", "a")
+    queue.enqueue("star", "gone")
+    report = queue.flush()
+
+    assert report["applied"]["star"] == 1
+    assert list(report["failed"]) == ["gone"]
+    # A missing message is rejected permanently and not queued again.
+    assert queue.pending()["star"] == []
+
+
+def test_transient_failures_stay_queued():
+    service = make_service("a")
+    service.fail_batch_modify = True
+    queue = GmailMutationQueue(service, max_delay=None)
+    service.modify_error_status = 503
+    queue.enqueue("star", "a")
+    report = queue.flush()
+
+    assert list(report["failed"]) == ["a"]
+    assert queue.pending()["star"] == ["a"]
@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+from agentconnectsemail import GmailReader
+from tests.fakes import FakeGmailService
+
+
+@pytest.fixture
+def service():
+    service = FakeGmailService()
+    for message_id in ("m1", "m2", "m3"):
+        service.deliver(message_id, subject=f"Subject {message_id}")
+    return service
+
+
+def make_reader(service, tmp_path):
+    return GmailReader("unused.json", checkpoint_path=str(tmp_path / "checkpoint.json"), service=service)
+
+
+def stored_history_id(tmp_path):
+    with open(tmp_path / "checkpoint.json") as f:
+        return json.load(f)["history_id"]
+
+
+def test_iter_messages_pages_and_batches(service):
+    reader = GmailReader("unused.json", service=service)
+    messages = list(reader.iter_messages(page_size=2, batch_size=2))
+
+    assert [message_id for _, message_id, _, _ in messages] == ["m3", "m2", "m1"]
+    assert messages[0][2] == "Subject m3"
+    assert messages[0][3] == "Body"
+    assert [call for call in service.calls if call[0] == "list"] == [("list", None), ("list", "2")]
+    assert [call for call in service.calls if call[0] == "batch"] == [("batch", 2), ("batch", 1)]
+
+
+def test_first_run_scans_and_stores_the_history_id(service, tmp_path):
+    reader = make_reader(service, tmp_path)
+    assert [message[1] for message in reader.iter_new_messages()] == ["m3", "m2", "m1"]
+    assert stored_history_id(tmp_path) == str(service.history_id)
+
+
+def test_later_runs_read_only_new_history_and_advance_the_checkpoint(service, tmp_path):
+    reader = make_reader(service, tmp_path)
+    list(reader.iter_new_messages())
+    first_checkpoint = stored_history_id(tmp_path)
+    service.deliver("m4")
+    service.deliver("m5")
+    service.calls.clear()
+
+    assert [message[1] for message in reader.iter_new_messages()] == ["m4", "m5"]
+    assert ("history", first_checkpoint) in service.calls
+    assert not any(call[0] == "list" for call in service.calls)
+    assert int(stored_history_id(tmp_path)) == service.history_id > int(first_checkpoint)
+
+    assert list(reader.iter_new_messages()) == []
+
+
+def test_expired_history_falls_back_to_a_full_list(service, tmp_path):
+    reader = make_reader(service, tmp_path)
+    list(reader.iter_new_messages())
+    service.deliver("m4")
+    service.history_expired = True
+    service.calls.clear()
+
+    assert [message[1] for message in reader.iter_new_messages()] == ["m4", "m3", "m2", "m1"]
+    assert any(call[0] == "list" for call in service.calls)
+    assert stored_history_id(tmp_path) == str(service.history_id)
+
+
+def test_interrupted_run_does_not_advance_the_checkpoint(service, tmp_path):
+    reader = make_reader(service, tmp_path)
+    list(reader.iter_new_messages())
+    checkpoint = stored_history_id(tmp_path)
+    service.deliver("m4")
+    service.deliver("m5")
+
+    stream = reader.iter_new_messages()
+    next(stream)
+    stream.close()
+    assert stored_history_id(tmp_path) == checkpoint
+
+
+def test_partial_batch_failures_are_retried_and_deleted_messages_skipped(service):
+    service.fail_in_batch = {"m2", "m1"}
+    del service.mailbox["m1"]
+    reader = GmailReader("unused.json", service=service)
+
+    assert [message[1] for message in reader.iter_messages(batch_size=10)] == ["m3", "m2"]
+    assert ("get", "m2") in service.calls
+    assert ("get", "m1") in service.calls
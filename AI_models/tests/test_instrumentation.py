@@ -0,0 +1,32 @@
+import io
+import json
+
+from instrumentation import Metrics, get_metrics
+from resume_agent import json_data
+from resume_pdf import render_many
+
+
+def test_merge_adds_a_drained_registry():
+    worker, parent = Metrics(), Metrics()
+    with worker.span("pdf.doc_build"):
+        pass
+    worker.count("pdf.section_cache", result="hit")
+    parent.count("pdf.section_cache", result="hit")
+    parent.merge(worker.drain())
+
+    assert worker.summary() == {} and worker.counters() == {}
+    assert parent.summary()["pdf.doc_build"]["count"] == 1
+    assert parent.counters()["pdf.section_cache{result=hit}"] == 2
+
+
+def test_render_many_merges_worker_metrics_into_the_parent(monkeypatch):
+    monkeypatch.setattr(get_metrics(), "enabled", True)
+    get_metrics().reset()
+    buffers = [io.BytesIO(), io.BytesIO()]
+    report = render_many([(json.loads(json_data), buffer) for buffer in buffers], max_workers=2)
+
+    assert report["rendered"] == 2
+    summary = get_metrics().summary()
+    assert summary["pdf.doc_build"]["count"] == 2
+    assert summary["pdf.build_story"]["count"] == 2
+    assert all(buffer.getvalue().startswith(b"%PDF") for buffer in buffers)
@@ -0,0 +1,42 @@
+from job_matcher import JobIndex, tokenize
+
+
+def test_aliases_share_one_canonical_token():
+    assert tokenize("MS-Excel and PowerBI") == ["excel", "power bi"]
+    assert tokenize("Excel, Power BI") == ["excel", "power bi"]
+
+
+def test_r_matches_the_language_but_not_r_and_d():
+    assert "r" not in tokenize("Our R&D group ships products")
+    assert "r" in tokenize("Statistical modelling in R")
+
+
+def test_aliased_skill_matches_its_posting():
+    postings = [{"id": "excel", "title": "Analyst", "job_requirements": ["MS-Excel"], "job_description": ""},
+                {"id": "rnd", "title": "Scientist", "job_requirements": ["R&D lab work"], "job_description": ""}]
+    resume = {"skills": {"programming": ["r"], "bi_tools": ["Excel"]}}
+    results = JobIndex().build(postings).top_k(resume, k=2)
+
+    assert results[0]["id"] == "excel"
+    assert results[0]["matched_skills"][0][0] == "Excel"
+    assert results[1]["score"] == 0
+    assert results[1]["missing_skills"] == ["r", "Excel"]
+
+
+def test_numbers_are_not_tokens():
+    assert tokenize("Cut costs 94% in 2019, 5+ years, 3.7 GPA on AWS ec2") == ["cut", "costs", "years", "gpa", "aws", "ec2"]
+
+
+def test_shared_number_does_not_beat_shared_skills():
+    # Python appears in most postings, so a rare shared number would otherwise outweigh it.
+    postings = [{"id": "number", "title": "Data Role 94", "job_requirements": [], "job_description": "Founded 2019."},
+                {"id": "skills", "title": "Data Role", "job_requirements": ["Python", "Excel"],
+                 "job_description": "Python reporting for our finance group, dashboards and forecasting."}]
+    postings += [{"id": f"nurse_{i}", "title": "Nurse", "job_requirements": ["Python"], "job_description": ""}
+                 for i in range(3)]
+    resume = {"summary": "Raised report accuracy to 94% in 2019.",
+              "skills": {"programming": ["Python"], "bi_tools": ["Excel"]}}
+    results = JobIndex().build(postings).top_k(resume, k=5)
+
+    assert results[0]["id"] == "skills"
+    assert next(result for result in results if result["id"] == "number")["score"] == 0
@@ -0,0 +1,73 @@
+from local_resume_parser import LocalResumeParser
+from resume_Parser import ResumeAIParser
+from tests.fakes import FakeAgents, FakeProjectClient
+
+CLEAN_RESUME = """Jane Doe
+Senior Data Analyst
+jane.doe@example.com | +1 512 555 0100
+
+Summary
+Data analyst with six years of SQL, Python and Power BI reporting for finance teams.
+
+Education
+Bachelor of Science in Statistics
+University of Texas at Austin
+Aug 2012 - May 2016
+GPA: 3.7/4.0
+
+Skills
+Programming: Python, SQL, R
+BI Tools: Power BI, Tableau
+
+Experience
+Acme Corp, Austin TX
+Data Analyst
+Jan 2019 - Present
+• Built Power BI dashboards used by 40 managers
+• Automated monthly SQL reporting
+Globex, Dallas TX
+Junior Analyst
+Jun 2016 - Dec 2018
+• Cleaned claims data in Python
+
+Projects
+Churn Model:
+Logistic regression churn model in Python with 0.82 AUC.
+
+Certifications
+AWS Certified Cloud Practitioner, Tableau Desktop Specialist
+"""
+
+
+def test_clean_resume_leaves_no_field_for_the_agent():
+    resume, confidence, _ = LocalResumeParser().parse(CLEAN_RESUME)
+
+    assert [field for field, score in confidence.items() if score < 0.8] == []
+    assert resume["title"] == "Senior Data Analyst"
+    assert [entry["company"] for entry in resume["experience"]] == ["Acme Corp", "Globex"]
+    assert resume["experience"][1]["responsibilities"] == ["Cleaned claims data in Python"]
+
+
+def test_clean_resume_is_parsed_without_an_agent_call():
+    agents = FakeAgents()
+    parser = ResumeAIParser(connection_string="fake", agent_id="fake-agent")
+    parser.project_client = FakeProjectClient(agents)
+
+    resume = parser.parse_resume_hybrid(CLEAN_RESUME)
+
+    assert agents.runs == []
+    assert resume["name"] == "Jane Doe"
+
+
+def test_experience_entry_without_bullets_lowers_confidence():
+    text = CLEAN_RESUME.replace("• Cleaned claims data in Python\n", "")
+    _, confidence, _ = LocalResumeParser().parse(text)
+
+    assert confidence["experience"] < 0.8
+
+
+def test_header_line_that_is_not_a_title_lowers_confidence():
+    text = CLEAN_RESUME.replace("Senior Data Analyst", "Austin, TX 78701")
+    _, confidence, _ = LocalResumeParser().parse(text)
+
+    assert confidence["title"] < 0.8
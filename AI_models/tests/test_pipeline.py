@@ -0,0 +1,67 @@
+import json
+import os
+
+from instrumentation import get_metrics
+from pipeline import JobPipeline, PipelineCheckpoint
+from resume_agent import json_data
+
+
+RESUME = json.loads(json_data)
+
+
+class FlakyCheckpoint(PipelineCheckpoint):
+    """Fails to save the given item once it reaches fail_stage."""
+
+    def __init__(self, fail_item, fail_stage):
+        super().__init__(":memory:")
+        self.fail_item = fail_item
+        self.fail_stage = fail_stage
+
+    def save(self, item_id, stage, state, error=None):
+        if item_id == self.fail_item and stage == self.fail_stage:
+            raise OSError("disk full")
+        super().save(item_id, stage, state, error)
+
+
+def make_pipeline(tmp_path, checkpoint, tailor=None):
+    return JobPipeline(checkpoint=checkpoint, ocr=lambda item: f"text of {item['id']}", parse=lambda text: RESUME,
+                       tailor=tailor or (lambda item, resume: dict(resume, title=item["title"])),
+                       notify=lambda item, pdf_path: None, output_dir=str(tmp_path / "out"),
+                       workers={"ocr": 1, "parse": 1, "tailor": 2, "render": 1, "notify": 1},
+                       max_retries=1, backoff_base=0)
+
+
+def items(*ids):
+    return [{"id": item_id, "resume": b"", "title": f"Role {item_id}", "job_requirements": [], "job_description": ""}
+            for item_id in ids]
+
+
+def test_items_run_through_every_stage_and_are_skipped_on_rerun(tmp_path):
+    checkpoint = PipelineCheckpoint(":memory:")
+    get_metrics().reset()
+    report = make_pipeline(tmp_path, checkpoint).run(items("a", "b"))
+
+    assert report["completed"] == 2 and report["failed"] == {}
+    # Spans recorded inside the render worker processes are merged into this process's registry.
+    assert get_metrics().summary()["pdf.doc_build"]["count"] == 2
+    assert os.path.getsize(tmp_path / "out" / "a.pdf") > 0
+    assert checkpoint.summary()["notify"] == 2
+    assert make_pipeline(tmp_path, checkpoint).run(items("a", "b"))["skipped"] == 2
+
+
+def test_failing_checkpoint_fails_the_item_without_stalling_the_run(tmp_path):
+    report = make_pipeline(tmp_path, FlakyCheckpoint("a", "parse")).run(items("a", "b", "c"))
+
+    assert report["completed"] == 2
+    assert report["failed"] == {"a": "parse: checkpoint: OSError: disk full"}
+    assert report["stages"]["parse"]["failed"] == 1
+
+
+def test_stage_failures_are_retried_then_recorded(tmp_path):
+    checkpoint = PipelineCheckpoint(":memory:")
+    report = make_pipeline(tmp_path, checkpoint, tailor=lambda item, resume: None).run(items("a"))
+
+    assert report["failed"] == {"a": "tailor: ValueError: the update agent returned no resume"}
+    assert report["stages"]["tailor"]["retries"] == 1
+    stage, _, error = checkpoint.load("a")
+    assert stage == "parse" and error.startswith("tailor:")
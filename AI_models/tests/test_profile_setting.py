@@ -0,0 +1,45 @@
+import pytest
+
+from Database_Handler.profile_setting import ProfileDatabaseHandler
+from tests.conftest import TEST_DB_NAME
+
+
+@pytest.fixture
+def handler(mongo_client):
+    handler = ProfileDatabaseHandler(client=mongo_client, db_name=TEST_DB_NAME)
+    handler.resumes.insert_many([
+        {"name": "analyst", "user_id": "u1", "created_at": 1, "title": "Old"},
+        {"name": "analyst", "user_id": "u1", "created_at": 2, "title": "New"},
+        {"name": "engineer", "user_id": "u2", "created_at": 1, "title": "Engineer"},
+    ])
+    return handler
+
+
+def test_get_resumes_by_names_returns_the_newest_per_name(handler):
+    results = handler.get_resumes_by_names(["analyst", "engineer", "analyst", "missing"])
+    assert sorted(results) == ["analyst", "engineer"]
+    assert results["analyst"]["title"] == "New"
+    assert handler.get_resumes_by_names([]) == {}
+
+
+def test_id_only_exclusion_keeps_every_other_field(handler):
+    results = handler.get_resumes_by_names(["engineer"], {"_id": 0})
+    assert results["engineer"] == {"name": "engineer", "user_id": "u2", "created_at": 1, "title": "Engineer"}
+
+
+def test_inclusion_projection_adds_name(handler):
+    results = handler.get_resumes_by_names(["engineer"], {"_id": 0, "title": 1})
+    assert results["engineer"] == {"name": "engineer", "title": "Engineer"}
+
+
+def test_exclusion_projection_cannot_drop_name(handler):
+    results = handler.get_resumes_by_names(["engineer"], {"_id": 0, "name": 0, "title": 0})
+    assert results["engineer"] == {"name": "engineer", "user_id": "u2", "created_at": 1}
+
+
+def test_resume_lookup_uses_the_name_index(handler):
+    if not hasattr(handler.resumes.find({}), "explain"):
+        pytest.skip("explain() needs a real mongod (set MONGO_TEST_URI)")
+    stages = handler.explain_resume_lookup("analyst")
+    assert "IXSCAN" in stages
+    assert handler.resume_lookup_uses_index("analyst")
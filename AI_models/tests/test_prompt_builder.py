@@ -0,0 +1,59 @@
+from instrumentation import get_metrics
+from prompt_builder import UpdatePromptBuilder, merge_update, strip_boilerplate
+from resume_agent import ResumeAIUpdater
+
+
+def test_boilerplate_sentences_are_dropped():
+    text = "Build ETL pipelines in Python. We offer dental and vision insurance. We are an EEO employer."
+    assert strip_boilerplate(text) == "Build ETL pipelines in Python."
+
+
+def test_words_containing_boilerplate_terms_are_kept():
+    text = "Incidental travel to client sites. Recover from accidental data loss."
+    assert strip_boilerplate(text) == "Incidental travel to client sites.\nRecover from accidental data loss."
+
+
+RESUME = {"name": "Jane", "summary": "Analyst", "skills": {"programming": ["SQL"]},
+          "experience": [{"responsibilities": ["Built reports"] * 20}]}
+
+
+def test_savings_are_only_measured_on_request():
+    builder = UpdatePromptBuilder()
+    _, usage = builder.build(["SQL"], "Write SQL.", RESUME, measure_savings=False)
+    assert usage["full_prompt_tokens"] is None and usage["saved_tokens"] is None
+    assert builder.stats["saved_tokens"] == 0
+
+    _, usage = builder.build(["SQL"], "Write SQL.", RESUME)
+    assert usage["saved_tokens"] == usage["full_prompt_tokens"] - usage["prompt_tokens"] > 0
+    assert builder.stats["saved_tokens"] == usage["saved_tokens"]
+
+
+def test_update_prompt_skips_the_full_prompt_while_metrics_are_disabled(monkeypatch):
+    def full_prompt(*args):
+        raise AssertionError("full prompt rendered with metrics disabled")
+
+    monkeypatch.setattr(UpdatePromptBuilder, "full_prompt", staticmethod(full_prompt))
+    monkeypatch.setattr(get_metrics(), "enabled", False)
+    updater = ResumeAIUpdater(connection_string="fake", agent_id="fake-agent")
+    assert "Write SQL." in updater._build_update_prompt(["SQL"], "Write SQL.", RESUME)
+
+
+def test_benefit_terms_outside_a_benefits_context_are_kept():
+    text = ("Analyze dental and medical claims data with SQL. Build Tableau dashboards for PTO and leave analytics. "
+            "Model health insurance churn in Python.")
+    assert strip_boilerplate(text) == text.replace(". ", ".\n")
+
+
+def test_benefit_lists_are_dropped():
+    text = "Build ETL pipelines. We offer:\n- Medical, dental and vision insurance\n- 401(k) match"
+    assert strip_boilerplate(text) == "Build ETL pipelines."
+    assert strip_boilerplate("Benefits\n\nDental and PTO.\n\nRequirements:\n\nSQL.") == "Requirements:\nSQL."
+
+
+def test_merge_update_keeps_projects_the_agent_left_out():
+    resume = {"projects": [{"title": "A", "description": "a", "link": "x"}, {"title": "B", "description": "b"}]}
+    merged = merge_update(resume, {"projects": [{"title": "B", "description": "b2"}]})
+    assert merged["projects"] == [{"title": "B", "description": "b2"}, {"title": "A", "description": "a", "link": "x"}]
+
+    merged = merge_update(resume, {"projects": [{"title": "A2", "description": "a2"}]}, keep_unmatched_projects=False)
+    assert merged["projects"] == [{"title": "A2", "description": "a2", "link": "x"}]
@@ -0,0 +1,76 @@
+from resume_cache import TailoredResumeCache, make_cache_key
+
+RESUME = {"name": "Jane Doe", "summary": "Analyst  with\nSQL", "skills": {"programming": ["Python"]}}
+
+
+def test_key_ignores_key_order_whitespace_and_bullet_order():
+    key = make_cache_key(RESUME, ["SQL", "Python"], "Build reports. Own dashboards.", "agent", 1)
+    reordered = {"skills": {"programming": ["Python"]}, "summary": "Analyst with SQL", "name": "Jane Doe"}
+
+    assert make_cache_key(reordered, ["python ", "SQL"], "Own   dashboards.\nBuild reports.", "agent", 1) == key
+    assert make_cache_key(RESUME, ["SQL", "Python"], "Build reports. Own dashboards.", "agent", 2) != key
+    assert make_cache_key(RESUME, ["SQL", "Python"], "Build reports.", "agent", 1) != key
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = TailoredResumeCache(":memory:", max_memory_entries=2)
+    cache.set("a", {"v": "a"})
+    cache.set("b", {"v": "b"})
+    cache.get("a")
+    cache.set("c", {"v": "c"})
+
+    assert list(cache._memory) == ["a", "c"]
+    assert cache.get("b") == {"v": "b"}
+    assert cache.stats()["memory_hits"] == 1
+
+
+def test_disk_tier_evicts_least_recently_used():
+    cache = TailoredResumeCache(":memory:", max_memory_entries=0, max_disk_entries=2)
+    cache.set("a", {"v": "a"})
+    cache.set("b", {"v": "b"})
+    cache.set("c", {"v": "c"})
+
+    assert cache.get("a") is None
+    assert cache.get("c") == {"v": "c"}
+    assert cache.stats()["disk_entries"] == 2
+
+
+def test_entries_persist_across_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = TailoredResumeCache(path)
+    cache.set("key", {"title": "Data Analyst"})
+    cache.close()
+
+    reopened = TailoredResumeCache(path)
+    assert reopened.get("key") == {"title": "Data Analyst"}
+    assert reopened.stats()["memory_hits"] == 0
+    reopened.close()
+
+
+def test_returned_values_are_copies():
+    cache = TailoredResumeCache(":memory:")
+    value = {"skills": ["SQL"]}
+    cache.set("key", value)
+    value["skills"].append("Python")
+    cache.get("key")["skills"].append("R")
+
+    assert cache.get("key") == {"skills": ["SQL"]}
+
+
+def test_expired_entries_are_misses():
+    cache = TailoredResumeCache(":memory:", ttl_seconds=-1)
+    cache.set("key", {"v": 1})
+
+    assert cache.get("key") is None
+    assert cache.stats()["disk_entries"] == 0
+
+
+def test_stats():
+    cache = TailoredResumeCache(":memory:")
+    assert cache.stats()["hit_rate"] == 0.0
+    cache.set("key", {"v": 1})
+    cache.get("key")
+    cache.get("missing")
+
+    assert cache.stats() == {"hits": 1, "memory_hits": 1, "misses": 1, "hit_rate": 0.5,
+                             "memory_entries": 1, "disk_entries": 1}
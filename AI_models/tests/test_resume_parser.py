@@ -0,0 +1,32 @@
+import json
+
+from resume_Parser import ResumeAIParser
+from tests.fakes import FakeAgents, FakeProjectClient
+
+RESUME_TEXT = """Jane Doe
+Data Analyst
+jane@example.com
+
+Summary
+Analyst with five years of SQL and Power BI reporting.
+"""
+
+
+def make_parser(reply):
+    parser = ResumeAIParser(connection_string="fake", agent_id="fake-agent")
+    parser.project_client = FakeProjectClient(FakeAgents(reply=lambda prompt: reply))
+    return parser
+
+
+def test_hybrid_parse_unwraps_a_nested_reply():
+    parser = make_parser(json.dumps({"resume": {"summary": "From the agent"}}))
+    resume = parser.parse_resume_hybrid(RESUME_TEXT, min_confidence=2)
+    assert resume["summary"] == "From the agent"
+
+
+def test_hybrid_parse_logs_when_no_requested_field_came_back(capsys):
+    parser = make_parser(json.dumps({"unrelated": "value"}))
+    resume = parser.parse_resume_hybrid(RESUME_TEXT, min_confidence=2)
+
+    assert "held none of the requested fields (unrelated)" in capsys.readouterr().out
+    assert "unrelated" not in resume
@@ -0,0 +1,122 @@
+import io
+import json
+import os
+
+import pytest
+from reportlab import rl_config
+
+from instrumentation import get_metrics
+from resume_agent import json_data
+from resume_pdf import ResumeBuilder, ResumeRenderer, get_default_renderer, render_many
+
+
+@pytest.fixture
+def resume():
+    return json.loads(json_data)
+
+
+@pytest.fixture
+def invariant_pdfs(monkeypatch):
+    """Drops the creation date and random document id so equal renders give equal bytes."""
+    monkeypatch.setattr(rl_config, "invariant", 1)
+
+
+def test_render_into_a_buffer(resume):
+    buffer = io.BytesIO()
+    ResumeRenderer().render(resume, buffer)
+
+    assert buffer.getvalue().startswith(b"%PDF")
+    assert buffer.getvalue().rstrip().endswith(b"%%EOF")
+
+
+def test_builders_share_the_default_renderer(resume):
+    renderer = get_default_renderer()
+
+    assert renderer is get_default_renderer()
+    assert ResumeBuilder(json_data).renderer is renderer
+    assert renderer.render_bytes(resume).startswith(b"%PDF")
+    assert renderer.render_bytes(dict(resume, name="Someone Else")).startswith(b"%PDF")
+
+
+def test_builder_to_bytes_and_write_to(resume, tmp_path, invariant_pdfs):
+    renderer = ResumeRenderer()
+    builder = ResumeBuilder(json_data, renderer=renderer)
+    pdf_bytes = builder.to_bytes()
+
+    class Sink:
+        def __init__(self):
+            self.chunks = []
+
+        def write(self, chunk):
+            self.chunks.append(bytes(chunk))
+
+    sink = Sink()
+    assert builder.write_to(sink, chunk_size=1024) == len(pdf_bytes)
+    assert b"".join(sink.chunks) == pdf_bytes
+    assert max(len(chunk) for chunk in sink.chunks) == 1024
+
+    path = tmp_path / "resume.pdf"
+    ResumeBuilder(resume, str(path), renderer=renderer).create_resume_pdf()
+    assert path.read_bytes() == pdf_bytes
+
+
+def test_unchanged_sections_come_from_the_cache(resume, monkeypatch, invariant_pdfs):
+    monkeypatch.setattr(get_metrics(), "enabled", True)
+    get_metrics().reset()
+    renderer = ResumeRenderer()
+    first = renderer.render_bytes(resume)
+    misses = renderer.section_cache_misses
+    second = renderer.render_bytes(resume)
+
+    assert second == first
+    assert renderer.section_cache_misses == misses
+    assert renderer.section_cache_hits == misses
+    assert get_metrics().counters()["pdf.section_cache{result=hit}"] == misses
+    assert ResumeRenderer(section_cache_size=0).render_bytes(resume) == first
+
+
+def test_changed_section_is_rebuilt(resume, invariant_pdfs):
+    renderer = ResumeRenderer()
+    first = renderer.render_bytes(resume)
+    misses = renderer.section_cache_misses
+    changed = dict(resume, summary="A different summary for another posting.")
+    second = renderer.render_bytes(changed)
+
+    assert renderer.section_cache_misses == misses + 1
+    assert second != first
+    assert second == ResumeRenderer(section_cache_size=0).render_bytes(changed)
+
+
+def test_section_cache_is_bounded(resume):
+    renderer = ResumeRenderer(section_cache_size=3)
+    renderer.render_bytes(resume)
+
+    assert len(renderer._section_cache) == 3
+
+
+class _KillsWorker:
+    """Unpickling this in a render worker exits the process, like an out-of-memory kill."""
+
+    def __reduce__(self):
+        return os._exit, (1,)
+
+
+def test_render_many_records_failing_jobs_and_keeps_going():
+    buffers = [io.BytesIO(), io.BytesIO()]
+    report = render_many([(json_data, buffers[0]), ("{not json", buffers[1])], max_workers=1)
+
+    assert report["rendered"] == 1
+    assert list(report["failed"]) == [1]
+    assert report["failed"][1].startswith("JSONDecodeError")
+    assert buffers[0].getvalue().startswith(b"%PDF")
+    assert buffers[1].getvalue() == b""
+
+
+def test_render_many_records_a_dead_worker_pool():
+    calls = []
+    report = render_many([(json_data, io.BytesIO()), (_KillsWorker(), io.BytesIO())], max_workers=1,
+                         progress=lambda done, index, error: calls.append((index, error)))
+
+    assert "BrokenProcessPool" in report["failed"][1]
+    assert report["rendered"] + len(report["failed"]) == 2
+    assert sorted(index for index, _ in calls) == [0, 1]
@@ -0,0 +1,34 @@
+from resume_schema import RESUME_FIELDS, normalize_resume, validate_resume
+
+
+def test_normalize_resume_fills_defaults():
+    resume = normalize_resume({"name": "Jane"})
+    assert set(RESUME_FIELDS) <= set(resume)
+    assert resume["contact"] == {"email": "", "phone": "", "linkedin": "", "github": ""}
+    assert resume["skills"] == {"programming": [], "bi_tools": [], "relevant_courses": []}
+    assert validate_resume(resume) == []
+    assert normalize_resume(None)["name"] == ""
+
+
+def test_normalize_resume_coerces_types_and_keeps_unknown_keys():
+    resume = normalize_resume({
+        "name": " Jane ", "skills": ["SQL", "Python"], "certifications": "AWS, Azure",
+        "experience": [{"company": "Acme", "responsibilities": "Built reports, Ran SQL"}, "not a record"],
+        "projects": [{"title": "Churn", "description": None}], "extra": {"kept": True},
+    })
+    assert resume["name"] == "Jane"
+    assert resume["skills"]["programming"] == ["SQL", "Python"]
+    assert resume["certifications"] == ["AWS", "Azure"]
+    assert resume["experience"] == [{"company": "Acme", "location": "", "title": "", "duration": "",
+                                     "responsibilities": ["Built reports", "Ran SQL"]}]
+    assert resume["projects"] == [{"title": "Churn", "description": ""}]
+    assert resume["extra"] == {"kept": True}
+
+
+def test_validate_resume_reports_problems_without_changing_the_resume():
+    resume = {"name": "Jane", "skills": {"programming": "SQL"}}
+    problems = validate_resume(resume)
+    assert "missing 'title'" in problems
+    assert "'skills.bi_tools' should be a list" in problems
+    assert resume == {"name": "Jane", "skills": {"programming": "SQL"}}
+    assert validate_resume([]) == ["resume is not a JSON object"]
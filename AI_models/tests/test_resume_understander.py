@@ -0,0 +1,20 @@
+import resume_understander
+from resume_understander import analyze_read, load_cached_text, store_cached_text
+
+DOCUMENT = b"%PDF-1.4 fake resume"
+
+
+def test_text_layer_result_is_cached_under_its_source(tmp_path, monkeypatch):
+    monkeypatch.setattr(resume_understander, "extract_local_text", lambda document_bytes: ("Text layer", 0.9))
+    assert analyze_read(DOCUMENT, cache_dir=str(tmp_path)) == "Text layer"
+
+    assert load_cached_text(DOCUMENT, str(tmp_path)) == "Text layer"
+    assert load_cached_text(DOCUMENT, str(tmp_path), sources=("ocr",)) is None
+
+
+def test_local_first_false_ignores_cached_text_layer_output(tmp_path):
+    store_cached_text(DOCUMENT, "Text layer", str(tmp_path), source="text_layer")
+    store_cached_text(DOCUMENT, "OCR", str(tmp_path), source="ocr")
+
+    assert analyze_read(DOCUMENT, cache_dir=str(tmp_path)) == "Text layer"
+    assert analyze_read(DOCUMENT, cache_dir=str(tmp_path), local_first=False) == "OCR"
@@ -0,0 +1,53 @@
+from skill_taxonomy import SkillIndex, SkillTaxonomy
+
+
+def test_canonical_splits_slashes_and_keeps_unknown_skills():
+    taxonomy = SkillTaxonomy()
+
+    assert taxonomy.canonical("Tableau/Spotfire") == ["Tableau", "Spotfire"]
+    assert taxonomy.canonical("MS-Excel") == ["Excel"]
+    assert taxonomy.canonical("Quantum Knitting") == ["Quantum Knitting"]
+
+
+def test_case_sensitive_aliases_need_upper_case_in_free_text():
+    taxonomy = SkillTaxonomy()
+
+    assert taxonomy.extract("Models in R and TS") == ["R", "TypeScript"]
+    assert taxonomy.extract("r u free? ts, ml, js and rest later") == []
+    assert taxonomy.extract("Our R&D team") == []
+
+
+def test_job_skills_counts_requirements_double():
+    taxonomy = SkillTaxonomy()
+    skills = taxonomy.job_skills(["SQL"], "Python daily, Python reports.")
+
+    assert skills == ["SQL", "Python"]
+    assert taxonomy.job_skills("Python", "SQL and SQL and SQL") == ["SQL", "Python"]
+
+
+def test_missing_keywords_skips_skills_the_resume_covers():
+    resume = {"skills": {"programming": ["python3"]},
+              "experience": [{"responsibilities": ["Built Power BI dashboards"]}]}
+    missing = SkillTaxonomy().missing_keywords(resume, ["Python", "SQL", "PowerBI"], "Tableau a plus.")
+
+    assert missing == ["SQL", "Tableau"]
+
+
+def test_skill_index_add_remove_and_lookup():
+    index = SkillIndex()
+    assert index.add("a", ["Tableau", "SQL"], "") == ["Tableau", "SQL"]
+    index.add("b", ["TIBCO Spotfire"], "")
+    index.add("c", ["MS SQL"], "")
+
+    assert index.postings_with("sql") == {"a"}
+    assert index.postings_with("Tableau/Spotfire") == {"a", "b"}
+    assert index.postings_with_all(["Tableau", "SQL"]) == {"a"}
+    assert index.postings_with_any(["Spotfire", "SQL Server"]) == {"b", "c"}
+
+    index.add("a", ["Spotfire"], "")
+    assert index.postings_with("Tableau") == set()
+    assert index.postings_with("Spotfire") == {"a", "b"}
+
+    index.remove("b")
+    assert index.postings_with("Spotfire") == {"a"}
+    assert index.skills_of("b") == []